@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Bulk generation: one completion vs token-budgeted shards, and the local generator.
+
+Asks the ASGI app in-process, against the stub LLM, for ``--count``
+developers and tickets. First everything goes in one completion capped at
+``GENERATE_MAX_TOKENS``, as the endpoints used to do. Then the count is split
+into shards generated concurrently, both as one JSON response and streamed.
+Reported: wall time, distinct objects, the share of fallback filler, and
+LLM calls.
+
+Then it times the local synthetic generator at ``--local`` developers and
+tickets, the way load-test fixtures are made.
+
+    python benchmarks/bulk_generate.py --count 500 --local 100000
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+# Add the src directory to Python path
+src_dir = Path(__file__).resolve().parent.parent / "src"
+if src_dir.exists():
+    sys.path.insert(0, str(src_dir))
+
+from ai_pops.api import server
+from ai_pops.api.backends import StubBackend
+from ai_pops.api.metrics import LLM_PARSE
+from ai_pops.services.synthetic_service import synthetic_developers, synthetic_tickets
+
+GENERATORS = {"generate-developers": server.DEVELOPER_GENERATOR, "generate-tickets": server.TICKET_GENERATOR}
+
+
+def single_shard(generator, count):
+    return [server._Shard(0, count, "")]
+
+
+async def request(client: httpx.AsyncClient, endpoint: str, count: int, stream: bool) -> dict:
+    calls = LLM_PARSE.total()
+    started = time.perf_counter()
+    params = {"count": count, "stream": "ndjson"} if stream else {"count": count}
+    response = await client.post(f"/api/{endpoint}", params=params)
+    response.raise_for_status()
+    if stream:
+        items = [json.loads(line) for line in response.text.splitlines() if line]
+    else:
+        items = response.json()
+    generator = GENERATORS[endpoint]
+    return {
+        "wall": time.perf_counter() - started,
+        "distinct": len({item[generator.key] for item in items}),
+        "filler": sum(item == generator.fallback(i) for i, item in enumerate(items)) / max(1, len(items)),
+        "calls": LLM_PARSE.total() - calls,
+    }
+
+
+async def run(count: int) -> None:
+    plan_shards = server._plan_shards
+    transport = httpx.ASGITransport(app=server.app)
+    # no-store: each run makes its own LLM calls
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=600, headers={"Cache-Control": "no-store"}
+    ) as client:
+        print(f"{'endpoint':<20} {'mode':<16} {'wall':>8} {'distinct':>9} {'filler':>7} {'calls':>6}")
+        for endpoint in GENERATORS:
+            for mode, shards, stream in (
+                ("one completion", single_shard, False),
+                ("sharded", plan_shards, False),
+                ("sharded stream", plan_shards, True),
+            ):
+                server._plan_shards = shards
+                try:
+                    result = await request(client, endpoint, count, stream)
+                finally:
+                    server._plan_shards = plan_shards
+                print(f"{endpoint:<20} {mode:<16} {result['wall']:>7.2f}s {result['distinct']:>9} "
+                      f"{result['filler']:>7.1%} {result['calls']:>6.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=500, help="objects per generate request")
+    parser.add_argument("--latency", type=float, default=0.3, help="stub LLM seconds to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=400, help="stub output rate, 0 = instant")
+    parser.add_argument("--local", type=int, default=100000, help="developers and tickets from the local generator")
+    args = parser.parse_args()
+    server.llm_backend = StubBackend(latency=args.latency, tokens_per_second=args.tokens_per_second, jitter=0)
+    asyncio.run(run(args.count))
+
+    print()
+    for label, generate in (("developers", synthetic_developers), ("tickets", synthetic_tickets)):
+        started = time.perf_counter()
+        items = generate(args.local, seed=1)
+        elapsed = time.perf_counter() - started
+        key = "name" if label == "developers" else "id"
+        print(f"local {label:<11} {args.local:>8} in {elapsed:.2f}s, {len({item[key] for item in items})} distinct")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Compare flat and IVF developer retrieval on a large synthetic team.
+
+Embeds the team with the offline hashing embedder into a memory-mapped index,
+then times single-ticket lookups (what ``/api/candidates`` does) in both
+modes and reports how often IVF finds the same k-th best score as the exact
+search.
+
+    python benchmarks/developer_index.py --developers 50000
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the src directory to Python path
+src_dir = Path(__file__).resolve().parent.parent / "src"
+if src_dir.exists():
+    sys.path.insert(0, str(src_dir))
+
+from ai_pops.api.models import Developer, Ticket
+from ai_pops.services.embedding_service import DeveloperIndex, HashingEmbedder, ticket_text
+
+from load_match import synthetic_payload
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--developers", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+
+    payload = synthetic_payload(args.developers, args.queries, seed=1)
+    developers = [Developer(**d) for d in payload["developers"]]
+    tickets = [Ticket(**t) for t in payload["tickets"]]
+    embedder = HashingEmbedder()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "index")
+        started = time.perf_counter()
+        flat = DeveloperIndex(embedder, path=path, mode="flat")
+        flat.sync(developers)
+        print(f"embedded {len(flat)} developers in {time.perf_counter() - started:.1f} s")
+
+        started = time.perf_counter()
+        ivf = DeveloperIndex(embedder, path=path, mode="ivf")
+        print(f"reopened memory-mapped index in {(time.perf_counter() - started) * 1000:.1f} ms")
+        started = time.perf_counter()
+        ivf.search(embedder.embed([ticket_text(tickets[0])]), args.k)
+        print(f"built IVF lists in {time.perf_counter() - started:.1f} s")
+
+        queries = embedder.embed([ticket_text(t) for t in tickets])
+        results = {}
+        for label, index in (("flat", flat), ("ivf", ivf)):
+            started = time.perf_counter()
+            results[label] = [index.search(query[None, :], args.k)[0] for query in queries]
+            elapsed = (time.perf_counter() - started) * 1000 / len(queries)
+            print(f"{label:<5} {elapsed:8.2f} ms/query")
+
+        matched = sum(
+            ivf_top[-1][1] >= flat_top[-1][1] - 1e-6
+            for flat_top, ivf_top in zip(results["flat"], results["ivf"])
+        )
+        print(f"IVF k-th score matches exact search for {matched / len(queries):.0%} of queries")
+
+
+if __name__ == "__main__":
+    main()
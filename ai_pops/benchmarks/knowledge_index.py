@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Full and incremental indexing of a large knowledge directory.
+
+Writes a synthetic tree of text files and indexes it from scratch with the
+offline hashing embedder. Then it times a refresh with nothing changed, a
+refresh after one file is edited, and searches before and after the edit.
+The full index is what re-embedding everything on each kickoff would cost.
+
+    python benchmarks/knowledge_index.py --files 10000
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the src directory to Python path
+src_dir = Path(__file__).resolve().parent.parent / "src"
+if src_dir.exists():
+    sys.path.insert(0, str(src_dir))
+
+from ai_pops.services.embedding_service import HashingEmbedder
+from ai_pops.services.knowledge_service import KnowledgeIndex
+
+WORDS = (
+    "agent model prompt token latency cache index vector embedding retrieval python rust kubernetes "
+    "deployment service queue database schema migration benchmark throughput memory cluster network "
+    "training inference dataset evaluation pipeline release security policy review customer support"
+).split()
+
+
+def paragraph(rng: random.Random) -> str:
+    sentences = [" ".join(rng.choices(WORDS, k=rng.randint(8, 16))).capitalize() + "." for _ in range(rng.randint(2, 5))]
+    return " ".join(sentences)
+
+
+def write_tree(root: Path, files: int, paragraphs: int, rng: random.Random) -> list:
+    paths = []
+    for i in range(files):
+        path = root / f"topic_{i % 100:02d}" / f"note_{i:05d}.md"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("\n\n".join(paragraph(rng) for _ in range(paragraphs)))
+        paths.append(path)
+    return paths
+
+
+def timed(label: str, fn):
+    started = time.perf_counter()
+    result = fn()
+    print(f"{label:<34} {(time.perf_counter() - started) * 1000:9.1f} ms  {result if isinstance(result, dict) else ''}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=10000)
+    parser.add_argument("--paragraphs", type=int, default=6, help="paragraphs per file")
+    parser.add_argument("-k", type=int, default=4)
+    args = parser.parse_args()
+    rng = random.Random(1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "knowledge"
+        started = time.perf_counter()
+        paths = write_tree(root, args.files, args.paragraphs, rng)
+        print(f"wrote {args.files} files in {time.perf_counter() - started:.1f} s\n")
+
+        index = KnowledgeIndex(HashingEmbedder(), root=str(root), path=str(Path(tmp) / "knowledge.db"))
+        timed("full index", index.refresh)
+        print(f"{len(index)} chunks")
+        timed("first search (loads vectors)", lambda: index.search("vector retrieval latency", args.k))
+        timed("refresh, nothing changed", index.refresh)
+
+        edited = paths[len(paths) // 2]
+        edited.write_text(edited.read_text() + "\n\n" + paragraph(rng))
+        timed("refresh after a one-file edit", index.refresh)
+        timed("first search after the edit", lambda: index.search("vector retrieval latency", args.k))
+        started = time.perf_counter()
+        for _ in range(20):
+            index.search(paragraph(rng), args.k)
+        print(f"{'search':<34} {(time.perf_counter() - started) * 1000 / 20:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
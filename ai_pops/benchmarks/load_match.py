@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Load test /api/match against a local stub LLM.
+
+Fires N concurrent match requests at the ASGI app in-process. The server's
+LLM backend is the in-process stub, which answers after a simulated latency
+and token rate, so the numbers reflect the server's concurrency, not
+OpenAI's, and no network access is needed.
+
+    python benchmarks/load_match.py --requests 500 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+# Add the src directory to Python path
+src_dir = Path(__file__).resolve().parent.parent / "src"
+if src_dir.exists():
+    sys.path.insert(0, str(src_dir))
+
+from ai_pops.api import server
+from ai_pops.api.backends import StubBackend
+
+PAYLOAD = {
+    "developers": [
+        {"name": "Alice Smith", "skills": ["Python", "React"], "experience_years": 5,
+         "profile_summary": "Full-stack developer"},
+        {"name": "Bob Johnson", "skills": ["Java", "MySQL"], "experience_years": 3,
+         "profile_summary": "Backend developer"},
+    ],
+    "tickets": [
+        {"id": "T001", "title": "Frontend React component", "description": "User dashboard"},
+        {"id": "T002", "title": "Backend API endpoint", "description": "REST API for users"},
+    ],
+}
+
+SKILLS = ["Python", "React", "JavaScript", "Java", "Spring", "MySQL", "Go", "Kubernetes",
+          "AWS", "Docker", "TypeScript", "Node.js", "PostgreSQL", "GraphQL", "Terraform"]
+
+
+def synthetic_payload(n_developers: int, n_tickets: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    return {
+        "developers": [
+            {"name": f"Developer {i}", "skills": rng.sample(SKILLS, 3), "experience_years": rng.randint(1, 15),
+             "profile_summary": f"Engineer focused on {' and '.join(rng.sample(SKILLS, 2))}"}
+            for i in range(n_developers)
+        ],
+        "tickets": [
+            {"id": f"T{i:05d}", "title": f"{rng.choice(SKILLS)} improvement",
+             "description": f"Update the {rng.choice(SKILLS)} integration used by the {rng.choice(SKILLS)} service"}
+            for i in range(n_tickets)
+        ],
+    }
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run(n_requests: int, backend: StubBackend, use_cache: bool, payload: dict):
+    server.llm_backend = backend
+    transport = httpx.ASGITransport(app=server.app)
+    # Identical payloads would otherwise share one in-flight call and then
+    # be served from the response cache
+    headers = {} if use_cache else {"Cache-Control": "no-store"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=None) as client:
+
+        async def one():
+            started = time.perf_counter()
+            response = await client.post("/api/match", json=payload, headers=headers)
+            return response.status_code, response.headers.get("x-match-strategy"), time.perf_counter() - started
+
+        # Warm up lazy imports and pydantic model construction
+        await one()
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(one() for _ in range(n_requests)))
+        wall = time.perf_counter() - started
+
+    latencies = [r[2] * 1000 for r in results if r[0] == 200]
+    statuses = {}
+    for status, strategy, _ in results:
+        key = f"{status} {strategy or ''}".strip()
+        statuses[key] = statuses.get(key, 0) + 1
+
+    print(f"requests:   {n_requests} concurrent, stub latency {backend.latency * 1000:.0f} ms "
+          f"at {backend.tokens_per_second:g} tok/s, "
+          f"{len(payload['developers'])} developers x {len(payload['tickets'])} tickets")
+    print(f"statuses:   {statuses}")
+    print(f"wall time:  {wall:.2f} s ({n_requests / wall:.0f} req/s)")
+    if latencies:
+        print(f"p50:        {statistics.median(latencies):.1f} ms")
+        print(f"p99:        {percentile(latencies, 99):.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.2, help="stub LLM seconds to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=0, help="stub output rate, 0 = instant")
+    parser.add_argument("--jitter", type=float, default=0, help="log-normal spread of stub latency and rate")
+    parser.add_argument("--use-cache", action="store_true", help="let requests coalesce and hit the response cache")
+    parser.add_argument("--developers", type=int, help="synthetic developers per request")
+    parser.add_argument("--tickets", type=int, help="synthetic tickets per request (exercises chunking)")
+    args = parser.parse_args()
+    payload = PAYLOAD
+    if args.developers or args.tickets:
+        payload = synthetic_payload(args.developers or 20, args.tickets or 100)
+    backend = StubBackend(latency=args.latency, tokens_per_second=args.tokens_per_second, jitter=args.jitter)
+    asyncio.run(run(args.requests, backend, args.use_cache, payload))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""Token count and latency of the verbose and compact match prompts.
+
+For each batch size, one synthetic chunk (that many tickets and a fifth as
+many developers) is encoded in every prompt format. Each prompt is then
+answered by the LLM backend. The benchmark reports prompt and answer tokens,
+the mean latency of a call, how many tickets came back as valid assignments,
+and the reduction against the verbose prompt.
+
+By default the backend is the in-process stub. Its latency is a time to
+first token plus the answer's tokens at ``--tokens-per-second``, so it
+reflects output length but not prompt processing. ``--backend openai`` (or
+``local``) measures a real model. Tokens are counted with tiktoken when it
+is installed, otherwise estimated at four characters per token.
+
+    python benchmarks/match_prompt.py --sizes 10,25,50,100
+    python benchmarks/match_prompt.py --backend openai --sizes 10,50 --repeats 3
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add the src directory to Python path
+src_dir = Path(__file__).resolve().parent.parent / "src"
+if src_dir.exists():
+    sys.path.insert(0, str(src_dir))
+
+from dotenv import load_dotenv
+
+from ai_pops.api.backends import CHARS_PER_TOKEN, LLM_MODEL, StubBackend, create_backend
+from ai_pops.api.llm import parse_json_response
+from ai_pops.api.models import Developer, Ticket
+from ai_pops.services.batching_service import validate_assignment
+from ai_pops.services.prompt_service import compact_match_prompt, expand_assignment, verbose_match_prompt
+
+from load_match import synthetic_payload
+
+FORMATS = {
+    "verbose": verbose_match_prompt,
+    "compact": lambda developers, tickets: compact_match_prompt(developers, tickets, reasons="local"),
+    "compact+reasons": lambda developers, tickets: compact_match_prompt(developers, tickets, reasons="llm"),
+}
+
+
+def token_counter(model: str):
+    """(name, count) counting tokens like ``model`` does, or estimating them without tiktoken."""
+    try:
+        import tiktoken
+
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding("o200k_base")
+    except Exception:
+        # Not installed, or offline with no cached encoding to load
+        return f"~{CHARS_PER_TOKEN} chars/token", lambda text: len(text) // CHARS_PER_TOKEN
+    return f"tiktoken {encoding.name}", lambda text: len(encoding.encode(text))
+
+
+def expand_assignments(result, developers, tickets) -> list:
+    """``expand_assignment`` over a decoded answer, dropping malformed tuples."""
+    if not isinstance(result, list):
+        return []
+    expanded = (expand_assignment(item, developers, tickets) for item in result)
+    return [item for item in expanded if item is not None]
+
+
+async def measure(backend, developers, tickets, build, repeats: int, max_tokens: int, count_tokens) -> dict:
+    prompt = build(developers, tickets)
+    latencies = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        answer = await backend.complete(prompt, 0.3, max_tokens)
+        latencies.append(time.perf_counter() - started)
+    try:
+        result = expand_assignments(parse_json_response(answer), developers, tickets)
+    except ValueError:
+        result = []
+    ticket_ids, dev_names = {t.id for t in tickets}, {d.name for d in developers}
+    valid = {a.ticketId for a in (validate_assignment(item, ticket_ids, dev_names) for item in result) if a}
+    return {
+        "prompt_tokens": count_tokens(prompt),
+        "answer_tokens": count_tokens(answer),
+        "latency_ms": statistics.fmean(latencies) * 1000,
+        "assigned": len(valid),
+    }
+
+
+def reduction(value: float, baseline: float) -> str:
+    return f"{(1 - value / baseline) * 100:5.1f}%" if baseline else "    -"
+
+
+async def run(backend, sizes, repeats: int, max_tokens: int):
+    counter, count_tokens = token_counter(backend.model if backend.model != "stub" else LLM_MODEL)
+    print(f"backend {backend.name} ({backend.model}), {repeats} call(s) per prompt, tokens by {counter}\n")
+    print(f"{'tickets':>7} {'devs':>5} {'format':<16} {'prompt':>7} {'answer':>7} {'total':>7} "
+          f"{'latency':>9} {'assigned':>8}  {'tokens -':>8} {'latency -':>9}")
+    for size in sizes:
+        payload = synthetic_payload(max(2, size // 5), size, seed=size)
+        developers = [Developer(**d) for d in payload["developers"]]
+        tickets = [Ticket(**t) for t in payload["tickets"]]
+        baseline = None
+        for name, build in FORMATS.items():
+            stats = await measure(backend, developers, tickets, build, repeats, max_tokens, count_tokens)
+            total = stats["prompt_tokens"] + stats["answer_tokens"]
+            if baseline is None:
+                baseline = {"total": total, "latency_ms": stats["latency_ms"]}
+            print(f"{size:>7} {len(developers):>5} {name:<16} {stats['prompt_tokens']:>7} "
+                  f"{stats['answer_tokens']:>7} {total:>7} {stats['latency_ms']:>7.0f}ms "
+                  f"{stats['assigned']:>4}/{size:<3}  {reduction(total, baseline['total']):>8} "
+                  f"{reduction(stats['latency_ms'], baseline['latency_ms']):>9}")
+        print()
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10,25,50,100", help="comma-separated tickets per prompt")
+    parser.add_argument("--backend", default="stub", choices=["stub", "openai", "local"])
+    parser.add_argument("--repeats", type=int, default=1, help="calls per prompt, latency is their mean")
+    parser.add_argument("--max-tokens", type=int, default=16000, help="answer limit, high enough not to truncate")
+    parser.add_argument("--latency", type=float, default=0.3, help="stub LLM seconds to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=80, help="stub output rate")
+    args = parser.parse_args()
+
+    if args.backend == "stub":
+        backend = StubBackend(latency=args.latency, tokens_per_second=args.tokens_per_second, jitter=0)
+    else:
+        backend = create_backend(args.backend)
+        if backend is None:
+            parser.error("OPENAI_API_KEY is not set")
+    asyncio.run(run(backend, [int(s) for s in args.sizes.split(",")], args.repeats, args.max_tokens))
+
+
+if __name__ == "__main__":
+    main()
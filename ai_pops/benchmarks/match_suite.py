@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""Latency, throughput and match quality of /api/match across team sizes.
+
+For every strategy and size, a synthetic team and backlog of that many
+tickets (and a tenth as many developers) is matched repeatedly by concurrent
+clients. By default the ASGI app is driven in-process with the stub LLM
+backend, so runs are offline and repeatable; ``--base-url`` points the suite
+at a running server instead (then peak RSS is the client's, not the
+server's).
+
+Each result records p50/p95/p99 latency, requests per second, peak RSS and
+the quality of the returned assignment: how many of each ticket's skills its
+developer has, the matchScore distribution, unassigned tickets and the
+heaviest developer load. Results are written to a JSON file; ``--compare``
+checks a run against an earlier file and exits 1 on a regression.
+
+    python benchmarks/match_suite.py --sizes 10,100,1000,10000 --output baseline.json
+    python benchmarks/match_suite.py --compare baseline.json --output current.json
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+# Add the src directory to Python path
+src_dir = Path(__file__).resolve().parent.parent / "src"
+if src_dir.exists():
+    sys.path.insert(0, str(src_dir))
+
+from ai_pops.services.matching_service import tokenize
+
+from load_match import percentile, synthetic_payload
+
+# (metric, direction): +1 when higher is better, -1 when lower is better
+COMPARED_METRICS = [
+    ("p95_ms", -1), ("rps", +1), ("skill_coverage", +1), ("unassigned", -1), ("errors", -1),
+]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def match_quality(payload: dict, assignments: list) -> dict:
+    """Skill coverage, score distribution, unassigned tickets and peak load of one answer."""
+    skills = {d["name"]: set(tokenize(" ".join(d["skills"]))) for d in payload["developers"]}
+    known_skills = set().union(*skills.values())
+    by_ticket = {a["ticketId"]: a for a in assignments if a.get("developerName") in skills}
+
+    coverage, scores = [], []
+    for ticket in payload["tickets"]:
+        assignment = by_ticket.get(ticket["id"])
+        if assignment is None:
+            continue
+        wanted = known_skills & set(tokenize(f"{ticket['title']} {ticket['description']}"))
+        had = wanted & skills[assignment["developerName"]]
+        coverage.append(len(had) / len(wanted) if wanted else 1.0)
+        scores.append(float(assignment.get("matchScore", 0)))
+
+    loads = Counter(a["developerName"] for a in by_ticket.values())
+    return {
+        "skill_coverage": round(statistics.fmean(coverage), 4) if coverage else 0.0,
+        "score_min": min(scores, default=0.0),
+        "score_p50": statistics.median(scores) if scores else 0.0,
+        "score_mean": round(statistics.fmean(scores), 2) if scores else 0.0,
+        "score_max": max(scores, default=0.0),
+        "unassigned": len(payload["tickets"]) - len(by_ticket),
+        "max_load": max(loads.values(), default=0),
+    }
+
+
+async def run_case(client: httpx.AsyncClient, strategy: str, size: int, n_requests: int, clients: int) -> dict:
+    """Drive ``n_requests`` matches of one size from ``clients`` concurrent clients."""
+    payload = synthetic_payload(max(2, size // 10), size, seed=size)
+    payload["strategy"] = strategy
+    # Every request must reach the backend, not the response cache
+    headers = {"Cache-Control": "no-store"}
+
+    latencies, statuses, answers = [], Counter(), []
+    issued = 0
+
+    async def worker():
+        nonlocal issued
+        while issued < n_requests:
+            issued += 1
+            started = time.perf_counter()
+            try:
+                response = await client.post("/api/match", json=payload, headers=headers)
+                status = response.status_code
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[str(status)] += 1
+            if status == 200 and not answers:
+                answers.append(response.json())
+
+    # One untimed request warms imports, pydantic models and the connection pool
+    await client.post("/api/match", json=payload, headers=headers)
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(clients)))
+    wall = time.perf_counter() - started
+
+    result = {
+        "strategy": strategy,
+        "tickets": size,
+        "developers": len(payload["developers"]),
+        "requests": n_requests,
+        "clients": clients,
+        "errors": n_requests - statuses["200"],
+        "statuses": dict(statuses),
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p95_ms": round(percentile(latencies, 95), 1),
+        "p99_ms": round(percentile(latencies, 99), 1),
+        "rps": round(n_requests / wall, 2),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+    result.update(match_quality(payload, answers[0] if answers else []))
+    return result
+
+
+def requests_for(size: int, clients: int, requested: int) -> int:
+    # Enough requests for stable percentiles without the 10k case taking minutes
+    return requested or max(clients, min(200, 20000 // size))
+
+
+async def run_suite(args) -> list:
+    if args.base_url:
+        transport, base_url = None, args.base_url
+    else:
+        from ai_pops.api import server
+        from ai_pops.api.backends import StubBackend
+
+        server.llm_backend = StubBackend(
+            latency=args.latency, tokens_per_second=args.tokens_per_second, jitter=args.jitter
+        )
+        transport, base_url = httpx.ASGITransport(app=server.app), "http://bench"
+
+    results = []
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=args.timeout) as client:
+        for strategy in args.strategies:
+            for size in args.sizes:
+                result = await run_case(
+                    client, strategy, size, requests_for(size, args.clients, args.requests), args.clients
+                )
+                results.append(result)
+                print(
+                    f"{strategy:6} {size:6} tickets  p50 {result['p50_ms']:8.1f}  p95 {result['p95_ms']:8.1f}  "
+                    f"p99 {result['p99_ms']:8.1f} ms  {result['rps']:7.2f} req/s  "
+                    f"rss {result['peak_rss_mb']:6.0f} MB  coverage {result['skill_coverage']:.2f}  "
+                    f"unassigned {result['unassigned']}  errors {result['errors']}"
+                )
+    return results
+
+
+def compare(results: list, baseline_path: str, tolerance: float) -> bool:
+    """Print each compared metric against the baseline; False if any regressed past ``tolerance``."""
+    with open(baseline_path, encoding="utf-8") as handle:
+        baseline = {(r["strategy"], r["tickets"]): r for r in json.load(handle)["results"]}
+    ok = True
+    for result in results:
+        before = baseline.get((result["strategy"], result["tickets"]))
+        if before is None:
+            continue
+        for metric, direction in COMPARED_METRICS:
+            old, new = before[metric], result[metric]
+            if old == new:
+                continue
+            change = (new - old) / old if old else float("inf")
+            regressed = direction * change < -tolerance
+            # Counts that were zero regress on any increase
+            if metric in ("unassigned", "errors"):
+                regressed = new > old
+            ok &= not regressed
+            print(f"  {result['strategy']:6} {result['tickets']:6} {metric:15} {old:>10} -> {new:<10} "
+                  f"{change:+.0%}{'  REGRESSION' if regressed else ''}")
+    return ok
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10,100,1000,10000", help="comma-separated ticket counts")
+    parser.add_argument("--strategies", default="llm,solver", help="comma-separated match strategies")
+    parser.add_argument("--clients", type=int, default=8, help="concurrent clients")
+    parser.add_argument("--requests", type=int, default=0, help="requests per size (default scales with size)")
+    parser.add_argument("--latency", type=float, default=0.1, help="stub LLM seconds to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=0, help="stub output rate, 0 = instant")
+    parser.add_argument("--jitter", type=float, default=0, help="log-normal spread of stub latency and rate")
+    parser.add_argument("--base-url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--timeout", type=float, default=600, help="per-request timeout in seconds")
+    parser.add_argument("--output", default="match_suite.json", help="where to write the results")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    args = parser.parse_args()
+    args.sizes = [int(size) for size in args.sizes.split(",")]
+    args.strategies = args.strategies.split(",")
+
+    results = asyncio.run(run_suite(args))
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"results written to {args.output}")
+
+    if args.compare and not compare(results, args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
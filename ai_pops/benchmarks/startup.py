@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Guard the cold-start import time of the API server and the CLI.
+
+Imports each entry point in a fresh interpreter under ``python -X importtime``
+and compares the median cumulative import time against a budget. It also
+checks that the heavy dependencies which should only load on first use
+(crewai, openai, ...) are not imported eagerly. Exits non-zero when an entry
+point is over budget or imports something it should not, so it can run in CI.
+
+    python benchmarks/startup.py --runs 5 --server-budget 800 --cli-budget 150
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+src_dir = Path(__file__).resolve().parent.parent / "src"
+
+# entry point -> (module, modules that must not be loaded by importing it)
+ENTRY_POINTS = {
+    "server": ("ai_pops.api.server", ["crewai", "openai", "litellm"]),
+    "cli": ("ai_pops.main", ["crewai", "openai", "litellm", "fastapi", "numpy"]),
+}
+
+CHECK_LOADED = "import sys, json; print(json.dumps(sorted(m for m in {forbidden!r} if m in sys.modules)))"
+
+
+def import_profile(module: str, forbidden: list):
+    """Import ``module`` in a fresh interpreter; return its importtime entries and the forbidden modules it loaded."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(src_dir), env.get("PYTHONPATH")]))
+    code = f"import {module}; " + CHECK_LOADED.format(forbidden=forbidden)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, env=env, check=False,
+    )
+    if result.returncode != 0:
+        sys.exit(f"importing {module} failed:\n{result.stderr[-2000:]}")
+
+    # Lines look like "import time:  self [us] | cumulative | imported package",
+    # children first and indented under the module that imported them
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((depth, name.strip(), int(cumulative_us)))
+    return entries, json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def attribute(entries, module: str):
+    """Total import time of ``module`` and its parent packages, and the top-level packages they pulled in."""
+    parts = module.split(".")
+    targets = {".".join(parts[:i]) for i in range(1, len(parts) + 1)}
+    total_us, pulled_in, descendants = 0, {}, []
+    for depth, name, cumulative in entries:
+        if depth > 0:
+            descendants.append((name, cumulative))
+            continue
+        if name in targets:
+            total_us += cumulative
+            for child, child_us in descendants:
+                if "." not in child:
+                    pulled_in[child] = max(pulled_in.get(child, 0), child_us)
+        descendants = []
+    return total_us / 1000, pulled_in
+
+
+def measure(name: str, module: str, forbidden: list, runs: int, budget_ms: float, top: int) -> bool:
+    # The first run compiles bytecode and warms the filesystem cache
+    import_profile(module, forbidden)
+    samples = []
+    for _ in range(runs):
+        entries, loaded = import_profile(module, forbidden)
+        total_ms, pulled_in = attribute(entries, module)
+        samples.append(total_ms)
+    median = statistics.median(samples)
+
+    ok = median <= budget_ms and not loaded
+    print(f"{name:7} {module:22} median {median:7.1f} ms  budget {budget_ms:6.0f} ms  "
+          f"{'ok' if ok else 'FAIL'}")
+    if loaded:
+        print(f"        eagerly imports: {', '.join(loaded)}")
+    slowest = sorted(((us, package) for package, us in pulled_in.items()), reverse=True)[:top]
+    for cumulative, package in slowest:
+        print(f"        {cumulative / 1000:7.1f} ms  {package}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per entry point")
+    parser.add_argument("--server-budget", type=float, default=800, help="server import budget in ms")
+    parser.add_argument("--cli-budget", type=float, default=150, help="CLI import budget in ms")
+    parser.add_argument("--top", type=int, default=5, help="slowest top-level imports to list")
+    args = parser.parse_args()
+
+    budgets = {"server": args.server_budget, "cli": args.cli_budget}
+    results = [
+        measure(name, module, forbidden, args.runs, budgets[name], args.top)
+        for name, (module, forbidden) in ENTRY_POINTS.items()
+    ]
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Time single edits against a large persistent team store.
+
+Loads a synthetic team and backlog into a temporary SQLite store, then times
+individual ticket and developer edits, each of which re-solves the stored
+assignment incrementally. A full ``match_optimally`` run over the same data is
+timed for comparison.
+
+    python benchmarks/store_updates.py --developers 200 --tickets 10000
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the src directory to Python path
+src_dir = Path(__file__).resolve().parent.parent / "src"
+if src_dir.exists():
+    sys.path.insert(0, str(src_dir))
+
+from ai_pops.api.models import Developer, Ticket
+from ai_pops.services.matching_service import match_optimally
+from ai_pops.services.store_service import TeamStore
+
+from load_match import SKILLS, synthetic_payload
+
+
+def timed(fn, *args) -> float:
+    started = time.perf_counter()
+    fn(*args)
+    return (time.perf_counter() - started) * 1000
+
+
+def report(label: str, samples) -> None:
+    samples = sorted(samples)
+    print(f"{label:<22} median {statistics.median(samples):8.2f} ms   "
+          f"p95 {samples[int(0.95 * (len(samples) - 1))]:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--developers", type=int, default=200)
+    parser.add_argument("--tickets", type=int, default=10000)
+    parser.add_argument("--edits", type=int, default=100)
+    parser.add_argument("--headroom", type=float, default=0.2, help="spare capacity over an even split")
+    args = parser.parse_args()
+
+    payload = synthetic_payload(args.developers, args.tickets, seed=7)
+    developers = [Developer(**d) for d in payload["developers"]]
+    tickets = [Ticket(**t) for t in payload["tickets"]]
+    rng = random.Random(7)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = TeamStore(path=str(Path(tmp) / "bench.db"), headroom=args.headroom)
+        load_ms = timed(store.load, developers, tickets)
+        print(f"loaded {len(developers)} developers and {len(tickets)} tickets in {load_ms:.0f} ms")
+
+        reopen_ms = timed(lambda: TeamStore(path=str(Path(tmp) / "bench.db"), headroom=args.headroom))
+        full_ms = timed(match_optimally, developers, tickets)
+        print(f"{'reopen + rebuild':<22} {reopen_ms:8.1f} ms")
+        print(f"{'full match_optimally':<22} {full_ms:8.1f} ms")
+
+        def edit_ticket():
+            ticket = rng.choice(tickets)
+            words = rng.sample(SKILLS, 2)
+            store.upsert_ticket(ticket.model_copy(update={"title": f"{words[0]} work on {words[1]}"}))
+
+        def edit_developer():
+            developer = rng.choice(developers)
+            store.upsert_developer(developer.model_copy(update={"skills": rng.sample(SKILLS, 3)}))
+
+        report("ticket update", [timed(edit_ticket) for _ in range(args.edits)])
+        report("developer update", [timed(edit_developer) for _ in range(max(1, args.edits // 5))])
+        report("assignments read", [timed(store.assignments) for _ in range(3)])
+
+
+if __name__ == "__main__":
+    main()
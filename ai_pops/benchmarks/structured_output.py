@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Fallback rate and wasted tokens with and without structured output and salvage.
+
+Sends generation and match requests of varied sizes to the ASGI app
+in-process, against the stub LLM. A share ``--malformed`` of the stub's
+free-form answers has one broken item, and answers longer than
+``max_tokens`` are cut off, as a real model's would be. The same requests
+run three ways:
+
+- ``legacy``: free-form prompts, and any answer that does not decode is
+  thrown away and replaced by fallback data, as the API used to do.
+- ``salvage``: free-form prompts; complete items of a damaged answer are
+  kept and only the missing ones are asked for again.
+- ``structured``: schema-constrained answers, plus salvage.
+
+For each endpoint it reports the share of requests that needed any fallback,
+the share of generated objects that are filler, and LLM calls, completion
+tokens and wasted tokens per request.
+
+    python benchmarks/structured_output.py --requests 40 --malformed 0.3
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+from pathlib import Path
+
+import httpx
+
+# Add the src directory to Python path
+src_dir = Path(__file__).resolve().parent.parent / "src"
+if src_dir.exists():
+    sys.path.insert(0, str(src_dir))
+
+from ai_pops.api import llm, server
+from ai_pops.api.backends import StubBackend
+from ai_pops.api.metrics import FALLBACKS, LLM_PARSE, LLM_TOKENS, LLM_WASTED_TOKENS
+from load_match import synthetic_payload
+
+MODES = {
+    # structured output, salvage, remainder retries
+    "legacy": (False, False, 0),
+    "salvage": (False, True, 2),
+    "structured": (True, True, 2),
+}
+
+
+def workload(requests: int, seed: int = 1) -> list:
+    """(endpoint, count or payload) pairs; generation counts run past what fits in one answer."""
+    rng = random.Random(seed)
+    work = []
+    for i in range(requests):
+        work.append(("generate-developers", rng.randint(5, 70)))
+        work.append(("generate-tickets", rng.randint(5, 120)))
+        work.append(("match", synthetic_payload(rng.randint(10, 60), rng.randint(20, 200), seed=i)))
+    return work
+
+
+def totals() -> dict:
+    return {
+        "calls": LLM_PARSE.total(),
+        "tokens": LLM_TOKENS.total(kind="completion"),
+        "wasted": LLM_WASTED_TOKENS.total(),
+    }
+
+
+async def run(work: list) -> dict:
+    stats = {endpoint: {"requests": 0, "fallbacks": 0, "items": 0, "filler": 0, "calls": 0, "tokens": 0, "wasted": 0}
+             for endpoint in ("generate-developers", "generate-tickets", "match")}
+    generators = {"generate-developers": server.DEVELOPER_GENERATOR, "generate-tickets": server.TICKET_GENERATOR}
+    transport = httpx.ASGITransport(app=server.app)
+    # no-store: every request reaches the stub, so the modes do not share answers
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=60, headers={"Cache-Control": "no-store"}
+    ) as client:
+        for endpoint, arg in work:
+            before, fallbacks = totals(), FALLBACKS.total(endpoint=endpoint)
+            if endpoint == "match":
+                response = await client.post("/api/match", json=arg)
+            else:
+                response = await client.post(f"/api/{endpoint}", params={"count": arg})
+            response.raise_for_status()
+            after = totals()
+            entry = stats[endpoint]
+            entry["requests"] += 1
+            entry["fallbacks"] += FALLBACKS.total(endpoint=endpoint) > fallbacks
+            for name in ("calls", "tokens", "wasted"):
+                entry[name] += after[name] - before[name]
+            if endpoint != "match":
+                fallback = generators[endpoint].fallback
+                items = response.json()
+                entry["items"] += len(items)
+                entry["filler"] += sum(item == fallback(i) for i, item in enumerate(items))
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=40, help="requests per endpoint")
+    parser.add_argument("--malformed", type=float, default=0.3, help="share of free-form answers with a broken item")
+    args = parser.parse_args()
+    server.llm_backend = StubBackend(latency=0, tokens_per_second=0, jitter=0, malformed_rate=args.malformed)
+    work = workload(args.requests)
+
+    print(f"{args.requests} requests per endpoint, {args.malformed:.0%} of free-form answers malformed\n")
+    print(f"{'mode':<11} {'endpoint':<20} {'fallback':>9} {'filler':>7} {'calls/req':>10} "
+          f"{'tokens/req':>11} {'wasted/req':>11}")
+    for mode, (structured, salvage, retries) in MODES.items():
+        llm.LLM_STRUCTURED_OUTPUT, llm.LLM_SALVAGE, server.LLM_REMAINDER_RETRIES = structured, salvage, retries
+        stats = asyncio.run(run(work))
+        for endpoint, entry in stats.items():
+            n = entry["requests"]
+            filler = f"{entry['filler'] / entry['items']:.1%}" if entry["items"] else "-"
+            print(f"{mode:<11} {endpoint:<20} {entry['fallbacks'] / n:>9.1%} {filler:>7} "
+                  f"{entry['calls'] / n:>10.2f} {entry['tokens'] / n:>11.0f} {entry['wasted'] / n:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Backend calls and latency of the developer skill lookup tool, cached and batched or not.
+
+Loads a synthetic team into a temporary team store. Several agent threads
+then each make a series of lookups drawn from a small pool of queries, the
+way agents repeat themselves. Every backend call also sleeps
+``--backend-latency`` seconds, standing in for a remote service. The same
+workload runs three ways: straight to the backend, through the memoizing
+tool with no batching window, and with the window.
+
+    python benchmarks/tool_calls.py --agents 8 --calls 50 --distinct 40
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add the src directory to Python path
+src_dir = Path(__file__).resolve().parent.parent / "src"
+if src_dir.exists():
+    sys.path.insert(0, str(src_dir))
+
+from load_match import synthetic_payload
+
+SKILLS = [
+    "python", "django", "react", "typescript", "kubernetes", "terraform", "aws", "go", "rust", "node.js",
+    "postgresql", "graphql", "java", "spring", "docker", "machine learning", "swift", "kotlin", "vue", "redis",
+]
+
+
+def run(tool, queries, direct: bool) -> dict:
+    latencies = []
+    lock = threading.Lock()
+
+    def agent(calls):
+        for skills in calls:
+            started = time.perf_counter()
+            if direct:
+                tool._execute_batch([{"skills": skills, "limit": 5}])
+            else:
+                tool._run(skills=skills)
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=agent, args=(calls,)) for calls in queries]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {"wall": time.perf_counter() - started, "latencies": sorted(latencies)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--developers", type=int, default=500)
+    parser.add_argument("--agents", type=int, default=8, help="threads calling the tool at once")
+    parser.add_argument("--calls", type=int, default=50, help="lookups per agent")
+    parser.add_argument("--distinct", type=int, default=40, help="size of the query pool")
+    parser.add_argument("--backend-latency", type=float, default=0.02, help="seconds added to each backend call")
+    parser.add_argument("--window", type=float, default=0.01, help="batching window in seconds")
+    args = parser.parse_args()
+
+    # Removed at exit
+    tmp = tempfile.TemporaryDirectory()
+    os.environ["STORE_PATH"] = str(Path(tmp.name) / "store.db")
+    from ai_pops.api.models import Developer, Ticket
+    from ai_pops.services.store_service import get_store
+    from ai_pops.tools import DeveloperSkillLookupTool
+
+    class SlowLookup(DeveloperSkillLookupTool):
+        backend_calls: int = 0
+
+        def _execute_batch(self, calls):
+            self.backend_calls += 1
+            time.sleep(args.backend_latency)
+            return super()._execute_batch(calls)
+
+    payload = synthetic_payload(args.developers, 1, seed=1)
+    get_store().load([Developer(**d) for d in payload["developers"]], [Ticket(**t) for t in payload["tickets"]])
+
+    rng = random.Random(1)
+    pool = [", ".join(rng.sample(SKILLS, rng.randint(1, 3))) for _ in range(args.distinct)]
+    queries = [[rng.choice(pool) for _ in range(args.calls)] for _ in range(args.agents)]
+    print(f"{args.agents} agents x {args.calls} lookups from {args.distinct} distinct queries, "
+          f"{args.backend_latency * 1000:.0f} ms per backend call\n")
+    print(f"{'mode':<18} {'backend calls':>13} {'wall':>8} {'p50':>8} {'p99':>8}")
+    for label, tool, direct in (
+        ("direct", SlowLookup(), True),
+        ("cached", SlowLookup(batch_window=0), False),
+        ("cached + batched", SlowLookup(batch_window=args.window), False),
+    ):
+        result = run(tool, queries, direct)
+        latencies = result["latencies"]
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"{label:<18} {tool.backend_calls:>13} {result['wall'] * 1000:>6.0f}ms "
+              f"{statistics.median(latencies) * 1000:>6.1f}ms {p99 * 1000:>6.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+"""Chat-completion backends behind the AI Pops API.
+
+Three backends share one small interface (``name``, ``model``, ``complete``,
+``stream`` and ``aclose``). ``complete`` and ``stream`` take an optional
+``response_format`` (see ``ai_pops.api.schemas``) that constrains the answer
+to a JSON schema:
+
+- ``openai``: OpenAI's API, through a pooled ``AsyncOpenAI`` client.
+- ``local``: any OpenAI-compatible endpoint (vLLM, Ollama, llama.cpp server)
+  at ``LLM_BASE_URL``.
+- ``stub``: an in-process fake that answers the API's own prompts with
+  schema-valid JSON after a simulated delay, so load tests and benchmarks run
+  without network access or tokens.
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional
+
+from ai_pops.api.metrics import record_tokens
+from ai_pops.api.scheduler import scheduler
+
+if TYPE_CHECKING:
+    # openai (and httpx under it) take about a second to import, so they are
+    # only loaded once a client is actually built
+    import httpx
+    from openai import AsyncOpenAI
+
+# "openai", "local" or "stub"
+LLM_BACKEND = os.getenv("LLM_BACKEND", "openai")
+LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o-mini")
+# OpenAI-compatible endpoint used by the "local" backend
+LLM_BASE_URL = os.getenv("LLM_BASE_URL", "http://localhost:11434/v1")
+LLM_API_KEY = os.getenv("LLM_API_KEY", "local")
+
+# Connection pool shared by every OpenAI call made by this process
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "100"))
+OPENAI_MAX_KEEPALIVE = int(os.getenv("OPENAI_MAX_KEEPALIVE", "20"))
+# Per-request timeout in seconds for a single completion
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "60"))
+# Retries inside the SDK; 0 leaves them to the scheduler, which then sees
+# every 429 and can back off
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "0"))
+
+# Stub backend: median seconds to the first token, median output tokens per
+# second (0 = instant) and the log-normal spread applied to both
+STUB_LATENCY = float(os.getenv("STUB_LATENCY", "0.3"))
+STUB_TOKENS_PER_SECOND = float(os.getenv("STUB_TOKENS_PER_SECOND", "80"))
+STUB_JITTER = float(os.getenv("STUB_JITTER", "0.25"))
+# Concurrent calls the stub accepts before answering 429, like a provider
+# over its limit (0 = unlimited)
+STUB_MAX_CONCURRENCY = int(os.getenv("STUB_MAX_CONCURRENCY", "0"))
+# Share of free-form stub answers with one malformed item, like a model
+# that drops a comma; answers with a response_format are always well formed
+STUB_MALFORMED_RATE = float(os.getenv("STUB_MALFORMED_RATE", "0"))
+
+# Rough characters per token, for the stub's token accounting
+CHARS_PER_TOKEN = 4
+STUB_STREAM_CHUNK_TOKENS = 8
+
+
+def create_client(
+    api_key: str,
+    http_client: Optional["httpx.AsyncClient"] = None,
+    base_url: Optional[str] = None,
+) -> "AsyncOpenAI":
+    """Build an ``AsyncOpenAI`` client on a pooled HTTP connection."""
+    import httpx
+    from openai import AsyncOpenAI
+
+    if http_client is None:
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=OPENAI_MAX_KEEPALIVE,
+            ),
+            timeout=httpx.Timeout(OPENAI_TIMEOUT, connect=5.0),
+        )
+    return AsyncOpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        http_client=http_client,
+        timeout=OPENAI_TIMEOUT,
+        max_retries=OPENAI_MAX_RETRIES,
+    )
+
+
+class OpenAIBackend:
+    """Chat completions over the OpenAI API or an OpenAI-compatible server."""
+
+    def __init__(self, client: "AsyncOpenAI", model: str = LLM_MODEL, name: str = "openai"):
+        self.client = client
+        self.model = model
+        self.name = name
+
+    @staticmethod
+    def _format(response_format: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        return {"response_format": response_format} if response_format is not None else {}
+
+    async def complete(
+        self, prompt: str, temperature: float, max_tokens: int, response_format: Optional[Dict[str, Any]] = None
+    ) -> str:
+        raw = await self.client.chat.completions.with_raw_response.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout=OPENAI_TIMEOUT,
+            **self._format(response_format),
+        )
+        scheduler.observe(raw.headers)
+        response = await raw.parse()
+        if response.usage:
+            record_tokens(self.name, response.usage.prompt_tokens, response.usage.completion_tokens)
+        return response.choices[0].message.content
+
+    async def stream(
+        self, prompt: str, temperature: float, max_tokens: int, response_format: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        raw = await self.client.chat.completions.with_raw_response.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout=OPENAI_TIMEOUT,
+            **self._format(response_format),
+            stream=True,
+            # The last chunk then carries the token counts
+            stream_options={"include_usage": True},
+        )
+        scheduler.observe(raw.headers)
+        async for chunk in await raw.parse():
+            if chunk.usage:
+                record_tokens(self.name, chunk.usage.prompt_tokens, chunk.usage.completion_tokens)
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    async def aclose(self) -> None:
+        await self.client.close()
+
+
+FIRST_NAMES = ["Alice", "Bob", "Carmen", "Deepak", "Elena", "Farid", "Grace", "Hiro", "Ines", "Jonas",
+               "Kemi", "Lena", "Marco", "Nadia", "Omar", "Priya", "Quinn", "Rosa", "Sven", "Tariq"]
+LAST_NAMES = ["Smith", "Johnson", "Garcia", "Patel", "Kim", "Nguyen", "Müller", "Rossi", "Silva", "Cohen",
+              "Okafor", "Tanaka", "Novak", "Larsen", "Haddad", "Dubois", "Kowalski", "Reyes", "Ivanov", "Chen"]
+SKILLS = ["Python", "React", "JavaScript", "Java", "Spring", "MySQL", "Go", "Kubernetes",
+          "AWS", "Docker", "TypeScript", "Node.js", "PostgreSQL", "GraphQL", "Terraform"]
+TICKET_ACTIONS = ["Add", "Fix", "Refactor", "Speed up", "Migrate", "Document"]
+TICKET_SUBJECTS = ["login flow", "billing service", "search API", "dashboard", "CI pipeline",
+                   "notification worker", "user settings page", "report export"]
+
+
+class StubRateLimitError(Exception):
+    """The stub's 429, raised when more than ``max_concurrency`` calls are in flight."""
+
+    status_code = 429
+    retry_after = None
+
+
+class StubBackend:
+    """Deterministic fake LLM for load tests, benchmarks and offline development.
+
+    Recognises the API's match and generation prompts and answers them with
+    valid JSON: every ticket in a match prompt is given the developer whose
+    skills overlap it most, and generation prompts get the requested number of
+    developers or tickets. The same prompt and temperature always produce the
+    same answer and the same simulated delay. Delays are log-normal around
+    ``latency`` to the first token plus the answer's tokens at
+    ``tokens_per_second``; answers longer than ``max_tokens`` are cut off the
+    way a real model's would be. With ``max_concurrency`` set, calls beyond
+    that many at once fail with a 429 after a short delay. A share
+    ``malformed_rate`` of answers without a ``response_format`` has one item
+    with a missing comma; with one, the answer is ``{"items": [...]}``.
+    """
+
+    def __init__(
+        self,
+        latency: float = STUB_LATENCY,
+        tokens_per_second: float = STUB_TOKENS_PER_SECOND,
+        jitter: float = STUB_JITTER,
+        max_concurrency: int = STUB_MAX_CONCURRENCY,
+        malformed_rate: float = STUB_MALFORMED_RATE,
+    ):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.jitter = jitter
+        self.max_concurrency = max_concurrency
+        self.malformed_rate = malformed_rate
+        self.model = "stub"
+        self.name = "stub"
+        self.in_flight = 0
+        self.rejected = 0
+
+    @staticmethod
+    def _rng(prompt: str, temperature: float) -> random.Random:
+        digest = hashlib.sha256(f"{temperature}\0{prompt}".encode("utf-8")).digest()
+        return random.Random(int.from_bytes(digest[:8], "big"))
+
+    def _spread(self, rng: random.Random, median: float) -> float:
+        return median * math.exp(rng.gauss(0.0, self.jitter)) if self.jitter else median
+
+    def respond(
+        self, prompt: str, temperature: float, max_tokens: int, response_format: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """The stub's answer to ``prompt``, truncated to ``max_tokens``."""
+        rng = self._rng(prompt, temperature)
+        developers = re.search(r"DEVELOPERS: (\[.*\])", prompt)
+        tickets = re.search(r"TICKETS: (\[.*\])", prompt)
+        compact = [re.search(rf"^{name}: (\[.*\])$", prompt, re.M) for name in ("SKILLS", "DEVS", "TASKS")]
+        count = re.search(r"Generate (\d+) realistic software (developer|development)", prompt)
+        if developers and tickets:
+            items = stub_assignments(json.loads(developers.group(1)), json.loads(tickets.group(1)), rng)
+        elif all(compact):
+            skills, devs, tasks = (json.loads(match.group(1)) for match in compact)
+            items = stub_compact_assignments(skills, devs, tasks, "reason in" in prompt, rng)
+        elif count and count.group(2) == "developer":
+            items = [stub_developer(rng) for _ in range(int(count.group(1)))]
+        elif count:
+            first = re.search(r"from TASK-(\d+)", prompt)
+            offset = int(first.group(1)) - 1 if first else 0
+            items = [stub_ticket(rng, offset + i) for i in range(int(count.group(1)))]
+        else:
+            items = []
+        if response_format is not None:
+            text = json.dumps({"items": items})
+        elif items and rng.random() < self.malformed_rate:
+            pieces = [json.dumps(item) for item in items]
+            broken = rng.randrange(len(pieces))
+            pieces[broken] = pieces[broken].replace(",", "", 1)
+            text = "[" + ", ".join(pieces) + "]"
+        else:
+            text = json.dumps(items)
+        return text[: max_tokens * CHARS_PER_TOKEN]
+
+    def _timing(self, prompt: str, temperature: float):
+        """(seconds to first token, seconds per output token) for one answer."""
+        rng = self._rng(f"timing\0{prompt}", temperature)
+        first = self._spread(rng, self.latency)
+        per_token = 1.0 / self._spread(rng, self.tokens_per_second) if self.tokens_per_second else 0.0
+        return first, per_token
+
+    def _record_tokens(self, prompt: str, text: str) -> None:
+        record_tokens(self.name, len(prompt) // CHARS_PER_TOKEN, len(text) // CHARS_PER_TOKEN)
+
+    async def _admit(self) -> None:
+        if self.max_concurrency and self.in_flight >= self.max_concurrency:
+            self.rejected += 1
+            await asyncio.sleep(self.latency / 10)
+            raise StubRateLimitError(f"stub is at its limit of {self.max_concurrency} concurrent calls")
+        self.in_flight += 1
+
+    async def complete(
+        self, prompt: str, temperature: float, max_tokens: int, response_format: Optional[Dict[str, Any]] = None
+    ) -> str:
+        await self._admit()
+        try:
+            text = self.respond(prompt, temperature, max_tokens, response_format)
+            first, per_token = self._timing(prompt, temperature)
+            await asyncio.sleep(first + per_token * len(text) / CHARS_PER_TOKEN)
+        finally:
+            self.in_flight -= 1
+        self._record_tokens(prompt, text)
+        return text
+
+    async def stream(
+        self, prompt: str, temperature: float, max_tokens: int, response_format: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        await self._admit()
+        try:
+            text = self.respond(prompt, temperature, max_tokens, response_format)
+            first, per_token = self._timing(prompt, temperature)
+            await asyncio.sleep(first)
+            step = STUB_STREAM_CHUNK_TOKENS * CHARS_PER_TOKEN
+            for start in range(0, len(text), step):
+                piece = text[start:start + step]
+                if per_token:
+                    await asyncio.sleep(per_token * len(piece) / CHARS_PER_TOKEN)
+                yield piece
+        finally:
+            self.in_flight -= 1
+        self._record_tokens(prompt, text)
+
+    async def aclose(self) -> None:
+        pass
+
+
+def stub_assignments(developers: List[Dict[str, Any]], tickets: List[Dict[str, Any]], rng: random.Random):
+    """Give each ticket the developer with the most skills mentioned in it."""
+    assignments = []
+    for ticket in tickets:
+        text = f"{ticket.get('title', '')} {ticket.get('description', '')}".lower()
+        overlaps = [sum(skill.lower() in text for skill in d.get("skills", [])) for d in developers]
+        best = max(overlaps)
+        chosen = rng.choice([d for d, overlap in zip(developers, overlaps) if overlap == best])
+        assignments.append({
+            "ticketId": ticket["id"],
+            "developerName": chosen["name"],
+            "reason": f"{best} matching skill(s)" if best else "Closest available developer",
+            "matchScore": round(min(99.0, 55.0 + 15.0 * best + rng.uniform(0, 5)), 1),
+        })
+    return assignments
+
+
+def stub_compact_assignments(
+    skills: List[str], devs: List[list], tasks: List[list], with_reasons: bool, rng: random.Random
+) -> List[list]:
+    """``stub_assignments`` for a compact prompt, answered with id tuples."""
+    developers = [{"name": dev[0], "skills": [skills[s] for s in dev[1]]} for dev in devs]
+    tickets = [{"id": task[0], "title": task[1]} for task in tasks]
+    return [
+        [a["ticketId"], a["developerName"], a["matchScore"]] + ([a["reason"]] if with_reasons else [])
+        for a in stub_assignments(developers, tickets, rng)
+    ]
+
+
+def stub_developer(rng: random.Random) -> Dict[str, Any]:
+    skills = rng.sample(SKILLS, 3)
+    years = rng.randint(1, 15)
+    return {
+        "name": f"{rng.choice(FIRST_NAMES)} {chr(ord('A') + rng.randrange(26))}. {rng.choice(LAST_NAMES)}",
+        "skills": skills,
+        "experience_years": years,
+        "profile_summary": f"{skills[0]} developer with {years} year{'s' if years != 1 else ''} of experience in {skills[1]} and {skills[2]}",
+    }
+
+
+def stub_ticket(rng: random.Random, i: int) -> Dict[str, Any]:
+    subject = rng.choice(TICKET_SUBJECTS)
+    return {
+        "id": f"TASK-{i + 1:03d}",
+        "title": f"{rng.choice(TICKET_ACTIONS)} {subject}",
+        "description": f"Update the {subject} using {rng.choice(SKILLS)} and cover it in {rng.choice(SKILLS)}",
+    }
+
+
+def create_backend(kind: str = LLM_BACKEND):
+    """The backend named by ``kind``, or ``None`` when it is not configured."""
+    if kind == "openai":
+        api_key = os.getenv("OPENAI_API_KEY")
+        return OpenAIBackend(create_client(api_key), model=LLM_MODEL) if api_key else None
+    if kind == "local":
+        return OpenAIBackend(create_client(LLM_API_KEY, base_url=LLM_BASE_URL), model=LLM_MODEL, name="local")
+    if kind == "stub":
+        return StubBackend()
+    raise ValueError(f"Unknown LLM_BACKEND '{kind}', expected openai, local or stub")
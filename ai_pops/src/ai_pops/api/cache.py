@@ -0,0 +1,220 @@
+"""Content-addressed cache for LLM completions.
+
+Entries are keyed on a hash of everything that determines a completion
+(model, prompt, temperature, max_tokens and any response format). A bounded in-memory LRU sits in
+front of an optional, row-capped SQLite file that survives restarts.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "1024"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "3600"))
+# Leave unset to keep the cache in memory only
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "")
+# Rows kept in the SQLite file; the oldest go first
+LLM_CACHE_MAX_ROWS = int(os.getenv("LLM_CACHE_MAX_ROWS", "100000"))
+# Disk writes between trims of the SQLite file
+_TRIM_INTERVAL = 100
+
+
+def cache_key(
+    model: str, prompt: str, temperature: float, max_tokens: int, response_format: Optional[Dict[str, Any]] = None
+) -> str:
+    """Canonical hash of a completion request."""
+    request = {"model": model, "prompt": prompt, "temperature": temperature, "max_tokens": max_tokens}
+    if response_format is not None:
+        # Left out otherwise, so free-form entries keep their keys
+        request["response_format"] = response_format
+    canonical = json.dumps(
+        request,
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Two-tier (memory LRU + optional SQLite) cache with a TTL.
+
+    ``get`` and ``set`` block on the disk tier; async callers use ``aget``
+    and ``aset``, which do the SQLite I/O in a thread. The disk tier holds
+    about ``max_rows`` entries: every ``_TRIM_INTERVAL`` writes, expired
+    rows are dropped and then the oldest rows over the limit.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = LLM_CACHE_SIZE,
+        ttl: float = LLM_CACHE_TTL,
+        path: str = "",
+        max_rows: int = LLM_CACHE_MAX_ROWS,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+        self.expirations = 0
+        self._db = None
+        # Held for SQLite calls only, so memory hits never wait on the disk
+        self._db_lock = threading.Lock()
+        self._writes = 0
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS llm_cache_expires ON llm_cache (expires_at)")
+            with self._db_lock:
+                self._trim()
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._memory_get(key)
+        if value is None and self._db is not None:
+            value = self._disk_get(key)
+        if value is None:
+            self._miss()
+        return value
+
+    async def aget(self, key: str) -> Optional[str]:
+        """``get`` that reads the disk tier in a thread."""
+        value = self._memory_get(key)
+        if value is None and self._db is not None:
+            value = await asyncio.to_thread(self._disk_get, key)
+        if value is None:
+            self._miss()
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, expires_at, value)
+        if self._db is not None:
+            self._disk_set(key, value, expires_at)
+
+    async def aset(self, key: str, value: str) -> None:
+        """``set`` that writes the disk tier in a thread."""
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, expires_at, value)
+        if self._db is not None:
+            await asyncio.to_thread(self._disk_set, key, value, expires_at)
+
+    def _memory_get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+            self.expirations += 1
+            return None
+
+    def _disk_get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._db_lock:
+            row = self._db.execute("SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[1] <= now:
+                self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+        if row is None:
+            return None
+        with self._lock:
+            if row[1] <= now:
+                self.expirations += 1
+                return None
+            self._remember(key, row[1], row[0])
+            self.hits += 1
+            self.disk_hits += 1
+        return row[0]
+
+    def _disk_set(self, key: str, value: str, expires_at: float) -> None:
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at),
+            )
+            self._writes += 1
+            if self._writes % _TRIM_INTERVAL == 0:
+                self._trim()
+
+    def _trim(self) -> None:
+        """Drop expired rows, then the oldest rows over ``max_rows``; the caller holds ``_db_lock``."""
+        expired = self._db.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),)).rowcount
+        surplus = self._db.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] - self.max_rows
+        evicted = 0
+        if surplus > 0:
+            evicted = self._db.execute(
+                "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY expires_at LIMIT ?)",
+                (surplus,),
+            ).rowcount
+        with self._lock:
+            self.expirations += expired
+            self.disk_evictions += evicted
+
+    def _miss(self) -> None:
+        with self._lock:
+            self.misses += 1
+
+    def _remember(self, key: str, expires_at: float, value: str) -> None:
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM llm_cache")
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "persistent": self._db is not None,
+                "max_rows": self.max_rows,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "disk_evictions": self.disk_evictions,
+                "expirations": self.expirations,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+response_cache = ResponseCache(path=LLM_CACHE_PATH)
+
+
+def bypasses_cache(cache_control: Optional[str]) -> Tuple[bool, bool]:
+    """Read a Cache-Control header into ``(skip_read, skip_write)``."""
+    if not cache_control:
+        return False, False
+    directives = {d.strip().lower() for d in cache_control.split(",")}
+    no_store = "no-store" in directives
+    return no_store or "no-cache" in directives, no_store
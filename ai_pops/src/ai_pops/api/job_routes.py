@@ -0,0 +1,64 @@
+"""Endpoints for background jobs: long matches and crew runs.
+
+Submitting returns ``202 Accepted`` with the queued job at once; clients
+poll ``GET /api/jobs/{id}`` for its progress and result instead of holding
+a connection open for the whole run.
+"""
+
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Response
+
+from ai_pops.api.jobs import job_workers
+from ai_pops.api.models import CrewJobRequest, Job, MatchRequest
+from ai_pops.services.job_service import get_job_queue
+
+router = APIRouter(prefix="/api/jobs")
+
+
+def _queued(kind: str, payload: dict, priority: int, response: Response) -> Job:
+    job = get_job_queue().submit(kind, payload, priority)
+    job_workers.wake()
+    response.headers["Location"] = f"/api/jobs/{job['id']}"
+    return Job(**job)
+
+
+@router.post("/match", response_model=Job, status_code=202)
+def submit_match(request: MatchRequest, response: Response, priority: int = 0):
+    """Queue a match; its result is ``{"strategy": ..., "assignments": [...]}``."""
+    return _queued("match", request.model_dump(), priority, response)
+
+
+@router.post("/crew", response_model=Job, status_code=202)
+def submit_crew(request: CrewJobRequest, response: Response, priority: int = 0):
+    """Queue a crew run; its result is ``{"report": ..., "output": ...}``."""
+    return _queued("crew", request.model_dump(), priority, response)
+
+
+@router.get("", response_model=List[Job])
+def list_jobs(status: Optional[str] = None, limit: int = Query(default=50, ge=1, le=1000)):
+    """Most recent jobs first."""
+    return get_job_queue().list_jobs(status, limit)
+
+
+@router.get("/stats")
+def job_stats():
+    """Jobs per status in the shared queue, and this process's workers."""
+    return job_workers.stats()
+
+
+@router.get("/{job_id}", response_model=Job)
+def get_job(job_id: str):
+    job = get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return job
+
+
+@router.post("/{job_id}/cancel", response_model=Job)
+def cancel_job(job_id: str):
+    """Cancel a queued job at once; a running one stops within ``JOB_HEARTBEAT`` seconds."""
+    job = get_job_queue().cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return job
@@ -0,0 +1,218 @@
+"""Worker pool running queued jobs inside the API process.
+
+``JOB_WORKERS`` asyncio workers per process claim jobs from the durable
+queue (``services.job_service``) and run them with the handler registered
+for their kind. So the number of jobs running at once is capped by the
+workers, however many clients are waiting on results. While a job runs, its
+worker renews the lease every ``JOB_HEARTBEAT`` seconds and checks whether
+the job was cancelled. A cancelled job's handler is cancelled. On shutdown,
+running jobs go back to the queue for the next process to pick up. Queue
+calls are blocking SQLite writes that may wait on other processes' locks,
+so they run in a thread, off the event loop.
+
+Crew jobs run in a spawned child process, like ``batch.py`` runs, so a
+crew can be cancelled by terminating its process. Its progress (tasks
+finished) comes back over a pipe.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import time
+import traceback
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from ai_pops.api.metrics import JOB_DURATION, JOBS
+from ai_pops.services.job_service import CANCELLED, DONE, FAILED, get_job_queue
+
+# Jobs run at once by each API process (0 = this process only queues them)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Seconds between lease renewals / cancellation checks of a running job, and
+# between queue polls when idle (submits in this process wake workers at once)
+JOB_HEARTBEAT = float(os.getenv("JOB_HEARTBEAT", "5"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1"))
+# Reports written by crew jobs
+JOB_OUTPUT_DIR = os.getenv("JOB_OUTPUT_DIR", "output/jobs")
+
+Progress = Callable[[float, Optional[str]], None]
+Handler = Callable[[Dict[str, Any], Progress], Awaitable[Any]]
+
+
+class JobWorkers:
+    """Claim jobs from the queue and run them with the handler for their kind."""
+
+    def __init__(self, workers: int = JOB_WORKERS, queue_factory=get_job_queue):
+        self.workers = workers
+        self.queue_factory = queue_factory
+        self.handlers: Dict[str, Handler] = {}
+        self.running: Dict[str, Dict[str, Any]] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def register(self, kind: str, handler: Handler) -> None:
+        """Run jobs of ``kind`` with ``await handler(job, progress)``; its return value is the result."""
+        self.handlers[kind] = handler
+
+    def wake(self) -> None:
+        """Tell idle workers a job was just queued; safe to call from any thread."""
+        if self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def start(self) -> None:
+        if self._tasks or not self.workers:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._wakeup = None
+
+    async def _work(self) -> None:
+        queue = self.queue_factory()
+        while True:
+            job = await asyncio.to_thread(queue.claim, list(self.handlers))
+            if job is None:
+                await asyncio.to_thread(queue.purge)
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), JOB_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(queue, job)
+
+    async def _run(self, queue, job: Dict[str, Any]) -> None:
+        job_id, kind = job["id"], job["kind"]
+        self.running[job_id] = job
+        started = time.perf_counter()
+        task = asyncio.create_task(self.handlers[kind](job, _progress_writer(queue, job_id)))
+        try:
+            while not task.done():
+                await asyncio.wait({task}, timeout=JOB_HEARTBEAT)
+                if not task.done() and await asyncio.to_thread(queue.heartbeat, job_id):
+                    task.cancel()
+                    await asyncio.wait({task})
+            if task.cancelled():
+                status = CANCELLED if await asyncio.to_thread(queue.mark_cancelled, job_id) else None
+            elif task.exception() is not None:
+                error = task.exception()
+                message = "".join(traceback.format_exception_only(type(error), error)).strip()
+                await asyncio.to_thread(queue.fail, job_id, message)
+                status = FAILED
+            else:
+                await asyncio.to_thread(queue.finish, job_id, task.result())
+                status = DONE
+        except asyncio.CancelledError:
+            # Shutting down: stop the job and leave it for another worker
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            await asyncio.to_thread(queue.release, job_id)
+            raise
+        finally:
+            del self.running[job_id]
+        if status:
+            JOBS.inc(kind=kind, status=status)
+            JOB_DURATION.observe(time.perf_counter() - started, kind=kind)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._tasks),
+            "kinds": sorted(self.handlers),
+            "running_here": sorted(self.running),
+            "queue": self.queue_factory().stats(),
+        }
+
+
+def _progress_writer(queue, job_id: str) -> Progress:
+    """A job's ``progress`` callback: writes the latest report in a thread, one write at a time.
+
+    Reports made while a write is in flight are coalesced, keeping the last
+    fraction and the last message, so the latest report always lands last.
+    """
+    latest: List[tuple] = []
+    writer: Optional[asyncio.Task] = None
+
+    async def write() -> None:
+        while latest:
+            fraction, message = latest.pop()
+            await asyncio.to_thread(queue.progress, job_id, fraction, message)
+
+    def report(fraction: float, message: Optional[str] = None) -> None:
+        nonlocal writer
+        if message is None and latest:
+            message = latest[0][1]
+        latest[:] = [(fraction, message)]
+        if writer is None or writer.done():
+            writer = asyncio.create_task(write())
+
+    return report
+
+
+job_workers = JobWorkers()
+
+
+def crew_job_process(inputs: Dict[str, Any], output: str, progress) -> None:
+    """Child process of a crew job: run the crew, sending progress and the outcome over ``progress``."""
+    try:
+        from ai_pops.crew import AiPops
+
+        crew = AiPops(report_path=output).crew()
+        total = len(crew.tasks)
+        finished = 0
+
+        def task_done(_output) -> None:
+            nonlocal finished
+            finished += 1
+            progress.send(("progress", finished / total, f"{finished}/{total} tasks done"))
+
+        crew.task_callback = task_done
+        result = crew.kickoff(inputs=inputs)
+        progress.send(("done", {"report": result.raw, "output": output}))
+    except Exception:
+        progress.send(("failed", traceback.format_exc(limit=3)))
+    finally:
+        progress.close()
+
+
+async def run_crew_job(job: Dict[str, Any], progress: Progress) -> Any:
+    """Run ``AiPops().crew().kickoff`` for a crew job in its own process."""
+    from ai_pops.batch import report_path
+
+    inputs = {"current_year": str(datetime.now().year), **job["payload"]["inputs"]}
+    os.makedirs(JOB_OUTPUT_DIR, exist_ok=True)
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(
+        target=crew_job_process, args=(inputs, report_path(JOB_OUTPUT_DIR, job["id"]), sender), daemon=True
+    )
+    process.start()
+    sender.close()
+    progress(0.0, "crew started")
+    try:
+        while True:
+            while receiver.poll():
+                try:
+                    message = receiver.recv()
+                except EOFError:
+                    raise RuntimeError(f"crew process exited with code {process.exitcode}")
+                if message[0] == "progress":
+                    progress(message[1], message[2])
+                elif message[0] == "done":
+                    return message[1]
+                else:
+                    raise RuntimeError(message[1])
+            if not process.is_alive() and not receiver.poll():
+                raise RuntimeError(f"crew process exited with code {process.exitcode}")
+            await asyncio.sleep(JOB_POLL_INTERVAL)
+    finally:
+        if process.is_alive():
+            process.terminate()
+        await asyncio.to_thread(process.join)
+        receiver.close()
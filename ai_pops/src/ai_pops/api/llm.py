@@ -0,0 +1,256 @@
+"""Request admission and cached completions for the AI Pops API.
+
+The completion helpers take any backend from ``ai_pops.api.backends`` and
+run each call through the LLM ``scheduler`` at the given priority.
+
+Answers are JSON arrays, decoded with orjson. When the caller passes a
+``response_format`` (and ``LLM_STRUCTURED_OUTPUT`` is on) the backend is
+held to that schema. An answer cut short by ``max_tokens``, or with a
+malformed item, is salvaged rather than thrown away: every complete item is
+kept, and the caller asks again for just the items still missing. How each
+answer decoded is counted in ``ai_pops_llm_parse_total`` and the tokens
+thrown away in ``ai_pops_llm_wasted_tokens_total``.
+"""
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Tuple
+
+import orjson
+from fastapi import HTTPException
+
+from ai_pops.api.backends import CHARS_PER_TOKEN
+from ai_pops.api.cache import bypasses_cache, cache_key, response_cache
+from ai_pops.api.metrics import LLM_CACHE, LLM_PARSE, LLM_WASTED_TOKENS, stage
+from ai_pops.api.scheduler import PRIORITY_GENERATE, scheduler
+from ai_pops.api.singleflight import singleflight
+from ai_pops.api.streaming import JSONArrayStreamParser
+
+# Requests allowed to wait on the LLM at once, and how long a request may
+# wait for a slot before it is turned away with a 503
+API_MAX_CONCURRENCY = int(os.getenv("API_MAX_CONCURRENCY", "256"))
+API_QUEUE_TIMEOUT = float(os.getenv("API_QUEUE_TIMEOUT", "2.0"))
+# Ask backends for JSON that follows each call's schema (0 sends prompts only)
+LLM_STRUCTURED_OUTPUT = os.getenv("LLM_STRUCTURED_OUTPUT", "1") == "1"
+# Keep the complete items of a truncated or malformed answer (0 drops the
+# whole answer and falls back, as the API used to)
+LLM_SALVAGE = os.getenv("LLM_SALVAGE", "1") == "1"
+# Calls that ask again for the items an answer was missing before the
+# remainder comes from the fallback
+LLM_REMAINDER_RETRIES = int(os.getenv("LLM_REMAINDER_RETRIES", "2"))
+
+
+class ConcurrencyLimiter:
+    """Bounded admission: excess requests get a 503 instead of an unbounded queue."""
+
+    def __init__(self, limit: int, queue_timeout: float):
+        self.limit = limit
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(limit)
+
+    async def acquire(self) -> None:
+        """Wait for a slot, or raise a 503 once ``queue_timeout`` has passed."""
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise HTTPException(
+                status_code=503,
+                detail="Server is at capacity, please retry",
+                headers={"Retry-After": "1"},
+            )
+
+    def release(self) -> None:
+        self._semaphore.release()
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+
+limiter = ConcurrencyLimiter(API_MAX_CONCURRENCY, API_QUEUE_TIMEOUT)
+
+
+def parse_json_response(result_text: str) -> Any:
+    """Strip markdown code fences from a completion and decode the JSON."""
+    if "```json" in result_text:
+        result_text = result_text.split("```json")[1].split("```")[0]
+    elif "```" in result_text:
+        result_text = result_text.split("```")[1].split("```")[0]
+    return orjson.loads(result_text.strip())
+
+
+def decode_items(text: str, salvage: bool = True) -> Tuple[Any, bool, int]:
+    """The JSON array in a completion, whether it decoded cleanly, and the characters wasted.
+
+    A ``{"items": [...]}`` answer (see ``ai_pops.api.schemas``) is unwrapped.
+    With ``salvage``, an answer that does not decode keeps every complete
+    item; the wasted characters are its unfinished tail and malformed items.
+    Raises ``ValueError`` when nothing can be recovered.
+    """
+    try:
+        result = parse_json_response(text)
+    except ValueError:
+        if not salvage:
+            raise
+        parser = JSONArrayStreamParser()
+        items = parser.feed(text)
+        if not items:
+            raise
+        return items, False, len(text) - parser.consumed + parser.dropped
+    if isinstance(result, dict) and isinstance(result.get("items"), list):
+        result = result["items"]
+    return result, True, 0
+
+
+def structured(response_format: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """``response_format``, unless structured output is turned off."""
+    return response_format if LLM_STRUCTURED_OUTPUT else None
+
+
+def _record_decode(result: str, wasted_chars: int) -> None:
+    LLM_PARSE.inc(result=result)
+    if wasted_chars >= CHARS_PER_TOKEN:
+        LLM_WASTED_TOKENS.inc(wasted_chars // CHARS_PER_TOKEN)
+
+
+async def _cache_lookup(key: str, skip_read: bool) -> Optional[str]:
+    if skip_read:
+        LLM_CACHE.inc(result="bypass")
+        return None
+    cached = await response_cache.aget(key)
+    LLM_CACHE.inc(result="miss" if cached is None else "hit")
+    return cached
+
+
+def _reservation(prompt: str, max_tokens: int) -> int:
+    """Tokens a call may use at most, taken from the rate budget up front."""
+    return len(prompt) // CHARS_PER_TOKEN + max_tokens
+
+
+def _join(key: str, produce: Callable[[], AsyncIterator[str]], skip_read: bool) -> Tuple[AsyncIterator[str], bool]:
+    """Coalesce with an identical call in flight, unless the request wants its own answer."""
+    if skip_read:
+        return produce(), True
+    return singleflight.join(key, produce)
+
+
+async def complete_json(
+    backend,
+    prompt: str,
+    temperature: float,
+    max_tokens: int,
+    cache_control: Optional[str] = None,
+    priority: int = PRIORITY_GENERATE,
+    deadline: Optional[float] = None,
+    response_format: Optional[Dict[str, Any]] = None,
+) -> Any:
+    """Cached, coalesced completion decoded as JSON (see ``decode_items``).
+
+    A truncated or malformed answer comes back as the items that survived,
+    and only completions that decode cleanly are cached, so a damaged answer
+    is never served again. ``cache_control`` is the request's Cache-Control
+    header; ``deadline`` (``time.monotonic()``) bounds queueing and retries.
+    ``response_format`` is passed through ``structured``. Identical calls
+    already in flight are joined rather than repeated (see ``singleflight``);
+    the one that started the call stores the answer.
+    """
+    response_format = structured(response_format)
+    skip_read, skip_write = bypasses_cache(cache_control)
+    key = cache_key(backend.model, prompt, temperature, max_tokens, response_format)
+    cached = await _cache_lookup(key, skip_read)
+    if cached is not None:
+        return decode_items(cached)[0]
+
+    async def call():
+        with stage("llm_call", backend=backend.name):
+            return await backend.complete(prompt, temperature, max_tokens, response_format)
+
+    async def produce():
+        reserved = _reservation(prompt, max_tokens)
+        text = await scheduler.run(call, priority=priority, tokens=reserved, deadline=deadline)
+        scheduler.settle(reserved, (len(prompt) + len(text)) // CHARS_PER_TOKEN)
+        yield text
+
+    pieces, leader = _join(key, produce, skip_read)
+    result_text = "".join([piece async for piece in pieces])
+    with stage("parse"):
+        try:
+            result, clean, wasted = decode_items(result_text, LLM_SALVAGE)
+        except ValueError:
+            if leader:
+                _record_decode("failed", len(result_text))
+            raise
+    if leader:
+        _record_decode("clean" if clean else "salvaged", wasted)
+        if clean and not skip_write:
+            await response_cache.aset(key, result_text)
+    return result
+
+
+async def stream_json_items(
+    backend,
+    prompt: str,
+    temperature: float,
+    max_tokens: int,
+    cache_control: Optional[str] = None,
+    priority: int = PRIORITY_GENERATE,
+    deadline: Optional[float] = None,
+    response_format: Optional[Dict[str, Any]] = None,
+) -> AsyncIterator[Any]:
+    """Yield each object of the completion's JSON array as soon as it is complete.
+
+    Shares the cache and in-flight calls with ``complete_json``: a hit replays
+    the stored array, a caller joining a call in flight gets its deltas from
+    the start, and a stream whose array closed with every item intact is
+    stored for later requests. A stream cut short simply ends after its last
+    complete item.
+    """
+    response_format = structured(response_format)
+    skip_read, skip_write = bypasses_cache(cache_control)
+    key = cache_key(backend.model, prompt, temperature, max_tokens, response_format)
+    cached = await _cache_lookup(key, skip_read)
+    if cached is not None:
+        for item in decode_items(cached)[0]:
+            yield item
+        return
+
+    async def produce():
+        reserved = _reservation(prompt, max_tokens)
+        received = 0
+        try:
+            async for delta in scheduler.stream(
+                lambda: backend.stream(prompt, temperature, max_tokens, response_format),
+                priority=priority, tokens=reserved, deadline=deadline,
+            ):
+                received += len(delta)
+                yield delta
+        finally:
+            if received:
+                scheduler.settle(reserved, (len(prompt) + received) // CHARS_PER_TOKEN)
+
+    parser = JSONArrayStreamParser()
+    pieces = []
+    yielded = 0
+    deltas, leader = _join(key, produce, skip_read)
+    # Includes the time the consumer spends on each item between deltas
+    with stage("llm_stream", backend=backend.name):
+        async for delta in deltas:
+            pieces.append(delta)
+            for item in parser.feed(delta):
+                yielded += 1
+                yield item
+    if not leader:
+        return
+    clean = parser.complete and not parser.dropped
+    if clean:
+        _record_decode("clean", 0)
+        if not skip_write:
+            await response_cache.aset(key, "".join(pieces))
+    else:
+        received = sum(len(piece) for piece in pieces)
+        _record_decode("salvaged" if yielded else "failed", received - parser.consumed + parser.dropped)
@@ -0,0 +1,263 @@
+"""Request metrics for the AI Pops API, exposed in Prometheus text format.
+
+Counters and histograms are kept in process and rendered by ``GET /metrics``.
+``stage`` times one step of a request (prompt building, the LLM call,
+parsing, the solver, ...) into ``ai_pops_stage_duration_seconds`` and, when
+``OTEL_EXPORTER_OTLP_ENDPOINT`` is set, also emits it as an OpenTelemetry
+span to that collector.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# OTLP/HTTP collector for spans, e.g. http://localhost:4318; unset disables tracing
+OTEL_EXPORTER_OTLP_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "")
+OTEL_SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "ai-pops-api")
+
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def total(self, **labels: str) -> float:
+        """Sum over every label set that matches ``labels``."""
+        wanted = [(self.labelnames.index(name), str(value)) for name, value in labels.items()]
+        with self._lock:
+            return sum(v for key, v in self._values.items() if all(key[i] == value for i, value in wanted))
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, key)} {_number(value)}" for key, value in values]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DURATION_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # label values -> (count per bucket, +Inf count, sum)
+        self._values: Dict[LabelValues, Tuple[List[int], int, float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            counts, total, summed = self._values.get(key) or ([0] * len(self.buckets), 0, 0.0)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + 1, summed + value)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, (list(counts), total, summed)) for key, (counts, total, summed) in self._values.items())
+        lines = []
+        for key, (counts, total, summed) in values:
+            for bound, count in zip(self.buckets, counts):
+                le = _labels(self.labelnames, key, f'le="{_number(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {count}")
+            le = _labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {total}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(summed)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {total}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: List = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+registry = Registry()
+HTTP_REQUESTS = registry.register(Counter(
+    "ai_pops_http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"),
+))
+HTTP_DURATION = registry.register(Histogram(
+    "ai_pops_http_request_duration_seconds", "Time to serve a request, by route.", ("method", "route"),
+))
+STAGE_DURATION = registry.register(Histogram(
+    "ai_pops_stage_duration_seconds", "Time spent in each stage of a request.", ("stage",),
+))
+LLM_TOKENS = registry.register(Counter(
+    "ai_pops_llm_tokens_total", "Tokens reported by the LLM backend.", ("backend", "kind"),
+))
+LLM_CACHE = registry.register(Counter(
+    "ai_pops_llm_cache_total", "LLM response cache lookups by result.", ("result",),
+))
+LLM_COALESCED = registry.register(Counter(
+    "ai_pops_llm_coalesced_total",
+    "LLM calls that started an upstream call (leader) or joined one in flight (follower).", ("role",),
+))
+LLM_PARSE = registry.register(Counter(
+    "ai_pops_llm_parse_total",
+    "LLM answers by how they decoded (clean, salvaged or failed).", ("result",),
+))
+LLM_WASTED_TOKENS = registry.register(Counter(
+    "ai_pops_llm_wasted_tokens_total",
+    "Completion tokens paid for but thrown away: truncated tails and malformed items.",
+))
+FALLBACKS = registry.register(Counter(
+    "ai_pops_fallback_total", "Requests or chunks served by a fallback, by cause.", ("endpoint", "reason"),
+))
+JOBS = registry.register(Counter(
+    "ai_pops_jobs_total", "Jobs run by this process, by kind and outcome.", ("kind", "status"),
+))
+JOB_DURATION = registry.register(Histogram(
+    "ai_pops_job_duration_seconds", "Time from claiming a job to its outcome, by kind.", ("kind",),
+    buckets=(0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0),
+))
+TOOL_CALLS = registry.register(Counter(
+    "ai_pops_tool_calls_total", "Crew tool calls by tool and result (hit, miss, joined, error).", ("tool", "result"),
+))
+TOOL_DURATION = registry.register(Histogram(
+    "ai_pops_tool_duration_seconds", "Time to answer a crew tool call, by tool.", ("tool",),
+))
+TOOL_BATCH_SIZE = registry.register(Histogram(
+    "ai_pops_tool_batch_size", "Tool calls answered by one backend call, by tool.", ("tool",),
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+))
+
+
+_tracer = None
+_tracer_lock = threading.Lock()
+
+
+def setup_tracing() -> None:
+    """Send stage spans to the OTLP collector, if one is configured."""
+    global _tracer
+    if not OTEL_EXPORTER_OTLP_ENDPOINT:
+        return
+    with _tracer_lock:
+        if _tracer is not None:
+            return
+        # Imported here so the server only pays for OpenTelemetry when it is used
+        from opentelemetry import trace
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+        provider = TracerProvider(resource=Resource.create({"service.name": OTEL_SERVICE_NAME}))
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+        trace.set_tracer_provider(provider)
+        _tracer = trace.get_tracer("ai_pops.api")
+
+
+def shutdown_tracing() -> None:
+    if _tracer is not None:
+        from opentelemetry import trace
+
+        trace.get_tracer_provider().shutdown()
+
+
+@contextmanager
+def stage(name: str, **attributes):
+    """Time a block as stage ``name``; also an OpenTelemetry span when tracing is on."""
+    span = _tracer.start_as_current_span(name, attributes=attributes) if _tracer else nullcontext()
+    started = time.perf_counter()
+    with span:
+        try:
+            yield
+        finally:
+            STAGE_DURATION.observe(time.perf_counter() - started, stage=name)
+
+
+def record_tokens(backend: str, prompt_tokens: Optional[int], completion_tokens: Optional[int]) -> None:
+    if prompt_tokens:
+        LLM_TOKENS.inc(prompt_tokens, backend=backend, kind="prompt")
+    if completion_tokens:
+        LLM_TOKENS.inc(completion_tokens, backend=backend, kind="completion")
+
+
+def record_fallback(endpoint: str, error: Optional[BaseException] = None, reason: str = "") -> None:
+    """Count one fallback, tagged with the exception type that caused it (or ``reason``)."""
+    FALLBACKS.inc(endpoint=endpoint, reason=type(error).__name__ if error is not None else reason)
+
+
+class MetricsMiddleware:
+    """ASGI middleware counting and timing every HTTP request by route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The template, not the raw path, so /api/tickets/{ticket_id} is one series
+            route = getattr(scope.get("route"), "path", "unmatched")
+            HTTP_DURATION.observe(time.perf_counter() - started, method=scope["method"], route=route)
+            HTTP_REQUESTS.inc(method=scope["method"], route=route, status=str(status[0]))
@@ -0,0 +1,67 @@
+"""Pydantic models shared by the AI Pops API."""
+
+from datetime import datetime
+from typing import Any, Dict, List, Literal, Optional
+from pydantic import BaseModel, Field, model_validator
+
+class Developer(BaseModel):
+    name: str
+    skills: List[str]
+    experience_years: int
+    profile_summary: str
+
+class Ticket(BaseModel):
+    id: str
+    title: str
+    description: str
+
+class Assignment(BaseModel):
+    ticketId: str
+    developerName: str
+    reason: str
+    matchScore: float
+
+class Candidate(BaseModel):
+    developerName: str
+    # Cosine similarity of the embeddings, scaled to 0-100
+    score: float
+
+class MatchRequest(BaseModel):
+    developers: List[Developer]
+    tickets: List[Ticket]
+    # "llm" asks OpenAI for the assignment, "solver" runs the local optimal solver
+    strategy: Literal["llm", "solver"] = "llm"
+    # Maximum tickets per developer; defaults to an even split of the backlog
+    # plus SOLVER_CAPACITY_HEADROOM
+    capacity: Optional[int] = Field(default=None, ge=1)
+
+    @model_validator(mode="after")
+    def check_capacity(self):
+        if self.capacity is not None and self.capacity * len(self.developers) < len(self.tickets):
+            raise ValueError(
+                f"capacity {self.capacity} x {len(self.developers)} developers "
+                f"cannot cover {len(self.tickets)} tickets"
+            )
+        return self
+
+class CrewJobRequest(BaseModel):
+    # Crew inputs, e.g. {"topic": "AI LLMs"}; current_year is filled in
+    inputs: Dict[str, Any]
+
+class Job(BaseModel):
+    id: str
+    kind: Literal["match", "crew"]
+    status: Literal["queued", "running", "done", "failed", "cancelled"]
+    # Lower runs first
+    priority: int
+    # 0 to 1, with an optional note on what the job is doing
+    progress: float
+    message: Optional[str] = None
+    cancel_requested: bool
+    attempts: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    # Set once the job is done / has failed
+    result: Optional[Any] = None
+    error: Optional[str] = None
@@ -0,0 +1,110 @@
+"""Requests-per-minute and tokens-per-minute budget for LLM calls.
+
+Each quota is a token bucket that refills at ``limit / 60`` per second up to
+``limit``. The buckets live in a SQLite table and are read and updated in one
+``BEGIN IMMEDIATE`` transaction, so every worker process pointed at the same
+file draws from one budget and N workers together stay under the provider's
+quota. Without a path the buckets are in memory and cover this process only.
+
+A call reserves its prompt plus ``max_tokens`` up front; once the answer is
+in, the unused part of the reservation is given back. Waiting for budget is
+left to the caller (see ``scheduler``).
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict
+
+# Provider quotas shared by all workers; 0 disables that limit
+LLM_RPM_LIMIT = int(os.getenv("LLM_RPM_LIMIT", "0"))
+LLM_TPM_LIMIT = int(os.getenv("LLM_TPM_LIMIT", "0"))
+# SQLite file holding the buckets; unset keeps the budget per process
+LLM_RATE_LIMIT_PATH = os.getenv("LLM_RATE_LIMIT_PATH", "")
+
+
+class TokenBucketLimiter:
+    """Token buckets for ``requests`` and ``tokens``, optionally shared through SQLite."""
+
+    def __init__(
+        self,
+        rpm: int = LLM_RPM_LIMIT,
+        tpm: int = LLM_TPM_LIMIT,
+        path: str = LLM_RATE_LIMIT_PATH,
+    ):
+        self.limits = {name: limit for name, limit in (("requests", rpm), ("tokens", tpm)) if limit > 0}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path or ":memory:", check_same_thread=False, isolation_level=None, timeout=10)
+        if path:
+            self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS rate_buckets "
+            "(name TEXT PRIMARY KEY, level REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.limits)
+
+    def _take(self, costs: Dict[str, float], force: bool = False) -> float:
+        """Take ``costs`` from the buckets, all or nothing; else the seconds until they fit.
+
+        ``force`` always applies the costs (negative ones give tokens back),
+        letting a bucket go into debt when a call used more than it reserved.
+        """
+        # Wall-clock time, since the buckets are shared between processes
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                levels, wait = {}, 0.0
+                for name, limit in self.limits.items():
+                    rate = limit / 60
+                    row = self._db.execute(
+                        "SELECT level, updated_at FROM rate_buckets WHERE name = ?", (name,)
+                    ).fetchone()
+                    level = limit if row is None else min(limit, row[0] + max(0.0, now - row[1]) * rate)
+                    # A single call larger than the whole bucket waits for a full one
+                    cost = min(costs.get(name, 0), limit)
+                    if not force and level < cost:
+                        wait = max(wait, (cost - level) / rate)
+                    levels[name] = (level, cost)
+                for name, (level, cost) in levels.items():
+                    if not wait:
+                        level = min(self.limits[name], level - cost)
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO rate_buckets (name, level, updated_at) VALUES (?, ?, ?)",
+                        (name, level, now),
+                    )
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+        return wait
+
+    def reserve(self, tokens: int) -> float:
+        """Take one request and ``tokens`` tokens; 0 on success, else the seconds to wait first."""
+        if not self.limits:
+            return 0.0
+        return self._take({"requests": 1, "tokens": tokens})
+
+    def settle(self, reserved: int, used: int) -> None:
+        """Correct a reservation of ``reserved`` tokens to the ``used`` count."""
+        if "tokens" in self.limits and used != reserved:
+            self._take({"tokens": used - reserved}, force=True)
+
+    def stats(self) -> dict:
+        levels = {}
+        if self.limits:
+            with self._lock:
+                rows = self._db.execute("SELECT name, level, updated_at FROM rate_buckets").fetchall()
+            now = time.time()
+            for name, level, updated_at in rows:
+                if name in self.limits:
+                    limit = self.limits[name]
+                    levels[name] = round(min(limit, level + max(0.0, now - updated_at) * limit / 60), 1)
+        return {"limits_per_minute": dict(self.limits), "available": levels}
+
+
+rate_limiter = TokenBucketLimiter()
@@ -0,0 +1,458 @@
+"""Adaptive scheduling of LLM calls: concurrency, quota, retries and priority.
+
+Every LLM call made by the API or a crew run goes through ``scheduler``:
+
+1. It waits for a concurrency slot. Waiting calls are let in by priority
+   (match before generate before batch crew runs), then in arrival order.
+2. It waits while the provider's quota is spent, as told by the last
+   ``x-ratelimit-*`` response headers or a ``Retry-After``, and takes its
+   requests and tokens from the shared budget in ``ratelimit``.
+3. Retryable failures (429, 5xx, timeouts, dropped connections) are retried
+   with full-jitter exponential backoff for as long as the call's deadline
+   allows.
+
+The number of slots adapts AIMD-style, as TCP does: it starts in slow start
+(one more slot per success), then each success adds ``1 / limit`` (about one
+slot per round of calls), and a 429 or 503 halves it, at most once per round,
+and ends slow start. Only successes while the slots are all in use raise the
+limit, so a quiet period cannot inflate it. A call that cannot finish in time raises ``LLMUnavailable`` instead of
+degrading into made-up data; the API answers it with a 503 and Retry-After.
+
+Waiting works from coroutines (``run``, ``stream``) and from threads
+(``run_sync``), so the same scheduler serves the API and the crew CLI.
+"""
+
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Mapping, Optional, Tuple
+
+from ai_pops.api.metrics import stage
+from ai_pops.api.ratelimit import rate_limiter
+
+# Concurrent LLM calls per process: the AIMD starting point and its bounds
+LLM_CONCURRENCY_INITIAL = int(os.getenv("LLM_CONCURRENCY_INITIAL", "64"))
+LLM_CONCURRENCY_MIN = int(os.getenv("LLM_CONCURRENCY_MIN", "1"))
+LLM_CONCURRENCY_MAX = int(os.getenv("LLM_CONCURRENCY_MAX", "256"))
+# Seconds a request may spend queueing, waiting for quota and retrying
+LLM_REQUEST_DEADLINE = float(os.getenv("LLM_REQUEST_DEADLINE", "60"))
+LLM_MAX_ATTEMPTS = int(os.getenv("LLM_MAX_ATTEMPTS", "5"))
+# Full-jitter backoff: attempt n sleeps up to min(MAX, BASE * 2**n) seconds
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "20"))
+
+# Lower runs first
+PRIORITY_MATCH = 0
+PRIORITY_GENERATE = 1
+PRIORITY_BATCH = 2
+
+RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+# Statuses that mean we are sending too much, so concurrency is cut
+OVERLOAD_STATUSES = {429, 503}
+# Exception types without a status code that are worth retrying (openai, httpx, litellm)
+RETRY_ERROR_NAMES = {"APIConnectionError", "APITimeoutError", "Timeout", "ConnectError", "ReadTimeout"}
+
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+class LLMUnavailable(Exception):
+    """The LLM could not answer before the deadline; retry after ``retry_after`` seconds."""
+
+    def __init__(self, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_duration(value: str) -> Optional[float]:
+    """Seconds in an OpenAI reset header such as ``"1s"``, ``"6m0s"`` or ``"20ms"``."""
+    parts = _DURATION.findall(value)
+    if not parts:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return sum(float(number) * _UNITS[unit] for number, unit in parts)
+
+
+def _headers(exc: BaseException) -> Mapping[str, str]:
+    # openai errors carry the httpx response; litellm copies the headers
+    headers = getattr(exc, "litellm_response_headers", None)
+    if headers is None:
+        headers = getattr(getattr(exc, "response", None), "headers", None)
+    return headers or {}
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    headers = _headers(exc)
+    if headers.get("retry-after-ms"):
+        return float(headers["retry-after-ms"]) / 1000
+    if headers.get("retry-after"):
+        return parse_duration(headers["retry-after"])
+    return getattr(exc, "retry_after", None)
+
+
+def is_retryable(exc: BaseException) -> bool:
+    # An exhausted account answers 429 too, but waiting will not help
+    if getattr(exc, "code", None) == "insufficient_quota":
+        return False
+    if getattr(exc, "status_code", None) in RETRY_STATUSES:
+        return True
+    if isinstance(exc, (TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    return any(cls.__name__ in RETRY_ERROR_NAMES for cls in type(exc).__mro__)
+
+
+class _Waiter:
+    __slots__ = ("wake", "granted", "cancelled")
+
+    def __init__(self, wake: Callable[[], None]):
+        self.wake = wake
+        self.granted = False
+        self.cancelled = False
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class LLMScheduler:
+    """Priority admission, AIMD concurrency, provider quota and retries for LLM calls."""
+
+    def __init__(
+        self,
+        initial: int = LLM_CONCURRENCY_INITIAL,
+        minimum: int = LLM_CONCURRENCY_MIN,
+        maximum: int = LLM_CONCURRENCY_MAX,
+        max_attempts: int = LLM_MAX_ATTEMPTS,
+        budget=rate_limiter,
+    ):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.max_attempts = max_attempts
+        self.budget = budget
+        self._limit = float(min(max(initial, minimum), maximum))
+        # Below this the limit grows by one per success (slow start)
+        self._threshold = float(maximum)
+        self._in_flight = 0
+        self._queue: List[Tuple[int, int, _Waiter]] = []
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+        # time.monotonic() before which no call starts (Retry-After)
+        self._paused_until = 0.0
+        # Calls started before the last cut do not cut again
+        self._last_decrease = 0.0
+        # kind -> (remaining, monotonic reset time), from x-ratelimit-* headers
+        self._provider: Dict[str, Tuple[float, float]] = {}
+        self.successes = 0
+        self.retries = 0
+        self.overloads = 0
+        self.rejections = 0
+
+    @staticmethod
+    def deadline(seconds: float = LLM_REQUEST_DEADLINE) -> float:
+        """A deadline ``seconds`` from now, for calls that share one request's time."""
+        return time.monotonic() + seconds
+
+    # Admission
+
+    def _admit(self, priority: int, wake: Callable[[], None]) -> Optional[_Waiter]:
+        """Take a slot now and return None, or queue and return the waiter."""
+        with self._lock:
+            while self._queue and self._queue[0][2].cancelled:
+                heapq.heappop(self._queue)
+            if not self._queue and self._in_flight < int(self._limit):
+                self._in_flight += 1
+                return None
+            waiter = _Waiter(wake)
+            heapq.heappush(self._queue, (priority, next(self._order), waiter))
+            return waiter
+
+    def _grant(self) -> None:
+        # Called with the lock held
+        while self._queue and self._in_flight < int(self._limit):
+            _, _, waiter = heapq.heappop(self._queue)
+            if waiter.cancelled:
+                continue
+            waiter.granted = True
+            self._in_flight += 1
+            waiter.wake()
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        with self._lock:
+            if waiter.granted:
+                # Granted just as it gave up: pass the slot on
+                self._in_flight -= 1
+                self._grant()
+            else:
+                waiter.cancelled = True
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._grant()
+
+    def _timed_out(self, what: str) -> LLMUnavailable:
+        self.rejections += 1
+        return LLMUnavailable(f"LLM deadline passed while {what}")
+
+    async def _acquire(self, priority: int, deadline: float) -> None:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        waiter = self._admit(priority, lambda: loop.call_soon_threadsafe(_resolve, future))
+        if waiter is None:
+            return
+        try:
+            await asyncio.wait_for(future, timeout=max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            self._abandon(waiter)
+            raise self._timed_out("queued for a slot")
+        except BaseException:
+            self._abandon(waiter)
+            raise
+
+    def _acquire_sync(self, priority: int, deadline: float) -> None:
+        event = threading.Event()
+        waiter = self._admit(priority, event.set)
+        if waiter is not None and not event.wait(max(0.0, deadline - time.monotonic())):
+            self._abandon(waiter)
+            raise self._timed_out("queued for a slot")
+
+    # Quota
+
+    def observe(self, headers: Optional[Mapping[str, str]]) -> None:
+        """Record the provider's remaining quota from ``x-ratelimit-*`` response headers."""
+        if not headers:
+            return
+        now = time.monotonic()
+        for kind in ("requests", "tokens"):
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            reset = parse_duration(headers.get(f"x-ratelimit-reset-{kind}") or "")
+            if remaining is None or reset is None:
+                continue
+            with self._lock:
+                self._provider[kind] = (float(remaining), now + reset)
+
+    def _quota_wait(self, tokens: int) -> float:
+        """Seconds until the provider quota and the shared budget allow this call; 0 once taken."""
+        now = time.monotonic()
+        with self._lock:
+            wait = self._paused_until - now
+            for kind, cost in (("requests", 1), ("tokens", tokens)):
+                remaining, reset_at = self._provider.get(kind, (0.0, 0.0))
+                if reset_at > now and remaining < cost:
+                    wait = max(wait, reset_at - now)
+        if wait > 0:
+            return wait
+        wait = self.budget.reserve(tokens)
+        if wait:
+            return wait
+        with self._lock:
+            # Count this call against the provider's numbers until new headers arrive
+            for kind, cost in (("requests", 1), ("tokens", tokens)):
+                if kind in self._provider:
+                    remaining, reset_at = self._provider[kind]
+                    self._provider[kind] = (remaining - cost, reset_at)
+        return 0.0
+
+    def _check_wait(self, wait: float, deadline: float) -> None:
+        if time.monotonic() + wait > deadline:
+            self.rejections += 1
+            raise LLMUnavailable("LLM rate limit reached", retry_after=wait)
+
+    async def _wait_for_quota(self, tokens: int, deadline: float) -> None:
+        while True:
+            # The budget may be a SQLite file shared with other workers
+            if self.budget.enabled:
+                wait = await asyncio.to_thread(self._quota_wait, tokens)
+            else:
+                wait = self._quota_wait(tokens)
+            if not wait:
+                return
+            self._check_wait(wait, deadline)
+            # Jittered so calls woken together do not all retry at once
+            await asyncio.sleep(wait * random.uniform(1.0, 1.1))
+
+    def _wait_for_quota_sync(self, tokens: int, deadline: float) -> None:
+        while True:
+            wait = self._quota_wait(tokens)
+            if not wait:
+                return
+            self._check_wait(wait, deadline)
+            time.sleep(wait * random.uniform(1.0, 1.1))
+
+    async def _enter(self, priority: int, tokens: int, deadline: float) -> None:
+        """Hold a slot and this call's quota; the caller releases the slot."""
+        with stage("llm_queue"):
+            await self._acquire(priority, deadline)
+            try:
+                await self._wait_for_quota(tokens, deadline)
+            except BaseException:
+                self._release()
+                raise
+
+    def _enter_sync(self, priority: int, tokens: int, deadline: float) -> None:
+        with stage("llm_queue"):
+            self._acquire_sync(priority, deadline)
+            try:
+                self._wait_for_quota_sync(tokens, deadline)
+            except BaseException:
+                self._release()
+                raise
+
+    def settle(self, reserved: int, used: int) -> None:
+        """Give back (or charge) the difference between reserved and used tokens.
+
+        Failed attempts give back their whole reservation here; callers settle
+        the answers they got.
+        """
+        self.budget.settle(reserved, used)
+
+    # Outcomes
+
+    def _succeeded(self) -> None:
+        with self._lock:
+            self.successes += 1
+            # This call has already released its slot
+            if self._queue or self._in_flight + 1 >= int(self._limit):
+                step = 1.0 if self._limit < self._threshold else 1 / self._limit
+                self._limit = min(self.maximum, self._limit + step)
+                self._grant()
+
+    def _failed(self, exc: BaseException, attempt: int, started: float, deadline: float) -> float:
+        """Backoff before the next attempt, or raise when ``exc`` is final."""
+        self.observe(_headers(exc))
+        retry_after = _retry_after(exc)
+        now = time.monotonic()
+        if getattr(exc, "status_code", None) in OVERLOAD_STATUSES:
+            with self._lock:
+                self.overloads += 1
+                if started >= self._last_decrease:
+                    self._limit = max(self.minimum, self._limit / 2)
+                    self._threshold = self._limit
+                    self._last_decrease = now
+                if retry_after:
+                    # The quota is shared, so every call holds off, not just this one
+                    self._paused_until = max(self._paused_until, now + retry_after)
+        if not is_retryable(exc):
+            raise exc
+
+        delay = random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * 2 ** attempt))
+        delay = max(delay, retry_after or 0.0)
+        if attempt + 1 >= self.max_attempts or now + delay >= deadline:
+            self.rejections += 1
+            raise LLMUnavailable(
+                f"LLM unavailable after {attempt + 1} attempt(s): {type(exc).__name__}",
+                retry_after=max(1.0, delay),
+            ) from exc
+        self.retries += 1
+        return delay
+
+    # Entry points
+
+    async def run(
+        self,
+        call: Callable[[], Awaitable[Any]],
+        priority: int = PRIORITY_GENERATE,
+        tokens: int = 0,
+        deadline: Optional[float] = None,
+    ) -> Any:
+        """Await ``call()`` once admitted, retrying it until it succeeds or ``deadline`` passes."""
+        deadline = deadline or self.deadline()
+        for attempt in itertools.count():
+            error = None
+            await self._enter(priority, tokens, deadline)
+            started = time.monotonic()
+            try:
+                result = await asyncio.wait_for(call(), timeout=max(0.0, deadline - time.monotonic()))
+            except Exception as e:
+                error = e
+            finally:
+                self._release()
+            if error is None:
+                self._succeeded()
+                return result
+            self.settle(tokens, 0)
+            await asyncio.sleep(self._failed(error, attempt, started, deadline))
+
+    async def stream(
+        self,
+        open_stream: Callable[[], AsyncIterator[Any]],
+        priority: int = PRIORITY_GENERATE,
+        tokens: int = 0,
+        deadline: Optional[float] = None,
+    ) -> AsyncIterator[Any]:
+        """Yield from ``open_stream()``; retried like ``run`` until the first piece arrives."""
+        deadline = deadline or self.deadline()
+        for attempt in itertools.count():
+            error, sent = None, False
+            await self._enter(priority, tokens, deadline)
+            started = time.monotonic()
+            try:
+                async for piece in open_stream():
+                    sent = True
+                    yield piece
+            except Exception as e:
+                error = e
+            finally:
+                self._release()
+            if error is None:
+                self._succeeded()
+                return
+            if sent:
+                # Part of the answer is already out, so it cannot be replayed
+                raise error
+            self.settle(tokens, 0)
+            await asyncio.sleep(self._failed(error, attempt, started, deadline))
+
+    def run_sync(
+        self,
+        call: Callable[[], Any],
+        priority: int = PRIORITY_BATCH,
+        tokens: int = 0,
+        deadline: Optional[float] = None,
+    ) -> Any:
+        """``run`` for threads. The deadline bounds queueing and retries, not a call in progress."""
+        deadline = deadline or self.deadline()
+        for attempt in itertools.count():
+            error = None
+            self._enter_sync(priority, tokens, deadline)
+            started = time.monotonic()
+            try:
+                result = call()
+            except Exception as e:
+                error = e
+            finally:
+                self._release()
+            if error is None:
+                self._succeeded()
+                return result
+            self.settle(tokens, 0)
+            time.sleep(self._failed(error, attempt, started, deadline))
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "concurrency_limit": round(self._limit, 2),
+                "in_flight": self._in_flight,
+                "queued": sum(not waiter.cancelled for _, _, waiter in self._queue),
+                "paused_seconds": round(max(0.0, self._paused_until - now), 2),
+                "provider_remaining": {
+                    kind: remaining for kind, (remaining, reset_at) in self._provider.items() if reset_at > now
+                },
+                "successes": self.successes,
+                "retries": self.retries,
+                "overloads": self.overloads,
+                "rejections": self.rejections,
+                "budget": self.budget.stats(),
+            }
+
+
+scheduler = LLMScheduler()
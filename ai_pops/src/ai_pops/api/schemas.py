@@ -0,0 +1,57 @@
+"""JSON-schema response formats for the API's LLM calls.
+
+With a ``response_format`` the provider constrains decoding to the schema,
+so an answer can no longer be malformed, only cut short. OpenAI's strict
+mode wants an object at the root, every property required and no others,
+so each format is ``{"items": [...]}`` around the strict schema of one
+item. ``llm.decode_items`` unwraps it again.
+"""
+
+from typing import Any, Dict, Type
+
+from pydantic import BaseModel
+
+from ai_pops.api.models import Assignment, Developer, Ticket
+
+
+def _strict(node: Dict[str, Any]) -> Dict[str, Any]:
+    node = {key: value for key, value in node.items() if key != "title"}
+    if "properties" in node:
+        node["properties"] = {name: _strict(prop) for name, prop in node["properties"].items()}
+        node["required"] = list(node["properties"])
+        node["additionalProperties"] = False
+    if isinstance(node.get("items"), dict):
+        node["items"] = _strict(node["items"])
+    return node
+
+
+def strict_schema(model: Type[BaseModel]) -> Dict[str, Any]:
+    """``model``'s JSON schema in the form strict structured outputs accept."""
+    return _strict(model.model_json_schema())
+
+
+def array_response_format(name: str, item_schema: Dict[str, Any]) -> Dict[str, Any]:
+    """A strict ``response_format`` for an array of ``item_schema``, wrapped as ``{"items": [...]}``."""
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": name,
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {"items": {"type": "array", "items": item_schema}},
+                "required": ["items"],
+                "additionalProperties": False,
+            },
+        },
+    }
+
+
+DEVELOPERS_FORMAT = array_response_format("developers", strict_schema(Developer))
+TICKETS_FORMAT = array_response_format("tickets", strict_schema(Ticket))
+ASSIGNMENTS_FORMAT = array_response_format("assignments", strict_schema(Assignment))
+# Compact match answers, [ticket id, developer id, score(, reason)]
+COMPACT_ASSIGNMENTS_FORMAT = array_response_format(
+    "assignments",
+    {"type": "array", "items": {"anyOf": [{"type": "number"}, {"type": "string"}]}},
+)
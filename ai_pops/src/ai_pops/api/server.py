@@ -1,18 +1,90 @@
 """Simple FastAPI server for AI Pops."""
 
 import os
-import json
-from typing import List, Dict, Any
-from fastapi import FastAPI, HTTPException
+import asyncio
+import re
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Literal, Optional, Tuple, Type
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from openai import OpenAI
+from starlette.concurrency import run_in_threadpool
 from dotenv import load_dotenv
 
+from ai_pops.api.cache import response_cache
+from ai_pops.api.job_routes import router as job_router
+from ai_pops.api.jobs import job_workers, run_crew_job
+from ai_pops.api.backends import LLM_BACKEND, OpenAIBackend, create_backend
+from ai_pops.api.llm import LLM_REMAINDER_RETRIES, complete_json, limiter, stream_json_items
+from ai_pops.api.metrics import (
+    CONTENT_TYPE, MetricsMiddleware, record_fallback, registry, setup_tracing, shutdown_tracing, stage,
+)
+from ai_pops.api.models import Developer, Ticket, Assignment, MatchRequest
+from ai_pops.api.scheduler import PRIORITY_BATCH, PRIORITY_MATCH, LLMUnavailable, scheduler
+from ai_pops.api.schemas import DEVELOPERS_FORMAT, TICKETS_FORMAT
+from ai_pops.api.singleflight import singleflight
+from ai_pops.api.store_routes import router as store_router
+from ai_pops.api.streaming import STREAM_MEDIA_TYPES, format_end, format_error, format_event
+from ai_pops.services.batching_service import (
+    MATCH_OUTPUT_TOKEN_BUDGET, MatchChunk, chunk_members, developer_loads, merge_assignments, plan_chunks,
+    validate_assignment,
+)
+from ai_pops.services.embedding_service import embedding_scores
+from ai_pops.services.matching_service import match_optimally, score_matrix
+from ai_pops.services.prompt_service import expand_assignment, match_prompt, match_response_format
+
 # Load environment variables
 load_dotenv()
 
-app = FastAPI(title="AI Pops API", version="1.0.0")
+# LLM calls a single chunked match request may have in flight
+MATCH_CHUNK_CONCURRENCY = int(os.getenv("MATCH_CHUNK_CONCURRENCY", "8"))
+# How chunked requests pick each ticket's candidate developers: "lexical"
+# (local bag-of-words scores) or "embedding" (the configured embedder)
+MATCH_PREFILTER = os.getenv("MATCH_PREFILTER", "lexical")
+PREFILTER_SCORES = {"lexical": score_matrix, "embedding": embedding_scores}
+# Seconds a background match job may spend on the LLM, queueing included
+JOB_MATCH_DEADLINE = float(os.getenv("JOB_MATCH_DEADLINE", "600"))
+# Completion tokens per generation call. Larger counts are split into shards
+# that each fit, GENERATE_SHARD_CONCURRENCY of them generated at once
+GENERATE_MAX_TOKENS = int(os.getenv("GENERATE_MAX_TOKENS", "2000"))
+GENERATE_SHARD_CONCURRENCY = int(os.getenv("GENERATE_SHARD_CONCURRENCY", "8"))
+# Most objects one generate request may ask for; bigger fixtures come from
+# the local generator (generate_fixtures)
+GENERATE_MAX_COUNT = int(os.getenv("GENERATE_MAX_COUNT", "5000"))
+# One per shard, so a sharded request does not get the same objects many times
+GENERATE_THEMES = [
+    "fintech", "healthcare", "e-commerce", "developer tooling", "gaming", "logistics", "media streaming",
+    "education", "cybersecurity", "travel", "energy", "social networking", "insurance", "automotive",
+]
+
+StreamMode = Literal["ndjson", "sse"]
+
+# LLM backend chosen by LLM_BACKEND, created at startup by ``lifespan`` so
+# importing this module (and with it openai/httpx) stays cheap
+llm_backend = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global llm_backend
+    setup_tracing()
+    created = None
+    if llm_backend is None:
+        created = llm_backend = create_backend(LLM_BACKEND)
+    await job_workers.start()
+    try:
+        yield
+    finally:
+        await job_workers.stop()
+        if created is not None:
+            await created.aclose()
+            if llm_backend is created:
+                llm_backend = None
+        shutdown_tracing()
+
+app = FastAPI(title="AI Pops API", version="1.0.0", lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -23,102 +95,546 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize OpenAI client
-openai_client = None
-if os.getenv("OPENAI_API_KEY"):
-    openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
-# Simple models
-class Developer(BaseModel):
-    name: str
-    skills: List[str]
-    experience_years: int
-    profile_summary: str
-
-class Ticket(BaseModel):
-    id: str
-    title: str
-    description: str
-
-class Assignment(BaseModel):
-    ticketId: str
-    developerName: str
-    reason: str
-    matchScore: float
-
-class MatchRequest(BaseModel):
-    developers: List[Developer]
-    tickets: List[Ticket]
+app.add_middleware(MetricsMiddleware)
+
+app.include_router(store_router)
+app.include_router(job_router)
 
 @app.get("/")
 def root():
     """Health check."""
     return {
         "message": "AI Pops API is running", 
-        "openai_configured": openai_client is not None
+        # the stub answers too, but it is not a model
+        "openai_configured": isinstance(llm_backend, OpenAIBackend),
+        "llm_backend": llm_backend.name if llm_backend else None,
     }
 
-@app.post("/api/match")
-def match_developers_to_tickets(request: MatchRequest):
-    """Match developers to tickets."""
-    if not openai_client:
-        raise HTTPException(status_code=500, detail="OpenAI API key not configured")
-    
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus metrics: request counts and latency, stage timings, tokens, cache and fallbacks."""
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
+@app.get("/api/cache/stats")
+def cache_stats():
+    """LLM response cache counters, and how many calls joined an identical one in flight."""
+    return {**response_cache.stats(), "coalescing": singleflight.stats()}
+
+@app.exception_handler(LLMUnavailable)
+async def llm_unavailable(request: Request, exc: LLMUnavailable):
+    """Overload is a 503 the client can retry, never made-up data."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(max(1, round(exc.retry_after)))},
+    )
+
+@app.get("/api/rate-limit/stats")
+def rate_limit_stats():
+    """LLM scheduler: concurrency limit, queue, provider quota, retries and the shared budget."""
+    return scheduler.stats()
+
+def _record_match_timing(response: Response, strategy: str, started: float):
+    """Expose which strategy produced a match and how long it took."""
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    response.headers["X-Match-Strategy"] = strategy
+    response.headers["Server-Timing"] = f"match;desc={strategy};dur={elapsed_ms:.1f}"
+
+@app.post("/api/match", response_model=List[Assignment])
+async def match_developers_to_tickets(
+    request: MatchRequest,
+    response: Response,
+    cache_control: Optional[str] = Header(default=None),
+    stream: Optional[StreamMode] = None,
+):
+    """Match developers to tickets.
+
+    With ``?stream=ndjson`` or ``?stream=sse`` each assignment is sent as soon
+    as the model has finished writing it.
+    """
+    started = time.perf_counter()
+    if stream and request.strategy == "solver":
+        assignments, _ = await _run_match(request, cache_control)
+        return _streaming_response(_stream_items([a.model_dump() for a in assignments], stream), stream)
+
+    if request.strategy == "llm" and not llm_backend:
+        raise HTTPException(status_code=500, detail="LLM backend not configured")
+
+    if stream:
+        if not request.developers or not request.tickets:
+            return _streaming_response(_stream_items([], stream), stream)
+        # Taken here so overload is still a 503; the response releases it
+        await limiter.acquire()
+        return _streaming_response(_stream_match(request, cache_control, stream), stream, holds_slot=True)
+
+    if request.strategy == "solver":
+        assignments, strategy = await _run_match(request, cache_control)
+    else:
+        async with limiter.slot():
+            assignments, strategy = await _run_match(request, cache_control)
+    _record_match_timing(response, strategy, started)
+    return assignments
+
+async def _run_match(
+    request: MatchRequest,
+    cache_control: Optional[str],
+    priority: int = PRIORITY_MATCH,
+    deadline: Optional[float] = None,
+    progress: Optional[Callable[[float, Optional[str]], None]] = None,
+) -> Tuple[List[Assignment], str]:
+    """The assignment for ``request`` and the strategy that produced it."""
+    if request.strategy == "solver":
+        with stage("solver"):
+            assignments = await run_in_threadpool(
+                match_optimally, request.developers, request.tickets, request.capacity
+            )
+        return assignments, "solver"
+
+    if not request.developers or not request.tickets:
+        return [], "llm"
+
+    merged = await _match_in_chunks(request, cache_control, priority, deadline, progress)
+
+    strategy = "llm"
+    missing = [t for t in request.tickets if t.id not in merged]
+    if missing:
+        # Fallback: local solver for whatever the LLM did not assign, within
+        # the capacity the LLM's assignments left
+        record_fallback("match", reason="missing_tickets")
+        load = developer_loads(request.developers, merged.values()) if request.capacity else None
+        with stage("fallback_solver"):
+            filled = await run_in_threadpool(
+                match_optimally, request.developers, missing, request.capacity, load
+            )
+        merged.update((a.ticketId, a) for a in filled)
+        strategy = "llm+solver" if len(missing) < len(request.tickets) else "solver-fallback"
+    return [merged[t.id] for t in request.tickets], strategy
+
+async def _match_job(job: Dict[str, Any], progress) -> Dict[str, Any]:
+    """Background match: batch priority, a longer deadline and per-chunk progress."""
+    request = MatchRequest.model_validate(job["payload"])
+    if request.strategy == "llm" and not llm_backend:
+        raise RuntimeError("LLM backend not configured")
+    assignments, strategy = await _run_match(
+        request, None, PRIORITY_BATCH, scheduler.deadline(JOB_MATCH_DEADLINE), progress
+    )
+    return {"strategy": strategy, "assignments": [a.model_dump() for a in assignments]}
+
+job_workers.register("match", _match_job)
+job_workers.register("crew", run_crew_job)
+
+def _plan_match_chunks(request: MatchRequest) -> List[MatchChunk]:
+    with stage("plan_chunks"):
+        return plan_chunks(request.developers, request.tickets, score_fn=PREFILTER_SCORES[MATCH_PREFILTER])
+
+async def _match_in_chunks(
+    request: MatchRequest,
+    cache_control: Optional[str],
+    priority: int = PRIORITY_MATCH,
+    deadline: Optional[float] = None,
+    progress: Optional[Callable[[float, Optional[str]], None]] = None,
+) -> Dict[str, Assignment]:
+    """Run the LLM over token-budgeted chunks concurrently and merge the results.
+
+    A chunk keeps every assignment its answers got right (see
+    ``_chunk_assignments``); tickets still missing, and chunks that fail
+    outright, are left for the caller to fill. ``progress`` is told after
+    each chunk.
+    """
+    chunks = await run_in_threadpool(_plan_match_chunks, request)
+    semaphore = asyncio.Semaphore(MATCH_CHUNK_CONCURRENCY)
+    # All chunks share the request's deadline
+    if deadline is None:
+        deadline = scheduler.deadline()
+    finished = 0
+
+    async def run_chunk(chunk: MatchChunk):
+        nonlocal finished
+        async with semaphore:
+            try:
+                return [
+                    assignment async for assignment in _chunk_assignments(
+                        request, chunk, cache_control, priority, deadline, stream=False
+                    )
+                ]
+            finally:
+                finished += 1
+                if progress:
+                    progress(finished / len(chunks), f"{finished}/{len(chunks)} chunks matched")
+
+    results = await asyncio.gather(*(run_chunk(c) for c in chunks), return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            record_fallback("match", result)
+    with stage("merge"):
+        return merge_assignments(request.developers, request.tickets, chunks, results, request.capacity)
+
+async def _async_items(items: Iterable[Any]) -> AsyncIterator[Any]:
+    for item in items:
+        yield item
+
+async def _chunk_assignments(
+    request: MatchRequest,
+    chunk: MatchChunk,
+    cache_control: Optional[str],
+    priority: int,
+    deadline: float,
+    stream: bool,
+) -> AsyncIterator[Assignment]:
+    """Valid assignments for one chunk, asking again for the tickets an answer left out.
+
+    An answer cut short or with malformed entries still counts for the
+    tickets it did assign. The follow-up prompt lists only the chunk's
+    tickets still unassigned, up to ``LLM_REMAINDER_RETRIES`` times and
+    while each one adds something. A call that fails after some tickets were
+    assigned ends the chunk with those; if none were, the error is raised.
+    """
+    ticket_ids, dev_names = chunk_members(request.developers, request.tickets, chunk)
+    developers = [request.developers[i] for i in chunk.developers]
+    pending = [request.tickets[i] for i in chunk.tickets]
+    assigned = set()
+    options = dict(
+        temperature=0.3, max_tokens=MATCH_OUTPUT_TOKEN_BUDGET, cache_control=cache_control,
+        priority=priority, deadline=deadline, response_format=match_response_format(),
+    )
+    for _ in range(1 + LLM_REMAINDER_RETRIES):
+        with stage("build_prompt"):
+            prompt = match_prompt(developers, pending)
+        before = len(assigned)
+        try:
+            if stream:
+                items = stream_json_items(llm_backend, prompt, **options)
+            else:
+                result = await complete_json(llm_backend, prompt, **options)
+                items = _async_items(result if isinstance(result, list) else [])
+            async for item in items:
+                item = expand_assignment(item, developers, pending)
+                assignment = validate_assignment(item, ticket_ids, dev_names)
+                if assignment is not None:
+                    assigned.add(assignment.ticketId)
+                    yield assignment
+        except Exception as e:
+            if not assigned:
+                raise
+            record_fallback("match", e)
+            return
+        pending = [t for t in pending if t.id not in assigned]
+        if not pending or len(assigned) == before:
+            return
+
+async def _stream_match(request: MatchRequest, cache_control: Optional[str], mode: StreamMode):
+    """Stream chunked LLM assignments as they complete, then solver fill-ins."""
+    tasks = []
     try:
-        # Simple matching prompt
-        prompt = f"""
-        Match these developers to tickets. Return JSON array only:
-        
-        DEVELOPERS: {json.dumps([d.model_dump() for d in request.developers])}
-        TICKETS: {json.dumps([t.model_dump() for t in request.tickets])}
-        
-        Return format:
-        [
-            {{
-                "ticketId": "ticket_id",
-                "developerName": "Developer Name",
-                "reason": "Why this match makes sense",
-                "matchScore": 85.5
-            }}
-        ]
-        """
-        
-        response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.3,
-            max_tokens=2000
+        chunks = await run_in_threadpool(_plan_match_chunks, request)
+        semaphore = asyncio.Semaphore(MATCH_CHUNK_CONCURRENCY)
+        deadline = scheduler.deadline()
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def run_chunk(chunk: MatchChunk):
+            try:
+                async with semaphore:
+                    async for assignment in _chunk_assignments(
+                        request, chunk, cache_control, PRIORITY_MATCH, deadline, stream=True
+                    ):
+                        await queue.put(assignment)
+            except Exception as e:
+                # Tickets this chunk missed are filled by the solver below
+                record_fallback("match", e)
+            finally:
+                await queue.put(None)
+
+        tasks = [asyncio.create_task(run_chunk(c)) for c in chunks]
+        sent: Dict[str, Assignment] = {}
+        load: Dict[str, int] = {}
+        remaining = len(tasks)
+        while remaining:
+            assignment = await queue.get()
+            if assignment is None:
+                remaining -= 1
+            elif assignment.ticketId in sent:
+                continue
+            elif request.capacity and load.get(assignment.developerName, 0) >= request.capacity:
+                # Developer is full; the solver places the ticket below
+                continue
+            else:
+                sent[assignment.ticketId] = assignment
+                load[assignment.developerName] = load.get(assignment.developerName, 0) + 1
+                yield format_event(assignment.model_dump(), mode)
+
+        missing = [t for t in request.tickets if t.id not in sent]
+        if missing:
+            record_fallback("match", reason="missing_tickets")
+            loads = developer_loads(request.developers, sent.values()) if request.capacity else None
+            with stage("fallback_solver"):
+                filled = await run_in_threadpool(
+                    match_optimally, request.developers, missing, request.capacity, loads
+                )
+            for assignment in filled:
+                yield format_event(assignment.model_dump(), mode)
+        yield format_end(mode)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+class _SlotStreamingResponse(StreamingResponse):
+    """A stream that releases its ``limiter`` slot once it is over, including
+    when the client left before the body iterator ever started."""
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            limiter.release()
+
+def _streaming_response(events, mode: StreamMode, holds_slot: bool = False) -> StreamingResponse:
+    response_class = _SlotStreamingResponse if holds_slot else StreamingResponse
+    return response_class(events, media_type=STREAM_MEDIA_TYPES[mode])
+
+async def _stream_items(items: List[Any], mode: StreamMode):
+    for item in items:
+        yield format_event(item, mode)
+    yield format_end(mode)
+
+@dataclass(frozen=True)
+class _Generator:
+    """How one generation endpoint asks the LLM for objects and fills in what it misses."""
+
+    endpoint: str
+    model: Type[BaseModel]
+    # Field that must be unique across the objects of one response
+    key: str
+    # prompt(count, shard, earlier): ``count`` more objects for ``shard``,
+    # which already has ``earlier``
+    prompt: Callable[[int, "_Shard", List[Dict[str, Any]]], str]
+    temperature: float
+    fallback: Callable[[int], Dict[str, Any]]
+    response_format: Dict[str, Any]
+    # Rough completion tokens per object, for sizing shards
+    tokens_per_item: int
+
+@dataclass(frozen=True)
+class _Shard:
+    """Objects one LLM call (and its follow-ups) is asked for."""
+
+    start: int
+    count: int
+    # Keeps shards of one request from all writing the same objects; empty
+    # when the request fits in a single shard
+    theme: str
+
+def _plan_shards(generator: _Generator, count: int) -> List[_Shard]:
+    """Split ``count`` into near-equal shards that each fit in ``GENERATE_MAX_TOKENS``."""
+    # A fifth of the budget is headroom for objects longer than the estimate
+    per_shard = max(1, GENERATE_MAX_TOKENS * 4 // 5 // generator.tokens_per_item)
+    n = max(1, -(-count // per_shard))
+    shards = []
+    for i in range(n):
+        start, end = count * i // n, count * (i + 1) // n
+        theme = ""
+        if n > 1:
+            theme = GENERATE_THEMES[i % len(GENERATE_THEMES)]
+            if i >= len(GENERATE_THEMES):
+                theme += f" (set {i // len(GENERATE_THEMES) + 1})"
+        shards.append(_Shard(start, end - start, theme))
+    return shards
+
+def _validated(generator: _Generator, item: Any, seen: set) -> Optional[Dict[str, Any]]:
+    """``item`` as the generator's model, or ``None`` if it does not fit or repeats a key in ``seen``."""
+    try:
+        item = generator.model.model_validate(item).model_dump()
+    except ValueError:
+        return None
+    if item[generator.key] in seen:
+        return None
+    seen.add(item[generator.key])
+    return item
+
+async def _shard_items(
+    generator: _Generator, shard: _Shard, seen: set, cache_control: Optional[str], stream: bool
+) -> AsyncIterator[Dict[str, Any]]:
+    """Up to ``shard.count`` new objects, asking again for as many as an answer was short.
+
+    Objects that do not fit the endpoint's model, or whose key is already in
+    ``seen`` (shared by every shard of the request), are dropped. Follow-ups
+    ask for the remainder only, up to ``LLM_REMAINDER_RETRIES`` times and
+    while each one adds something. Overload is raised; another failure ends
+    the shard with what it has, or is raised if it has nothing.
+    """
+    earlier: List[Dict[str, Any]] = []
+    options = dict(
+        temperature=generator.temperature, max_tokens=GENERATE_MAX_TOKENS, cache_control=cache_control,
+        response_format=generator.response_format,
+    )
+    for _ in range(1 + LLM_REMAINDER_RETRIES):
+        prompt = generator.prompt(shard.count - len(earlier), shard, earlier)
+        before = len(earlier)
+        try:
+            if stream:
+                items = stream_json_items(llm_backend, prompt, **options)
+            else:
+                result = await complete_json(llm_backend, prompt, **options)
+                items = _async_items(result if isinstance(result, list) else [])
+            async for item in items:
+                if len(earlier) < shard.count:
+                    item = _validated(generator, item, seen)
+                    if item is not None:
+                        earlier.append(item)
+                        yield item
+        except LLMUnavailable:
+            raise
+        except Exception as e:
+            if not earlier:
+                raise
+            record_fallback(generator.endpoint, e)
+            return
+        if len(earlier) >= shard.count or len(earlier) == before:
+            return
+
+async def _generate(generator: _Generator, count: int, cache_control: Optional[str]) -> List[Dict[str, Any]]:
+    """``count`` generated objects from concurrent shards, topped up from ``generator.fallback``."""
+    shards = _plan_shards(generator, count)
+    seen: set = set()
+    semaphore = asyncio.Semaphore(GENERATE_SHARD_CONCURRENCY)
+
+    async def run_shard(shard: _Shard):
+        async with semaphore:
+            return [item async for item in _shard_items(generator, shard, seen, cache_control, stream=False)]
+
+    results = await asyncio.gather(*(run_shard(s) for s in shards), return_exceptions=True)
+    items: List[Dict[str, Any]] = []
+    for result in results:
+        if isinstance(result, LLMUnavailable):
+            # Overload: a 503 with Retry-After, not sample data
+            raise result
+        if isinstance(result, BaseException):
+            record_fallback(generator.endpoint, result)
+        else:
+            items.extend(result)
+    if len(items) < count:
+        record_fallback(generator.endpoint, reason="missing_items")
+        items.extend(generator.fallback(i) for i in range(len(items), count))
+    return items
+
+async def _stream_generated(generator: _Generator, count: int, cache_control: Optional[str], mode: StreamMode):
+    """``_generate`` as a stream: each object is sent once the model has finished it, from whichever shard.
+
+    Overload ends the stream with an error frame instead, since the 200 has
+    already gone out and the client should retry rather than get filler.
+    """
+    tasks = []
+    try:
+        semaphore = asyncio.Semaphore(GENERATE_SHARD_CONCURRENCY)
+        queue: asyncio.Queue = asyncio.Queue()
+        seen: set = set()
+
+        async def run_shard(shard: _Shard):
+            try:
+                async with semaphore:
+                    async for item in _shard_items(generator, shard, seen, cache_control, stream=True):
+                        await queue.put(item)
+            except LLMUnavailable as e:
+                await queue.put(e)
+            except Exception as e:
+                # Filled in below
+                record_fallback(generator.endpoint, e)
+            finally:
+                await queue.put(None)
+
+        tasks = [asyncio.create_task(run_shard(s)) for s in _plan_shards(generator, count)]
+        sent = 0
+        remaining = len(tasks)
+        while remaining:
+            item = await queue.get()
+            if item is None:
+                remaining -= 1
+            elif isinstance(item, LLMUnavailable):
+                raise item
+            else:
+                yield format_event(item, mode)
+                sent += 1
+        if sent < count:
+            record_fallback(generator.endpoint, reason="missing_items")
+            for i in range(sent, count):
+                yield format_event(generator.fallback(i), mode)
+    except LLMUnavailable as e:
+        yield format_error(str(e), mode)
+    finally:
+        for task in tasks:
+            task.cancel()
+    yield format_end(mode)
+
+def _developers_prompt(count: int, shard: _Shard, earlier: List[Dict[str, Any]]) -> str:
+    theme = f"Give them backgrounds in {shard.theme}. " if shard.theme else ""
+    # Follow-ups name the developers already generated, so they are not repeated
+    taken = f"Do not use these names: {', '.join(d['name'] for d in earlier)}. " if earlier else ""
+    return f"""
+    Generate {count} realistic software developer profiles. {theme}{taken}Return JSON array only:
+    [
+        {{
+            "name": "Full Name",
+            "skills": ["skill1", "skill2", "skill3"],
+            "experience_years": 5,
+            "profile_summary": "Brief summary"
+        }}
+    ]
+    """
+
+def _tickets_prompt(count: int, shard: _Shard, earlier: List[Dict[str, Any]]) -> str:
+    theme = f"They are for a {shard.theme} product. " if shard.theme else ""
+    # Each shard, and each follow-up, continues the numbering after the highest id so far
+    numbers = [int(m.group(1)) for m in (re.fullmatch(r"TASK-(\d+)", t["id"]) for t in earlier) if m]
+    start = max(numbers, default=shard.start + len(earlier))
+    numbering = f"Number them from TASK-{start + 1:03d}. " if start else ""
+    return f"""
+    Generate {count} realistic software development tickets. {theme}{numbering}Return JSON array only:
+    [
+        {{
+            "id": "TASK-{start + 1:03d}",
+            "title": "Task title",
+            "description": "Detailed description"
+        }}
+    ]
+    """
+
+def _fallback_developer(i: int) -> Dict[str, Any]:
+    return {"name": f"Dev {i}", "skills": ["Python"], "experience_years": 3, "profile_summary": "Developer"}
+
+def _fallback_ticket(i: int) -> Dict[str, Any]:
+    return {"id": f"T{i}", "title": f"Task {i}", "description": "Sample task"}
+
+DEVELOPER_GENERATOR = _Generator(
+    "generate-developers", Developer, "name", _developers_prompt, 0.8, _fallback_developer, DEVELOPERS_FORMAT, 60
+)
+TICKET_GENERATOR = _Generator(
+    "generate-tickets", Ticket, "id", _tickets_prompt, 0.7, _fallback_ticket, TICKETS_FORMAT, 45
+)
+
+async def _generated_response(
+    generator: _Generator, count: int, cache_control: Optional[str], stream: Optional[StreamMode]
+):
+    if stream:
+        await limiter.acquire()
+        return _streaming_response(
+            _stream_generated(generator, count, cache_control, stream), stream, holds_slot=True
         )
-        
-        result_text = response.choices[0].message.content
-        # Clean up the response to extract JSON
-        if "```json" in result_text:
-            result_text = result_text.split("```json")[1].split("```")[0]
-        elif "```" in result_text:
-            result_text = result_text.split("```")[1].split("```")[0]
-        
-        assignments = json.loads(result_text.strip())
-        return assignments
-        
-    except Exception as e:
-        # Fallback: simple rule-based matching
-        assignments = []
-        for i, ticket in enumerate(request.tickets[:len(request.developers)]):
-            dev = request.developers[i]
-            assignments.append({
-                "ticketId": ticket.id,
-                "developerName": dev.name,
-                "reason": f"Matched based on {dev.experience_years} years experience",
-                "matchScore": 75.0
-            })
-        return assignments
-
-@app.post("/api/generate-developers")
-def generate_developers(count: int = 10):
-    """Generate developer profiles."""
-    if not openai_client:
+    async with limiter.slot():
+        return await _generate(generator, count, cache_control)
+
+@app.post("/api/generate-developers", response_model=List[Developer])
+async def generate_developers(
+    count: int = Query(default=10, ge=0, le=GENERATE_MAX_COUNT),
+    cache_control: Optional[str] = Header(default=None),
+    stream: Optional[StreamMode] = None,
+):
+    """Generate developer profiles.
+
+    Counts too large for one completion are split into shards generated
+    concurrently; with ``?stream=`` objects arrive as any shard finishes them.
+    """
+    if not llm_backend:
         # Fallback data
-        return [
+        developers = [
             {
                 "name": f"Developer {i+1}",
                 "skills": ["Python", "React", "JavaScript"],
@@ -127,45 +643,26 @@ def generate_developers(count: int = 10):
             }
             for i in range(count)
         ]
-    
-    try:
-        prompt = f"""
-        Generate {count} realistic software developer profiles. Return JSON array only:
-        [
-            {{
-                "name": "Full Name",
-                "skills": ["skill1", "skill2", "skill3"],
-                "experience_years": 5,
-                "profile_summary": "Brief summary"
-            }}
-        ]
-        """
-        
-        response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.8,
-            max_tokens=2000
-        )
-        
-        result_text = response.choices[0].message.content
-        if "```json" in result_text:
-            result_text = result_text.split("```json")[1].split("```")[0]
-        elif "```" in result_text:
-            result_text = result_text.split("```")[1].split("```")[0]
-        
-        return json.loads(result_text.strip())
-        
-    except Exception as e:
-        # Fallback
-        return [{"name": f"Dev {i}", "skills": ["Python"], "experience_years": 3, "profile_summary": "Developer"} for i in range(count)]
-
-@app.post("/api/generate-tickets")
-def generate_tickets(count: int = 10):
-    """Generate tickets."""
-    if not openai_client:
+        if stream:
+            return _streaming_response(_stream_items(developers, stream), stream)
+        return developers
+
+    return await _generated_response(DEVELOPER_GENERATOR, count, cache_control, stream)
+
+@app.post("/api/generate-tickets", response_model=List[Ticket])
+async def generate_tickets(
+    count: int = Query(default=10, ge=0, le=GENERATE_MAX_COUNT),
+    cache_control: Optional[str] = Header(default=None),
+    stream: Optional[StreamMode] = None,
+):
+    """Generate tickets.
+
+    Counts too large for one completion are split into shards generated
+    concurrently; with ``?stream=`` objects arrive as any shard finishes them.
+    """
+    if not llm_backend:
         # Fallback data
-        return [
+        tickets = [
             {
                 "id": f"TASK-{i+1:03d}",
                 "title": f"Sample Task {i+1}",
@@ -173,37 +670,11 @@ def generate_tickets(count: int = 10):
             }
             for i in range(count)
         ]
-    
-    try:
-        prompt = f"""
-        Generate {count} realistic software development tickets. Return JSON array only:
-        [
-            {{
-                "id": "TASK-001",
-                "title": "Task title",
-                "description": "Detailed description"
-            }}
-        ]
-        """
-        
-        response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7,
-            max_tokens=2000
-        )
-        
-        result_text = response.choices[0].message.content
-        if "```json" in result_text:
-            result_text = result_text.split("```json")[1].split("```")[0]
-        elif "```" in result_text:
-            result_text = result_text.split("```")[1].split("```")[0]
-        
-        return json.loads(result_text.strip())
-        
-    except Exception as e:
-        # Fallback
-        return [{"id": f"T{i}", "title": f"Task {i}", "description": "Sample task"} for i in range(count)]
+        if stream:
+            return _streaming_response(_stream_items(tickets, stream), stream)
+        return tickets
+
+    return await _generated_response(TICKET_GENERATOR, count, cache_control, stream)
 
 if __name__ == "__main__":
     import uvicorn
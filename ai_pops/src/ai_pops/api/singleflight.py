@@ -0,0 +1,113 @@
+"""Single-flight coalescing of identical in-flight LLM calls.
+
+Concurrent requests for the same completion (same cache key) share one
+upstream call: the first becomes the leader and starts it, later ones follow
+it. The call runs as its own task and records the text pieces it receives;
+each caller reads them from the start at its own pace, so a streaming and a
+non-streaming caller, or a follower that joins half-way through a stream,
+all get the same complete answer. This is also what turns a burst of
+requests right after a cache entry expires into a single upstream call.
+
+A caller that goes away (client disconnect, cancelled chunk) stops reading
+but leaves the call running for the others; the call is cancelled only once
+nobody is reading it. An error reaches every caller of that flight, and the
+next request starts a fresh call.
+"""
+
+import asyncio
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from ai_pops.api.metrics import LLM_COALESCED
+
+
+class _Flight:
+    def __init__(self):
+        self.pieces: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.readers = 0
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+
+    def notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def follow(self) -> AsyncIterator[str]:
+        i = 0
+        while True:
+            while i < len(self.pieces):
+                yield self.pieces[i]
+                i += 1
+            if self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+            await self._changed.wait()
+
+
+class SingleFlight:
+    """Share one in-flight call per key among every concurrent caller."""
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    def join(self, key: str, produce: Callable[[], AsyncIterator[str]]) -> Tuple[AsyncIterator[str], bool]:
+        """The pieces of the call for ``key``, and whether this caller started it.
+
+        ``produce`` starts the upstream call; it is only used when no call
+        for ``key`` is in flight.
+        """
+        flight = self._flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = self._flights[key] = _Flight()
+            flight.task = asyncio.create_task(self._run(key, flight, produce))
+            self.leaders += 1
+        else:
+            self.followers += 1
+        LLM_COALESCED.inc(role="leader" if leader else "follower")
+        return self._read(key, flight), leader
+
+    async def _run(self, key: str, flight: _Flight, produce: Callable[[], AsyncIterator[str]]) -> None:
+        try:
+            async for piece in produce():
+                flight.pieces.append(piece)
+                flight.notify()
+        except BaseException as e:
+            # Handed to the readers; also swallows the cancellation below
+            flight.error = e
+        finally:
+            flight.done = True
+            self._forget(key, flight)
+            flight.notify()
+
+    async def _read(self, key: str, flight: _Flight) -> AsyncIterator[str]:
+        flight.readers += 1
+        try:
+            async for piece in flight.follow():
+                yield piece
+        finally:
+            flight.readers -= 1
+            if flight.readers == 0 and not flight.done:
+                # Nobody is left to read it; later callers start a new call
+                self._forget(key, flight)
+                flight.task.cancel()
+
+    def _forget(self, key: str, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def stats(self) -> dict:
+        calls = self.leaders + self.followers
+        return {
+            "in_flight": len(self._flights),
+            "leaders": self.leaders,
+            "followers": self.followers,
+            "coalescing_ratio": round(self.followers / calls, 4) if calls else 0.0,
+        }
+
+
+singleflight = SingleFlight()
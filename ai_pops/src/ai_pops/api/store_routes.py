@@ -0,0 +1,102 @@
+"""CRUD endpoints for the persistent team store.
+
+Every write re-solves the stored assignment incrementally, so
+``GET /api/assignments`` always reflects the current team and backlog.
+``GET /api/candidates`` ranks the stored team for one ticket by embedding
+similarity.
+"""
+
+from typing import List
+
+from fastapi import APIRouter, HTTPException, Query
+
+from ai_pops.api.models import Assignment, Candidate, Developer, Ticket
+from ai_pops.services.embedding_service import get_developer_index
+from ai_pops.services.store_service import get_store
+
+router = APIRouter(prefix="/api")
+
+
+@router.get("/developers", response_model=List[Developer])
+def list_developers():
+    return get_store().list_developers()
+
+
+@router.post("/developers", response_model=Developer)
+def create_developer(developer: Developer):
+    return get_store().upsert_developer(developer)
+
+
+@router.get("/developers/{name}", response_model=Developer)
+def get_developer(name: str):
+    developer = get_store().developers.get(name)
+    if developer is None:
+        raise HTTPException(status_code=404, detail=f"Developer '{name}' not found")
+    return developer
+
+
+@router.put("/developers/{name}", response_model=Developer)
+def update_developer(name: str, developer: Developer):
+    if developer.name != name:
+        raise HTTPException(status_code=400, detail="Developer name does not match the URL")
+    return get_store().upsert_developer(developer)
+
+
+@router.delete("/developers/{name}")
+def delete_developer(name: str):
+    if not get_store().delete_developer(name):
+        raise HTTPException(status_code=404, detail=f"Developer '{name}' not found")
+    return {"deleted": name}
+
+
+@router.get("/tickets", response_model=List[Ticket])
+def list_tickets():
+    return get_store().list_tickets()
+
+
+@router.post("/tickets", response_model=Ticket)
+def create_ticket(ticket: Ticket):
+    return get_store().upsert_ticket(ticket)
+
+
+@router.get("/tickets/{ticket_id}", response_model=Ticket)
+def get_ticket(ticket_id: str):
+    ticket = get_store().tickets.get(ticket_id)
+    if ticket is None:
+        raise HTTPException(status_code=404, detail=f"Ticket '{ticket_id}' not found")
+    return ticket
+
+
+@router.put("/tickets/{ticket_id}", response_model=Ticket)
+def update_ticket(ticket_id: str, ticket: Ticket):
+    if ticket.id != ticket_id:
+        raise HTTPException(status_code=400, detail="Ticket id does not match the URL")
+    return get_store().upsert_ticket(ticket)
+
+
+@router.delete("/tickets/{ticket_id}")
+def delete_ticket(ticket_id: str):
+    if not get_store().delete_ticket(ticket_id):
+        raise HTTPException(status_code=404, detail=f"Ticket '{ticket_id}' not found")
+    return {"deleted": ticket_id}
+
+
+@router.get("/assignments", response_model=List[Assignment])
+def list_assignments():
+    """Current optimal assignment of every stored ticket."""
+    return get_store().assignments()
+
+
+@router.get("/candidates", response_model=List[Candidate])
+def ticket_candidates(ticket_id: str, k: int = Query(default=10, ge=1, le=100)):
+    """Stored developers nearest to a stored ticket in embedding space."""
+    store = get_store()
+    ticket = store.tickets.get(ticket_id)
+    if ticket is None:
+        raise HTTPException(status_code=404, detail=f"Ticket '{ticket_id}' not found")
+    index = get_developer_index()
+    index.sync(store.list_developers())
+    return [
+        Candidate(developerName=name, score=round(score * 100, 1))
+        for name, score in index.candidates(ticket, k)
+    ]
@@ -0,0 +1,108 @@
+"""Incremental JSON parsing and NDJSON / SSE framing for streamed responses."""
+
+from typing import Any, List
+
+import orjson
+
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+
+class JSONArrayStreamParser:
+    """Pull complete objects out of a JSON array as its text arrives.
+
+    Feed the completion token by token; every top-level object (or nested
+    array) of the array is returned as soon as its closing bracket is seen. Text before the opening
+    ``[`` (such as a ```json fence) and after the closing ``]`` is ignored.
+    Each character is examined once, so parsing stays linear in the response
+    length however finely it is split.
+
+    The same parser salvages a truncated or malformed answer: every complete
+    object before the damage is still returned. ``consumed`` is how many
+    characters of the text fed so far ended in a returned object (or closed
+    the array) and ``dropped`` how many were spent on objects that did not
+    decode, so the rest of the answer is what a truncation threw away.
+    """
+
+    def __init__(self):
+        self.started = False
+        self.complete = False
+        self._depth = 0  # nesting of [ and {, the outer array being 1
+        self._in_string = False
+        self._escaped = False
+        self._pieces: List[str] = []  # text of the object being captured
+        self._fed = 0  # characters fed before the current piece of text
+        self.consumed = 0
+        self.dropped = 0
+
+    def feed(self, text: str) -> List[Any]:
+        items = []
+        capture_from = 0 if self._pieces else None
+        for index, char in enumerate(text):
+            if self.complete:
+                break
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if not self.started:
+                if char == "[":
+                    self.started = True
+                    self._depth = 1
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                if self._depth == 1:
+                    capture_from = index
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self.complete = True
+                    self.consumed = self._fed + index + 1
+                elif self._depth == 1 and capture_from is not None:
+                    self._pieces.append(text[capture_from:index + 1])
+                    captured = "".join(self._pieces)
+                    try:
+                        items.append(orjson.loads(captured))
+                    except ValueError:
+                        # A malformed object is dropped, the rest still parse
+                        self.dropped += len(captured)
+                    self.consumed = self._fed + index + 1
+                    self._pieces = []
+                    capture_from = None
+
+        if capture_from is not None:
+            self._pieces.append(text[capture_from:])
+        self._fed += len(text)
+        return items
+
+
+def format_event(item: Any, mode: str) -> str:
+    """Frame one object as an NDJSON line or a Server-Sent Event."""
+    payload = orjson.dumps(item).decode()
+    if mode == "sse":
+        return f"data: {payload}\n\n"
+    return payload + "\n"
+
+
+def format_error(message: str, mode: str) -> str:
+    """Error frame for a stream that fails after its 200 has been sent."""
+    payload = orjson.dumps({"error": message}).decode()
+    if mode == "sse":
+        return f"event: error\ndata: {payload}\n\n"
+    return payload + "\n"
+
+
+def format_end(mode: str) -> str:
+    """Terminating frame; NDJSON streams simply end."""
+    return "event: end\ndata: {}\n\n" if mode == "sse" else ""
@@ -0,0 +1,167 @@
+"""Run the AiPops crew over many inputs concurrently, resumably.
+
+Inputs come from a JSONL file, one dict of crew inputs per line. Each input
+runs in a worker process from a process pool and writes its report to its own
+file under the output directory. Every finished input is appended to a
+progress ledger (``progress.jsonl`` in the output directory), so re-running
+the same batch after a crash skips the inputs that already completed and
+retries only the ones that failed or never ran.
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", str(min(4, os.cpu_count() or 1))))
+BATCH_OUTPUT_DIR = os.getenv("BATCH_OUTPUT_DIR", "output/batch")
+PROGRESS_FILE = "progress.jsonl"
+
+BatchItem = Tuple[str, Dict[str, Any]]
+
+
+def input_key(inputs: Dict[str, Any]) -> str:
+    """Stable identifier of one input: its ``id`` field, or a slug of the topic plus a hash."""
+    if inputs.get("id"):
+        return re.sub(r"[^A-Za-z0-9_.-]+", "-", str(inputs["id"])).strip("-")
+    digest = hashlib.sha1(json.dumps(inputs, sort_keys=True).encode("utf-8")).hexdigest()[:10]
+    slug = re.sub(r"[^a-z0-9]+", "-", str(inputs.get("topic", "")).lower()).strip("-")[:40]
+    return f"{slug}-{digest}" if slug else digest
+
+
+def read_inputs(path: str) -> List[BatchItem]:
+    """Parse the JSONL input file into ``(key, inputs)`` pairs, in file order."""
+    items: List[BatchItem] = []
+    seen: Set[str] = set()
+    with open(path, encoding="utf-8") as handle:
+        for line_number, line in enumerate(handle, 1):
+            if not line.strip():
+                continue
+            inputs = json.loads(line)
+            if not isinstance(inputs, dict):
+                raise ValueError(f"{path}:{line_number}: expected a JSON object")
+            inputs.setdefault("current_year", str(datetime.now().year))
+            key = input_key(inputs)
+            if key in seen:
+                raise ValueError(f"{path}:{line_number}: duplicate input '{key}'")
+            seen.add(key)
+            items.append((key, inputs))
+    return items
+
+
+def completed_keys(progress_path: Path) -> Set[str]:
+    """Inputs the ledger records as done whose report is still on disk."""
+    done: Set[str] = set()
+    if not progress_path.exists():
+        return done
+    with open(progress_path, encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # a line torn by a crash mid-write
+            if entry.get("status") == "done" and Path(entry.get("output", "")).exists():
+                done.add(entry["key"])
+            elif entry.get("key") in done:
+                done.discard(entry["key"])
+    return done
+
+
+def report_path(output_dir: str, key: str) -> str:
+    # CrewAI strips leading slashes from output_file and refuses "..", so
+    # reports are addressed relative to the working directory
+    path = os.path.relpath(Path(output_dir) / f"{key}.md")
+    if path.startswith(".."):
+        raise ValueError(f"Output directory {output_dir} must be inside {os.getcwd()}")
+    return path
+
+
+def run_crew(key: str, inputs: Dict[str, Any], output: str) -> Dict[str, Any]:
+    """Kick off one crew run inside a worker process."""
+    from ai_pops.crew import AiPops
+
+    started = time.perf_counter()
+    try:
+        AiPops(report_path=output).crew().kickoff(inputs=inputs)
+        status, error = "done", None
+    except Exception:
+        status, error = "failed", traceback.format_exc(limit=3)
+    return {
+        "key": key,
+        "status": status,
+        "output": output,
+        "seconds": round(time.perf_counter() - started, 2),
+        "error": error,
+    }
+
+
+def run_batch(
+    inputs_path: str,
+    output_dir: str = BATCH_OUTPUT_DIR,
+    workers: int = BATCH_WORKERS,
+    runner: Callable[[str, Dict[str, Any], str], Dict[str, Any]] = run_crew,
+) -> Dict[str, int]:
+    """Run every pending input of ``inputs_path``; returns counts per outcome."""
+    items = read_inputs(inputs_path)
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    progress_path = Path(output_dir) / PROGRESS_FILE
+    done = completed_keys(progress_path)
+    pending = [(key, inputs) for key, inputs in items if key not in done]
+    summary = {"total": len(items), "skipped": len(items) - len(pending), "done": 0, "failed": 0}
+    print(f"{len(items)} inputs, {summary['skipped']} already done, {len(pending)} to run on {workers} workers")
+    if not pending:
+        return summary
+
+    # Spawned workers start clean instead of inheriting this process's threads
+    context = multiprocessing.get_context("spawn")
+    with open(progress_path, "a", encoding="utf-8") as ledger, \
+            ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = {
+            pool.submit(runner, key, inputs, report_path(output_dir, key)): key
+            for key, inputs in pending
+        }
+        try:
+            remaining = set(futures)
+            while remaining:
+                finished, remaining = wait(remaining, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    key = futures[future]
+                    try:
+                        entry = future.result()
+                    except Exception as e:  # the worker process itself died
+                        entry = {"key": key, "status": "failed", "output": "", "seconds": 0, "error": repr(e)}
+                    entry["finished_at"] = datetime.now().isoformat(timespec="seconds")
+                    ledger.write(json.dumps(entry) + "\n")
+                    ledger.flush()
+                    os.fsync(ledger.fileno())
+                    summary[entry["status"]] += 1
+                    print(f"[{summary['done'] + summary['failed']}/{len(pending)}] {key}: {entry['status']}")
+        except KeyboardInterrupt:
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the AiPops crew for every input in a JSONL file.")
+    parser.add_argument("inputs", help="JSONL file, one object of crew inputs (e.g. topic) per line")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS, help="crews running at once")
+    parser.add_argument("--output-dir", default=BATCH_OUTPUT_DIR, help="reports and progress ledger")
+    args = parser.parse_args(argv)
+
+    summary = run_batch(args.inputs, args.output_dir, args.workers)
+    print(f"done: {summary['done']}, failed: {summary['failed']}, skipped: {summary['skipped']}")
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
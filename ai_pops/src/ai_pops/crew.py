@@ -3,8 +3,20 @@ from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task, before_kickoff, after_kickoff
 # from crewai_tools import SerperDevTool  # Removed to avoid chromadb dependency
 from crewai.agents.agent_builder.base_agent import BaseAgent
+import os
 from typing import List
 
+from ai_pops.dag import DagCrew
+from ai_pops.knowledge import KnowledgeTask
+from ai_pops.scheduled_llm import scheduled_llm
+from ai_pops.tools import DeveloperSkillLookupTool
+
+# "sequential", or "dag" to research several facets of the topic at once
+# (see dag.py) before the report is written
+CREW_PROCESS = os.getenv('CREW_PROCESS', 'sequential')
+# Facets of research_subtopic_task researched concurrently in dag mode
+CREW_RESEARCH_FANOUT = int(os.getenv('CREW_RESEARCH_FANOUT', '4'))
+
 @CrewBase
 class AiPops():
   """AI Pops crew for intelligent matching and automation"""
@@ -12,6 +24,13 @@ class AiPops():
   agents: List[BaseAgent]
   tasks: List[Task]
 
+  def __init__(self, report_path: str = 'output/report.md'):
+    # Batch runs give every input its own report file
+    self.report_path = report_path
+    # One instance for all researchers, so they share its cache and batches
+    # (see tools/cached_tool.py)
+    self.developer_lookup = DeveloperSkillLookupTool()
+
   @before_kickoff
   def before_kickoff_function(self, inputs):
     print(f"Before kickoff function with inputs: {inputs}")
@@ -26,33 +45,73 @@ class AiPops():
   def researcher(self) -> Agent:
     return Agent(
       config=self.agents_config['researcher'], # type: ignore[index]
+      # Queued, rate-limited and retried with the API's calls (scheduled_llm.py)
+      llm=scheduled_llm(self.agents_config['researcher'].get('llm')), # type: ignore[index]
       verbose=True,
       # tools=[SerperDevTool()]  # Removed to avoid chromadb dependency
+      tools=[self.developer_lookup],
     )
 
   @agent
   def reporting_analyst(self) -> Agent:
     return Agent(
       config=self.agents_config['reporting_analyst'], # type: ignore[index]
+      llm=scheduled_llm(self.agents_config['reporting_analyst'].get('llm')), # type: ignore[index]
       verbose=True
     )
 
+  # KnowledgeTask adds the knowledge/ passages most relevant to the task to
+  # its context (see knowledge.py), and as a CachedTask replays stored output
+  # when the rendered prompt, agent, model and context are unchanged
+  # (see task_cache.py)
   @task
   def research_task(self) -> Task:
-    return Task(
+    return KnowledgeTask(
       config=self.tasks_config['research_task'], # type: ignore[index]
     )
 
   @task
   def reporting_task(self) -> Task:
-    return Task(
+    return KnowledgeTask(
       config=self.tasks_config['reporting_task'], # type: ignore[index]
-      output_file='output/report.md' # This is the file that will be contain the final report.
+      output_file=self.report_path # This is the file that will be contain the final report.
     )
 
+  def subtopic_research_tasks(self) -> List[Task]:
+    """One independent research task, with its own researcher, per facet of the topic"""
+    config = self.tasks_config['research_subtopic_task'] # type: ignore[index]
+    tasks = []
+    for i, facet in enumerate(config['facets'][:CREW_RESEARCH_FANOUT]):
+      tasks.append(KnowledgeTask(
+        config=config,
+        name=f'research_task_{i + 1}',
+        # {topic} is filled in at kickoff, the facet right away
+        description=config['description'].replace('{facet}', facet),
+        expected_output=config['expected_output'].replace('{facet}', facet),
+        # Agents keep per-task state, so concurrent tasks each get their own
+        agent=Agent(
+          config=self.agents_config['researcher'], # type: ignore[index]
+          llm=scheduled_llm(self.agents_config['researcher'].get('llm')), # type: ignore[index]
+          verbose=True,
+          tools=[self.developer_lookup],
+        ),
+        context=None,
+      ))
+    return tasks
+
   @crew
   def crew(self) -> Crew:
     """Creates the AI Pops crew"""
+    if CREW_PROCESS == 'dag':
+      research = self.subtopic_research_tasks()
+      reporting = self.reporting_task()
+      reporting.context = research
+      return DagCrew(
+        agents=[task.agent for task in research] + [reporting.agent],
+        tasks=research + [reporting],
+        process=Process.sequential,
+        verbose=True,
+      )
     return Crew(
       agents=self.agents, # Automatically created by the @agent decorator
       tasks=self.tasks, # Automatically created by the @task decorator
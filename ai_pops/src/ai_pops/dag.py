@@ -0,0 +1,152 @@
+"""Dependency-graph execution of crew tasks.
+
+``DagCrew`` starts each task as soon as the tasks it depends on have
+finished, running up to ``CREW_MAX_PARALLEL_TASKS`` at once instead of one
+after another. A task depends on the tasks in its ``context``. A task
+without an explicit ``context`` depends on every task before it, as in a
+sequential crew, and ``context=None`` means no dependencies at all.
+
+When a task depends on several others, ``merge_outputs`` merges their
+outputs. Repeated points are dropped, and the rest is trimmed to
+``CREW_CONTEXT_TOKENS``. Points are taken from each source in turn, so every
+upstream task keeps its leading findings when the budget is tight.
+"""
+
+import contextvars
+import os
+import re
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Set
+
+from crewai import Crew, Task
+from crewai.crews.crew_output import CrewOutput
+from crewai.tasks.conditional_task import ConditionalTask
+from crewai.tasks.task_output import TaskOutput
+from crewai.utilities.constants import NOT_SPECIFIED
+from pydantic import Field
+
+from ai_pops.api.backends import CHARS_PER_TOKEN
+
+# Tasks of one crew run executing at once
+CREW_MAX_PARALLEL_TASKS = int(os.getenv("CREW_MAX_PARALLEL_TASKS", "4"))
+# Token budget of the context merged from several upstream tasks
+CREW_CONTEXT_TOKENS = int(os.getenv("CREW_CONTEXT_TOKENS", "6000"))
+
+SEPARATOR = "\n\n----------\n\n"
+_BULLET = re.compile(r"^\s*(?:[-*•+]|\d+[.)])\s+")
+
+
+def _points(text: str) -> List[str]:
+    """Split an output into points: bullet items and paragraphs, with their continuation lines."""
+    points: List[List[str]] = []
+    current: Optional[List[str]] = None
+    for line in text.splitlines():
+        if not line.strip():
+            current = None
+        elif current is None or _BULLET.match(line):
+            current = [line.rstrip()]
+            points.append(current)
+        else:
+            current.append(line.rstrip())
+    return ["\n".join(point) for point in points]
+
+
+def _words(point: str) -> Set[str]:
+    return set(re.findall(r"[a-z0-9]+", _BULLET.sub("", point).lower()))
+
+
+def merge_outputs(outputs: List[str], budget_tokens: int = CREW_CONTEXT_TOKENS) -> str:
+    """Deduplicated points of ``outputs``, within ``budget_tokens``, grouped by output."""
+    kept_words: List[Set[str]] = []
+    unique: List[List[str]] = []
+    for output in outputs:
+        points = []
+        for point in _points(output):
+            words = _words(point)
+            if not words:
+                continue
+            # A point adding no words to an earlier one repeats it
+            if any(words <= seen for seen in kept_words):
+                continue
+            kept_words.append(words)
+            points.append(point)
+        unique.append(points)
+
+    # One point from every output in turn, skipping any that no longer fits
+    budget = budget_tokens * CHARS_PER_TOKEN
+    taken: List[Set[int]] = [set() for _ in unique]
+    for rank in range(max(map(len, unique), default=0)):
+        for source, points in enumerate(unique):
+            if rank < len(points) and len(points[rank]) + 1 <= budget:
+                taken[source].add(rank)
+                budget -= len(points[rank]) + 1
+    blocks = ["\n".join(p for rank, p in enumerate(points) if rank in taken[i]) for i, points in enumerate(unique)]
+    return SEPARATOR.join(block for block in blocks if block)
+
+
+def task_dependencies(tasks: List[Task]) -> List[List[int]]:
+    """For each task, the positions of the tasks it waits for."""
+    position = {id(task): i for i, task in enumerate(tasks)}
+    dependencies = []
+    for i, task in enumerate(tasks):
+        if task.context is NOT_SPECIFIED:
+            dependencies.append(list(range(i)))
+        else:
+            dependencies.append([position[id(c)] for c in task.context or [] if id(c) in position])
+    return dependencies
+
+
+class DagCrew(Crew):
+    """``Crew`` whose independent tasks run concurrently."""
+
+    max_parallel_tasks: int = Field(default=CREW_MAX_PARALLEL_TASKS, ge=1)
+    context_tokens: int = Field(default=CREW_CONTEXT_TOKENS, ge=1)
+
+    def _execute_tasks(
+        self,
+        tasks: List[Task],
+        start_index: Optional[int] = 0,
+        was_replayed: bool = False,
+    ) -> CrewOutput:
+        if any(isinstance(task, ConditionalTask) for task in tasks):
+            raise ValueError("Conditional tasks need a sequential crew")
+        dependencies = task_dependencies(tasks)
+        outputs: Dict[int, TaskOutput] = {}
+        pending = []
+        for i, task in enumerate(tasks):
+            # Replays resume after tasks whose outputs are already known
+            if start_index is not None and i < start_index and task.output:
+                outputs[i] = task.output
+            else:
+                pending.append(i)
+
+        running: Dict[Future, int] = {}
+        with ThreadPoolExecutor(max_workers=self.max_parallel_tasks, thread_name_prefix="crew-task") as pool:
+            while pending or running:
+                for i in [i for i in pending if all(d in outputs for d in dependencies[i])]:
+                    pending.remove(i)
+                    context = self._merged_context(tasks[i], [outputs[d] for d in dependencies[i]])
+                    # Each task thread sees the caller's context variables
+                    running[pool.submit(contextvars.copy_context().run, self._run_task, tasks[i], context)] = i
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i = running.pop(future)
+                    outputs[i] = future.result()
+                    self._process_task_result(tasks[i], outputs[i])
+                    self._store_execution_log(tasks[i], outputs[i], i, was_replayed)
+        return self._create_crew_output([outputs[i] for i in sorted(outputs)])
+
+    def _merged_context(self, task: Task, upstream: List[TaskOutput]) -> str:
+        if not task.context or not upstream:
+            return ""
+        if len(upstream) == 1:
+            return upstream[0].raw
+        return merge_outputs([output.raw for output in upstream], self.context_tokens)
+
+    def _run_task(self, task: Task, context: str) -> TaskOutput:
+        agent = self._get_agent_to_use(task)
+        if agent is None:
+            raise ValueError(f"No agent available for task: {task.description}")
+        tools = self._prepare_tools(agent, task, task.tools or agent.tools or [])
+        self._log_task_start(task, agent.role)
+        return task.execute_sync(agent=agent, context=context, tools=tools)
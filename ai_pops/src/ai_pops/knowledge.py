@@ -0,0 +1,49 @@
+"""Knowledge retrieval for crew tasks.
+
+A ``KnowledgeTask`` searches the knowledge index (``services.knowledge_service``)
+with its rendered description and expected output just before it runs. The
+``knowledge_top_k`` best chunks are appended to the task's context. So an
+agent sees only the passages relevant to its task, not every knowledge file,
+and adding files to ``knowledge/`` does not make every prompt longer.
+
+The retrieved text is part of the context, so it is also part of the task's
+cache key. An edit to a passage a task retrieves re-runs that task, and
+other edits do not.
+"""
+
+from typing import Any, List, Optional
+
+from crewai.agents.agent_builder.base_agent import BaseAgent
+from crewai.tasks.task_output import TaskOutput
+from pydantic import Field
+
+from ai_pops.services.knowledge_service import KNOWLEDGE_TOP_K, get_knowledge_index
+from ai_pops.task_cache import CachedTask
+
+
+def knowledge_context(query: str, k: int) -> str:
+    """The top-``k`` knowledge chunks for ``query``, each headed by its file."""
+    if k <= 0:
+        return ""
+    try:
+        found = get_knowledge_index().search(query, k)
+    except Exception as e:
+        # The task can still run on what the agent knows
+        print(f"Knowledge search failed, continuing without it: {e}")
+        return ""
+    if not found:
+        return ""
+    passages = "\n\n".join(f"[{path}]\n{text}" for path, text, _score in found)
+    return f"Relevant excerpts from the knowledge base:\n\n{passages}"
+
+
+class KnowledgeTask(CachedTask):
+    """A ``CachedTask`` whose context includes the knowledge chunks most relevant to it."""
+
+    knowledge_top_k: int = Field(default=KNOWLEDGE_TOP_K, ge=0)
+
+    def _execute_core(self, agent: Optional[BaseAgent], context: Optional[str], tools: Optional[List[Any]]) -> TaskOutput:
+        knowledge = knowledge_context(f"{self.description}\n{self.expected_output}", self.knowledge_top_k)
+        if knowledge:
+            context = f"{context}\n\n{knowledge}" if context else knowledge
+        return super()._execute_core(agent, context, tools)
@@ -4,15 +4,24 @@ import warnings
 
 from datetime import datetime
 
-from ai_pops.crew import AiPops
-
-warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
-
 # This main file is intended to be a way for you to run your
 # crew locally, so refrain from adding unnecessary logic into this file.
 # Replace with inputs you want to test with, it will automatically
 # interpolate any tasks and agents information
 
+def _crew_base():
+    """
+    Build the crew definition, importing crewai only for the commands that run it.
+    """
+    warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
+    from ai_pops.crew import AiPops
+
+    return AiPops()
+
+
+def _crew():
+    return _crew_base().crew()
+
 def run():
     """
     Run the crew.
@@ -23,11 +32,50 @@ def run():
     }
     
     try:
-        AiPops().crew().kickoff(inputs=inputs)
+        crew_base = _crew_base()
+        from ai_pops.profiler import CREW_PROFILE, profile_crew
+
+        # CREW_PROFILE=output/profile.json records a Chrome trace of the run
+        with profile_crew(CREW_PROFILE, crew_base.agents_config):
+            crew_base.crew().kickoff(inputs=inputs)
     except Exception as e:
         raise Exception(f"An error occurred while running the crew: {e}")
 
 
+def run_batch():
+    """
+    Run the crew for every input in a JSONL file, several at a time.
+    Usage: run_batch inputs.jsonl [--workers N] [--output-dir DIR]
+    """
+    from ai_pops.batch import main as batch_main
+
+    sys.exit(batch_main(sys.argv[1:]))
+
+
+def index_knowledge():
+    """
+    Bring the knowledge index up to date with the knowledge/ directory.
+    """
+    from ai_pops.services.knowledge_service import KNOWLEDGE_DIR, get_knowledge_index
+
+    index = get_knowledge_index()
+    changes = index.refresh()
+    print(
+        f"{KNOWLEDGE_DIR}: {changes['files']} files indexed, {changes['removed']} removed, "
+        f"{changes['embedded']} chunks embedded, {len(index)} chunks in the index"
+    )
+
+
+def generate_fixtures():
+    """
+    Write seeded synthetic developers and tickets for load tests, no LLM needed.
+    Usage: generate_fixtures DEVELOPERS TICKETS [--seed N] [--output FILE]
+    """
+    from ai_pops.services.synthetic_service import main as fixtures_main
+
+    sys.exit(fixtures_main(sys.argv[1:]))
+
+
 def train():
     """
     Train the crew for a given number of iterations.
@@ -37,7 +85,7 @@ def train():
         'current_year': str(datetime.now().year)
     }
     try:
-        AiPops().crew().train(n_iterations=int(sys.argv[1]), filename=sys.argv[2], inputs=inputs)
+        _crew().train(n_iterations=int(sys.argv[1]), filename=sys.argv[2], inputs=inputs)
 
     except Exception as e:
         raise Exception(f"An error occurred while training the crew: {e}")
@@ -47,7 +95,7 @@ def replay():
     Replay the crew execution from a specific task.
     """
     try:
-        AiPops().crew().replay(task_id=sys.argv[1])
+        _crew().replay(task_id=sys.argv[1])
 
     except Exception as e:
         raise Exception(f"An error occurred while replaying the crew: {e}")
@@ -62,7 +110,15 @@ def test():
     }
     
     try:
-        AiPops().crew().test(n_iterations=int(sys.argv[1]), eval_llm=sys.argv[2], inputs=inputs)
+        crew_base = _crew_base()
+        from ai_pops.profiler import (
+            CREW_PROFILE, CREW_PROFILE_BASELINE, compare_runs, load_runs, profile_crew,
+        )
+
+        # Every iteration is profiled so a regression can be traced to one step
+        with profile_crew(CREW_PROFILE or "output/test_profile.json", crew_base.agents_config) as profiler:
+            crew_base.crew().test(n_iterations=int(sys.argv[1]), eval_llm=sys.argv[2], inputs=inputs)
+        compare_runs(profiler.summary(), load_runs(CREW_PROFILE_BASELINE) if CREW_PROFILE_BASELINE else None)
 
     except Exception as e:
         raise Exception(f"An error occurred while testing the crew: {e}")
@@ -0,0 +1,346 @@
+"""Profile crew runs step by step.
+
+``CrewProfiler`` listens to crewAI's event bus while a crew runs and records,
+for every kickoff, a span per task, agent execution, LLM call and tool call.
+Spans are written in the Chrome trace event format (open the file in
+``chrome://tracing``, Perfetto or speedscope), one process per kickoff and one
+thread per agent. Alongside the trace it keeps per-task and per-agent totals
+of wall time, LLM calls, prompt/completion tokens and tool calls, which
+``compare_runs`` lines up across kickoffs (the iterations of ``crewai test``)
+and against an earlier profile, so a slower or chattier step stands out.
+"""
+
+import json
+import os
+import statistics
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from crewai.utilities.events import (
+    AgentExecutionCompletedEvent,
+    AgentExecutionErrorEvent,
+    AgentExecutionStartedEvent,
+    CrewKickoffCompletedEvent,
+    CrewKickoffFailedEvent,
+    CrewKickoffStartedEvent,
+    LLMCallCompletedEvent,
+    LLMCallFailedEvent,
+    LLMCallStartedEvent,
+    TaskCompletedEvent,
+    TaskFailedEvent,
+    TaskStartedEvent,
+    ToolUsageErrorEvent,
+    ToolUsageFinishedEvent,
+    ToolUsageStartedEvent,
+    crewai_event_bus,
+)
+from crewai.utilities.string_utils import interpolate_only
+
+# Where run() writes a profile; unset disables profiling of plain runs
+CREW_PROFILE = os.getenv("CREW_PROFILE", "")
+# Profile that test() compares its iterations against, e.g. a run from main
+CREW_PROFILE_BASELINE = os.getenv("CREW_PROFILE_BASELINE", "")
+# Relative change of a step flagged by compare_runs
+CREW_PROFILE_TOLERANCE = float(os.getenv("CREW_PROFILE_TOLERANCE", "0.25"))
+
+STEP_METRICS = ("wall_s", "llm_calls", "prompt_tokens", "completion_tokens", "tool_calls")
+# Changes smaller than these are noise, whatever the relative change
+METRIC_FLOORS = {"wall_s": 1.0, "llm_calls": 1, "prompt_tokens": 200, "completion_tokens": 100, "tool_calls": 1}
+
+_active: Optional["CrewProfiler"] = None
+_installed = False
+_install_lock = threading.Lock()
+
+
+def _task_name(task: Any) -> str:
+    # Tasks built outside CrewBase, such as crewai test's evaluation task, have no name
+    return task.name or " ".join(str(task.description).split())[:40]
+
+
+def _new_step() -> Dict[str, Any]:
+    return {metric: 0 for metric in STEP_METRICS} | {"tools": {}, "cached": False}
+
+
+class CrewProfiler:
+    """Collects spans and per-step totals for every kickoff while it is active."""
+
+    def __init__(self, agents_config: Optional[Dict[str, Dict[str, Any]]] = None):
+        # Agent config key ("researcher") by role template ("{topic} Senior Data Researcher")
+        self._role_templates = {
+            str(config.get("role", "")).strip(): key for key, config in (agents_config or {}).items()
+        }
+        self._agent_names: Dict[str, str] = dict(self._role_templates)
+        self._lock = threading.RLock()
+        self._origin = time.perf_counter()
+        self._open: Dict[Tuple, Tuple[float, Dict[str, Any]]] = {}
+        self._agents: Dict[str, Any] = {}
+        self._token_marks: Dict[Tuple, Tuple[int, int]] = {}
+        # (task id, task name) by thread: crewAI emits events on the thread
+        # running the task, and DagCrew runs same-agent tasks side by side
+        self._current_task: Dict[int, Tuple[str, str]] = {}
+        self._threads: Dict[str, int] = {}
+        self._named: set = set()
+        self.trace_events: List[Dict[str, Any]] = []
+        self.runs: List[Dict[str, Any]] = []
+
+    # -- helpers ---------------------------------------------------------
+
+    def _now_us(self) -> float:
+        return (time.perf_counter() - self._origin) * 1e6
+
+    def agent_name(self, role: Optional[str]) -> str:
+        role = (role or "").strip()
+        return self._agent_names.get(role, role or "crew")
+
+    def _tid(self, name: str) -> int:
+        tid = self._threads.setdefault(name, len(self._threads) + 1)
+        pid = self._run["iteration"]
+        if (pid, tid) not in self._named:
+            self._named.add((pid, tid))
+            self.trace_events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}})
+        return tid
+
+    @property
+    def _run(self) -> Dict[str, Any]:
+        return self.runs[-1]
+
+    def _step(self, kind: str, name: str) -> Dict[str, Any]:
+        return self._run["steps"].setdefault(f"{kind}:{name}", _new_step())
+
+    def _begin(self, key: Tuple, **args) -> None:
+        self._open[key] = (self._now_us(), args)
+
+    def _end(self, key: Tuple, name: str, category: str, thread: str, **args) -> float:
+        """Close span ``key``; returns its duration in seconds (0 if it never opened)."""
+        opened = self._open.pop(key, None)
+        if opened is None or not self.runs:
+            return 0.0
+        started, begin_args = opened
+        duration = self._now_us() - started
+        self.trace_events.append({
+            "name": name, "cat": category, "ph": "X", "ts": round(started, 1), "dur": round(duration, 1),
+            "pid": self._run["iteration"], "tid": self._tid(thread), "args": begin_args | args,
+        })
+        return duration / 1e6
+
+    def _thread_task(self) -> Tuple[str, str]:
+        return self._current_task.get(threading.get_ident(), ("", ""))
+
+    def _tokens(self, agent_id: str) -> Tuple[int, int]:
+        agent = self._agents.get(agent_id)
+        process = getattr(agent, "_token_process", None)
+        if process is None:
+            return 0, 0
+        return process.prompt_tokens, process.completion_tokens
+
+    # -- event handlers --------------------------------------------------
+
+    def on_event(self, source: Any, event: Any) -> None:
+        with self._lock:
+            if isinstance(event, CrewKickoffStartedEvent):
+                self._kickoff_started(event)
+            elif not self.runs:
+                return  # events from before the first kickoff
+            elif isinstance(event, (CrewKickoffCompletedEvent, CrewKickoffFailedEvent)):
+                self._run["wall_s"] = round(self._end(("kickoff",), "kickoff", "crew", "crew"), 3)
+                self._run["status"] = "done" if isinstance(event, CrewKickoffCompletedEvent) else "failed"
+            elif isinstance(event, TaskStartedEvent):
+                agent = self.agent_name(getattr(event.task.agent, "role", None))
+                self._current_task[threading.get_ident()] = (str(event.task.id), _task_name(event.task))
+                self._begin(("task", event.task.id), agent=agent)
+            elif isinstance(event, (TaskCompletedEvent, TaskFailedEvent)):
+                self._task_finished(event)
+            elif isinstance(event, AgentExecutionStartedEvent):
+                self._agents[str(event.agent.id)] = event.agent
+                self._begin(self._agent_key(event))
+            elif isinstance(event, (AgentExecutionCompletedEvent, AgentExecutionErrorEvent)):
+                name = self.agent_name(event.agent.role)
+                wall = self._end(self._agent_key(event), name, "agent", name)
+                self._step("agent", name)["wall_s"] += wall
+            elif isinstance(event, LLMCallStartedEvent):
+                key = self._llm_key(event)
+                self._token_marks[key] = self._tokens(key[1])
+                self._begin(key)
+            elif isinstance(event, (LLMCallCompletedEvent, LLMCallFailedEvent)):
+                self._llm_finished(event)
+            elif isinstance(event, ToolUsageStartedEvent):
+                self._begin(self._tool_key(event), args=str(event.tool_args)[:200])
+            elif isinstance(event, (ToolUsageFinishedEvent, ToolUsageErrorEvent)):
+                self._tool_finished(event)
+
+    def _kickoff_started(self, event: CrewKickoffStartedEvent) -> None:
+        inputs = event.inputs or {}
+        for template, key in self._role_templates.items():
+            try:
+                self._agent_names[interpolate_only(template, inputs).strip()] = key
+            except (KeyError, ValueError):
+                pass
+        iteration = len(self.runs) + 1
+        self.runs.append({"iteration": iteration, "wall_s": 0.0, "status": "running", "steps": {}})
+        self.trace_events.append({
+            "name": "process_name", "ph": "M", "pid": iteration, "args": {"name": f"kickoff {iteration}"},
+        })
+        self._begin(("kickoff",), inputs={key: str(value)[:200] for key, value in inputs.items()})
+
+    # Span keys include the task, since one agent can run several tasks at once
+    def _agent_key(self, event) -> Tuple:
+        return ("agent", str(event.agent.id), str(getattr(event.task, "id", "")))
+
+    def _llm_key(self, event) -> Tuple:
+        return ("llm", str(event.agent_id), str(event.task_id or self._thread_task()[0]))
+
+    def _tool_key(self, event) -> Tuple:
+        # Tool events carry no task, only the thread they were emitted on says which
+        return ("tool", self._thread_task()[0] or event.agent_role, event.tool_name)
+
+    def _task_finished(self, event) -> None:
+        task = event.task
+        if self._thread_task()[0] == str(task.id):
+            del self._current_task[threading.get_ident()]
+        agent = self.agent_name(getattr(task.agent, "role", None))
+        cached = bool(getattr(task, "replayed", False))
+        status = "failed" if isinstance(event, TaskFailedEvent) else "done"
+        name = _task_name(task)
+        wall = self._end(("task", task.id), name, "task", agent, status=status, cached=cached)
+        step = self._step("task", name)
+        step["wall_s"] += wall
+        step["cached"] = cached
+        step["agent"] = agent
+
+    def _llm_finished(self, event) -> None:
+        agent = self.agent_name(event.agent_role)
+        task = event.task_name or self._thread_task()[1]
+        key = self._llm_key(event)
+        # The token counter is the agent's, so calls of the same agent running
+        # at the same time share their counts
+        prompt_before, completion_before = self._token_marks.pop(key, (0, 0))
+        prompt_after, completion_after = self._tokens(key[1])
+        prompt_tokens = max(0, prompt_after - prompt_before)
+        completion_tokens = max(0, completion_after - completion_before)
+        self._end(
+            key, "llm call", "llm", agent, task=task,
+            prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+            failed=isinstance(event, LLMCallFailedEvent),
+        )
+        for step in (self._step("agent", agent), self._step("task", task)) if task else (self._step("agent", agent),):
+            step["llm_calls"] += 1
+            step["prompt_tokens"] += prompt_tokens
+            step["completion_tokens"] += completion_tokens
+
+    def _tool_finished(self, event) -> None:
+        agent = self.agent_name(event.agent_role)
+        task = self._thread_task()[1]
+        self._end(
+            self._tool_key(event), event.tool_name, "tool", agent,
+            task=task, failed=isinstance(event, ToolUsageErrorEvent),
+        )
+        for step in (self._step("agent", agent), self._step("task", task)) if task else (self._step("agent", agent),):
+            step["tool_calls"] += 1
+            step["tools"][event.tool_name] = step["tools"].get(event.tool_name, 0) + 1
+
+    # -- output ----------------------------------------------------------
+
+    def summary(self) -> List[Dict[str, Any]]:
+        for run in self.runs:
+            for step in run["steps"].values():
+                step["wall_s"] = round(step["wall_s"], 3)
+        return self.runs
+
+    def write(self, path: str) -> None:
+        """Write the Chrome trace, with the per-step totals under ``otherData``."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            trace = {
+                "traceEvents": self.trace_events,
+                "displayTimeUnit": "ms",
+                "otherData": {"runs": self.summary()},
+            }
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(trace, handle, default=str)
+
+
+def _dispatch(source: Any, event: Any) -> None:
+    profiler = _active
+    if profiler is not None:
+        profiler.on_event(source, event)
+
+
+def _install() -> None:
+    """Register the bus handlers once; they forward to whichever profiler is active."""
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        for event_type in (
+            CrewKickoffStartedEvent, CrewKickoffCompletedEvent, CrewKickoffFailedEvent,
+            TaskStartedEvent, TaskCompletedEvent, TaskFailedEvent,
+            AgentExecutionStartedEvent, AgentExecutionCompletedEvent, AgentExecutionErrorEvent,
+            LLMCallStartedEvent, LLMCallCompletedEvent, LLMCallFailedEvent,
+            ToolUsageStartedEvent, ToolUsageFinishedEvent, ToolUsageErrorEvent,
+        ):
+            crewai_event_bus.register_handler(event_type, _dispatch)
+        _installed = True
+
+
+@contextmanager
+def profile_crew(path: str, agents_config: Optional[Dict[str, Dict[str, Any]]] = None):
+    """Profile every kickoff inside the block and write the trace to ``path`` (no-op if empty)."""
+    global _active
+    if not path:
+        yield None
+        return
+    _install()
+    profiler = CrewProfiler(agents_config)
+    previous, _active = _active, profiler
+    try:
+        yield profiler
+    finally:
+        _active = previous
+        profiler.write(path)
+        print(f"Crew profile written to {path}")
+
+
+def load_runs(path: str) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)["otherData"]["runs"]
+
+
+def _flagged(metric: str, before: float, after: float, tolerance: float) -> bool:
+    if abs(after - before) < METRIC_FLOORS[metric]:
+        return False
+    return before == 0 or abs(after - before) / before > tolerance
+
+
+def compare_runs(
+    runs: List[Dict[str, Any]],
+    baseline: Optional[List[Dict[str, Any]]] = None,
+    tolerance: float = CREW_PROFILE_TOLERANCE,
+) -> List[str]:
+    """Print every step's metrics per iteration; return the steps that moved more than ``tolerance``.
+
+    Each iteration is compared with the first one, or with the median of
+    ``baseline`` (the runs of an earlier profile) when given.
+    """
+    steps = sorted({name for run in runs for name in run["steps"]})
+    reference_runs = baseline or runs[:1]
+    flagged = []
+    header = f"{'step':34} {'metric':18} {'ref':>9} " + " ".join(f"{'#' + str(r['iteration']):>9}" for r in runs)
+    print(header)
+    print("-" * len(header))
+    for name in steps:
+        for metric in STEP_METRICS:
+            values = [run["steps"].get(name, {}).get(metric, 0) for run in runs]
+            reference = statistics.median(r["steps"].get(name, {}).get(metric, 0) for r in reference_runs)
+            if not any(values) and not reference:
+                continue
+            marks = [_flagged(metric, reference, value, tolerance) for value in values]
+            if any(marks):
+                flagged.append(f"{name} {metric}")
+            cells = " ".join(f"{value:>8g}{'!' if mark else ' '}" for value, mark in zip(values, marks))
+            print(f"{name:34} {metric:18} {reference:>9g} {cells}")
+    if flagged:
+        print(f"\nSteps that moved more than {tolerance:.0%}: {', '.join(flagged)}")
+    return flagged
@@ -0,0 +1,79 @@
+"""crewAI LLM whose calls go through the API's LLM scheduler.
+
+Crew agents call the model through litellm, outside the API's backends, so
+without this a crew run would neither wait for the shared OpenAI budget nor
+back off on 429s. ``ScheduledLLM`` runs every ``call`` through
+``scheduler.run_sync`` at batch priority: it waits for a slot and for quota,
+retries rate limits and server errors with jittered backoff, and counts
+against the same ``LLM_RPM_LIMIT`` / ``LLM_TPM_LIMIT`` budget as the API
+when ``LLM_RATE_LIMIT_PATH`` points both at one file. A litellm success
+callback feeds the provider's ``x-ratelimit-*`` headers to the scheduler.
+"""
+
+import json
+import os
+from typing import Any, Dict, List, Optional, Union
+
+import litellm
+from crewai import LLM
+from crewai.utilities.llm_utils import create_llm
+
+from ai_pops.api.backends import CHARS_PER_TOKEN, OPENAI_MAX_RETRIES
+from ai_pops.api.scheduler import PRIORITY_BATCH, scheduler
+
+# Seconds one crew LLM call may spend queueing, waiting for quota and retrying
+CREW_LLM_DEADLINE = float(os.getenv("CREW_LLM_DEADLINE", "300"))
+# Output tokens reserved for a call that sets no max_tokens
+CREW_LLM_RESERVED_OUTPUT = int(os.getenv("CREW_LLM_RESERVED_OUTPUT", "1024"))
+
+
+def _observe_headers(kwargs, response, start_time, end_time) -> None:
+    headers = (getattr(response, "_hidden_params", None) or {}).get("additional_headers") or {}
+    # litellm prefixes the provider's own headers with "llm_provider-"
+    scheduler.observe({name.removeprefix("llm_provider-"): value for name, value in headers.items()})
+
+
+class ScheduledLLM(LLM):
+    """``LLM`` that queues, rate-limits and retries each call through ``scheduler``."""
+
+    @classmethod
+    def wrapping(cls, llm: LLM) -> "ScheduledLLM":
+        """A ``ScheduledLLM`` with the same settings as an existing ``llm``."""
+        scheduled = cls.__new__(cls)
+        # LLM keeps its settings as plain attributes, so copying them is enough
+        scheduled.__dict__.update(vars(llm))
+        # As for the API's client: retries in the SDK would hide 429s from the scheduler
+        scheduled.additional_params = {"max_retries": OPENAI_MAX_RETRIES, **llm.additional_params}
+        return scheduled
+
+    def call(
+        self,
+        messages: Union[str, List[Dict[str, str]]],
+        tools: Optional[List[dict]] = None,
+        callbacks: Optional[List[Any]] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+        from_task: Optional[Any] = None,
+        from_agent: Optional[Any] = None,
+    ) -> Union[str, Any]:
+        prompt_chars = len(messages) if isinstance(messages, str) else len(json.dumps(messages))
+        reserved = prompt_chars // CHARS_PER_TOKEN + (self.max_tokens or CREW_LLM_RESERVED_OUTPUT)
+        result = scheduler.run_sync(
+            lambda: LLM.call(self, messages, tools, callbacks, available_functions, from_task, from_agent),
+            priority=PRIORITY_BATCH,
+            tokens=reserved,
+            deadline=scheduler.deadline(CREW_LLM_DEADLINE),
+        )
+        scheduler.settle(reserved, (prompt_chars + len(str(result))) // CHARS_PER_TOKEN)
+        return result
+
+
+def scheduled_llm(llm: Union[str, LLM, None] = None) -> ScheduledLLM:
+    """The LLM crewAI would build for ``llm`` (a model name, an LLM or None for the env default), scheduled."""
+    base = create_llm(llm)
+    if base is None:
+        raise ValueError(f"Could not create an LLM for {llm!r}")
+    return base if isinstance(base, ScheduledLLM) else ScheduledLLM.wrapping(base)
+
+
+if _observe_headers not in litellm.success_callback:
+    litellm.success_callback.append(_observe_headers)
@@ -0,0 +1 @@
+"""Business logic used by the AI Pops API."""
@@ -0,0 +1,402 @@
+"""Optimal ticket assignment with per-developer capacity.
+
+The assignment is solved as a min-cost flow (source -> tickets -> developers
+-> sink, developer->sink edges carrying the capacity) using successive
+shortest paths with Dijkstra and node potentials, i.e. the Hungarian method
+generalised to capacities. Tickets are inserted one at a time; after each
+insertion the current assignment is optimal for the tickets seen so far.
+
+Each ticket only gets edges to its top-K candidate developers, so the graph
+stays sparse and a solve is far cheaper than a dense O(n^3) Hungarian run.
+When the candidate graph cannot absorb a ticket, that ticket is retried with
+edges to every developer. Solve time still grows with the square of the
+backlog, so ``solve_assignment`` hands backlogs over ``SOLVER_MAX_TICKETS``
+to a capacity-aware greedy pass instead.
+
+Every residual edge keeps a non-negative reduced cost, which is what makes
+the current assignment optimal. The solver relies on that invariant to
+support incremental edits: removing a ticket or freeing a developer slot
+runs one backward Dijkstra from that developer and re-routes at most one
+chain of tickets, and adding a ticket runs one Dijkstra from that ticket.
+"""
+
+import heapq
+import math
+import os
+from typing import Dict, Hashable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+DEFAULT_CANDIDATES = 32
+# Spare slots on top of an even split when no capacity is given, as the team
+# store keeps. A tight split makes most insertions re-route long chains.
+SOLVER_CAPACITY_HEADROOM = float(os.getenv("SOLVER_CAPACITY_HEADROOM", "0.2"))
+# Largest backlog solved optimally; above it (about a second of solving)
+# tickets are assigned greedily
+SOLVER_MAX_TICKETS = int(os.getenv("SOLVER_MAX_TICKETS", "2000"))
+# Scores are 0-100 floats; solving on integers keeps the potentials exact.
+SCORE_RESOLUTION = 10
+
+
+class AssignmentSolver:
+    """Incremental min-cost assignment of tickets to capacitated developers.
+
+    Tickets are identified by any hashable key and carry a mapping of
+    ``developer index -> integer benefit``. Higher benefit is better.
+    """
+
+    def __init__(self, n_developers: int, capacity: int, load: Optional[Sequence[int]] = None):
+        self.capacity = capacity
+        # Slots taken on each developer, including any reserved up front
+        self.load = list(load) if load is not None else [0] * n_developers
+        self.holders: List[set] = [set() for _ in range(n_developers)]
+        self.dev_potential = [0] * n_developers
+        self.sink_potential = 0
+        self.ticket_dev: Dict[Hashable, int] = {}
+        self.ticket_potential: Dict[Hashable, int] = {}
+        self.costs: Dict[Hashable, Dict[int, int]] = {}
+        # Tickets with an edge to each developer
+        self.candidates_of: List[set] = [set() for _ in range(n_developers)]
+        # Tickets whose developer or score changed since the last drain_changes()
+        self.changed: Set[Hashable] = set()
+
+    def assignments(self) -> Dict[Hashable, int]:
+        """Current ``ticket key -> developer index`` mapping."""
+        return dict(self.ticket_dev)
+
+    def drain_changes(self) -> Set[Hashable]:
+        changed, self.changed = self.changed, set()
+        return changed
+
+    def add_developer(self) -> int:
+        """Add a developer with no ticket edges yet and return its index."""
+        self.load.append(0)
+        self.holders.append(set())
+        self.candidates_of.append(set())
+        self.dev_potential.append(self.sink_potential)
+        return len(self.load) - 1
+
+    def insert(self, key: Hashable, benefits: Dict[int, int]) -> bool:
+        """Add a ticket and re-optimise. Returns False if it cannot be placed."""
+        costs = {d: -b for d, b in benefits.items()}
+        self.costs[key] = costs
+        # Choose the new node's potential so every outgoing edge has a
+        # non-negative reduced cost; it has no incoming edges yet.
+        self.ticket_potential[key] = max(self.dev_potential[d] - c for d, c in costs.items())
+        path_end = self._shortest_path(key)
+        if path_end is None:
+            del self.costs[key]
+            del self.ticket_potential[key]
+            return False
+        for dev in costs:
+            self.candidates_of[dev].add(key)
+        self._augment(*path_end)
+        return True
+
+    def update(self, key: Hashable, benefits: Dict[int, int]) -> bool:
+        """Replace a ticket's edges and re-optimise. Returns False if it cannot be placed.
+
+        When some ticket potential keeps every one of its edges non-negative
+        the ticket stays with its developer and nothing else moves;
+        otherwise it is removed and inserted again.
+        """
+        dev = self.ticket_dev.get(key)
+        costs = {d: -b for d, b in benefits.items()}
+        if dev in costs:
+            dev_potential = self.dev_potential
+            highest = dev_potential[dev] - costs[dev]
+            lowest = max((dev_potential[d] - c for d, c in costs.items() if d != dev), default=highest)
+            if lowest <= highest:
+                if self.costs[key].get(dev) != costs[dev]:
+                    # Same developer, new score
+                    self.changed.add(key)
+                for candidate in self.costs[key]:
+                    self.candidates_of[candidate].discard(key)
+                for candidate in costs:
+                    self.candidates_of[candidate].add(key)
+                self.costs[key] = costs
+                self.ticket_potential[key] = highest
+                return True
+        self.remove(key)
+        return self.insert(key, benefits)
+
+    def remove(self, key: Hashable) -> Optional[int]:
+        """Drop a ticket and return the developer it was assigned to."""
+        dev = self.ticket_dev.pop(key, None)
+        for candidate in self.costs.pop(key):
+            self.candidates_of[candidate].discard(key)
+        del self.ticket_potential[key]
+        if dev is not None:
+            self.holders[dev].discard(key)
+            self.changed.add(key)
+            self.release_slot(dev)
+        return dev
+
+    def release_slot(self, dev: int) -> None:
+        """Free one reserved slot on ``dev`` and pull a better chain of tickets into it."""
+        self.load[dev] -= 1
+        self._refill(dev)
+
+    def grow_capacity(self, capacity: int) -> None:
+        """Raise the per-developer capacity, re-optimising for the new slots."""
+        extra = capacity - self.capacity
+        if extra <= 0:
+            return
+        full = [d for d, load in enumerate(self.load) if load >= self.capacity]
+        self.capacity = capacity
+        # New slots on full developers start reserved and are released one by one
+        for dev in full:
+            self.load[dev] += extra
+        for dev in full:
+            for _ in range(extra):
+                self.release_slot(dev)
+
+    def _shortest_path(self, source: Hashable):
+        """Dijkstra on reduced costs from ``source`` to the sink.
+
+        Returns ``(sink_dev, prev_dev, prev_ticket)`` describing the path, or
+        None if no developer with spare capacity is reachable.
+        """
+        dev_potential = self.dev_potential
+        ticket_potential = self.ticket_potential
+        dist_ticket = {source: 0}
+        dist_dev: Dict[int, int] = {}
+        prev_dev: Dict[int, Hashable] = {}
+        prev_ticket: Dict[Hashable, int] = {}
+        settled_ticket: Dict[Hashable, int] = {}
+        settled_dev: Dict[int, int] = {}
+        sink_dist = math.inf
+        sink_dev = None
+
+        heap = [(0, 0, 0, source)]
+        counter = 1  # tie-breaker so keys never get compared
+        while heap:
+            dist, kind, _, node = heapq.heappop(heap)
+            if dist >= sink_dist:
+                break
+            if kind == 0:
+                if node in settled_ticket:
+                    continue
+                settled_ticket[node] = dist
+                potential = ticket_potential[node]
+                current = self.ticket_dev.get(node)
+                for dev, cost in self.costs[node].items():
+                    if dev == current or dev in settled_dev:
+                        continue
+                    new_dist = dist + cost + potential - dev_potential[dev]
+                    if new_dist < dist_dev.get(dev, math.inf):
+                        dist_dev[dev] = new_dist
+                        prev_dev[dev] = node
+                        heapq.heappush(heap, (new_dist, 1, counter, dev))
+                        counter += 1
+            else:
+                if node in settled_dev:
+                    continue
+                settled_dev[node] = dist
+                potential = dev_potential[node]
+                if self.load[node] < self.capacity:
+                    to_sink = dist + potential - self.sink_potential
+                    if to_sink < sink_dist:
+                        sink_dist = to_sink
+                        sink_dev = node
+                for ticket in self.holders[node]:
+                    if ticket in settled_ticket:
+                        continue
+                    new_dist = dist - self.costs[ticket][node] + potential - ticket_potential[ticket]
+                    if new_dist < dist_ticket.get(ticket, math.inf):
+                        dist_ticket[ticket] = new_dist
+                        prev_ticket[ticket] = node
+                        heapq.heappush(heap, (new_dist, 0, counter, ticket))
+                        counter += 1
+
+        if sink_dev is None:
+            return None
+        # Shift potentials of settled nodes so reduced costs stay
+        # non-negative; the sink settles at sink_dist so its potential holds.
+        for ticket, dist in settled_ticket.items():
+            ticket_potential[ticket] += dist - sink_dist
+        for dev, dist in settled_dev.items():
+            dev_potential[dev] += dist - sink_dist
+        return sink_dev, prev_dev, prev_ticket
+
+    def _augment(self, sink_dev: int, prev_dev: dict, prev_ticket: dict) -> None:
+        self.load[sink_dev] += 1
+        dev = sink_dev
+        while True:
+            ticket = prev_dev[dev]
+            previous = self.ticket_dev.get(ticket)
+            self.ticket_dev[ticket] = dev
+            self.holders[dev].add(ticket)
+            self.changed.add(ticket)
+            if previous is None:
+                return
+            self.holders[previous].discard(ticket)
+            dev = prev_ticket[ticket]
+
+    def _refill(self, dev: int) -> None:
+        """Restore optimality after ``dev`` gained a free slot.
+
+        The new dev->sink edge may have a negative reduced cost, i.e. some
+        chain sink->developer->ticket->...->dev is cheaper than leaving the
+        slot empty. A backward Dijkstra from ``dev`` finds the cheapest such
+        chain; only tickets with an edge to a reached developer are visited,
+        so the search stays near ``dev``. If the cycle through the sink has
+        negative cost it is applied, which frees a slot at the start of the
+        chain instead. Either way the potential update makes every residual
+        edge non-negative again.
+        """
+        bound = self.sink_potential - self.dev_potential[dev]
+        if bound <= 0:
+            return
+        dev_potential = self.dev_potential
+        ticket_potential = self.ticket_potential
+        sink_potential = self.sink_potential
+        # Distances run backwards: from each node to ``dev``
+        dist_dev: Dict[int, int] = {dev: 0}
+        dist_ticket: Dict[Hashable, int] = {}
+        next_dev: Dict[Hashable, int] = {}  # ticket -> developer it would move to
+        gives_up: Dict[int, Hashable] = {}  # developer -> ticket it would hand on
+        settled_dev: Dict[int, int] = {}
+        settled_ticket: Dict[Hashable, int] = {}
+
+        heap = [(0, 1, 0, dev)]
+        counter = 1
+        best = bound
+        chain_start = None
+        while heap:
+            dist, kind, _, node = heapq.heappop(heap)
+            if dist >= best:
+                break
+            if kind == 1:
+                if node in settled_dev:
+                    continue
+                settled_dev[node] = dist
+                potential = dev_potential[node]
+                # Reverse sink->node edge: take a ticket off ``node``
+                if node != dev and self.load[node] > 0:
+                    via_sink = dist + sink_potential - potential
+                    if via_sink < best:
+                        best = via_sink
+                        chain_start = node
+                for ticket in self.candidates_of[node]:
+                    if ticket in settled_ticket or self.ticket_dev[ticket] == node:
+                        continue
+                    new_dist = dist + self.costs[ticket][node] + ticket_potential[ticket] - potential
+                    if new_dist < best and new_dist < dist_ticket.get(ticket, math.inf):
+                        dist_ticket[ticket] = new_dist
+                        next_dev[ticket] = node
+                        heapq.heappush(heap, (new_dist, 0, counter, ticket))
+                        counter += 1
+            else:
+                if node in settled_ticket:
+                    continue
+                settled_ticket[node] = dist
+                holder = self.ticket_dev[node]
+                if holder in settled_dev:
+                    continue
+                new_dist = dist - self.costs[node][holder] + dev_potential[holder] - ticket_potential[node]
+                if new_dist < best and new_dist < dist_dev.get(holder, math.inf):
+                    dist_dev[holder] = new_dist
+                    gives_up[holder] = node
+                    heapq.heappush(heap, (new_dist, 1, counter, holder))
+                    counter += 1
+
+        # Nodes closer to ``dev`` than ``best`` shift by the difference; the
+        # sink sits at ``best`` so its potential is unchanged.
+        for ticket, dist in settled_ticket.items():
+            ticket_potential[ticket] += best - dist
+        for node, dist in settled_dev.items():
+            dev_potential[node] += best - dist
+        if chain_start is None:
+            return
+
+        self.load[dev] += 1
+        self.load[chain_start] -= 1
+        node = chain_start
+        while node != dev:
+            ticket = gives_up[node]
+            target = next_dev[ticket]
+            self.holders[node].discard(ticket)
+            self.holders[target].add(ticket)
+            self.ticket_dev[ticket] = target
+            self.changed.add(ticket)
+            node = target
+
+
+def default_capacity(n_developers: int, n_tickets: int, headroom: float = 0.0) -> int:
+    """An even split of the tickets plus ``headroom`` (a fraction) spare slots per developer."""
+    return max(1, math.ceil(n_tickets * (1 + headroom) / max(n_developers, 1)))
+
+
+def to_benefits(scores: np.ndarray) -> np.ndarray:
+    """Convert 0-100 float scores to the integer benefits the solver works on."""
+    return np.rint(scores * SCORE_RESOLUTION).astype(np.int64)
+
+
+def candidate_developers(benefits: np.ndarray, candidates: int) -> np.ndarray:
+    """Indices of the top ``candidates`` developers for each ticket, shape (k, n_tickets)."""
+    k = min(candidates, benefits.shape[0])
+    if k == benefits.shape[0]:
+        return np.broadcast_to(np.arange(k)[:, None], benefits.shape)
+    return np.argpartition(-benefits, k - 1, axis=0)[:k]
+
+
+def greedy_assignment(
+    scores: np.ndarray, capacity: int, load: Optional[Sequence[int]] = None
+) -> List[Tuple[int, int]]:
+    """Assign tickets, most confident first, to their best developer with a free slot.
+
+    Not optimal, but linear in the backlog; ``capacity`` must cover every ticket.
+    """
+    n_developers, n_tickets = scores.shape
+    free = np.full(n_developers, capacity) - (np.asarray(load) if load is not None else 0)
+    open_scores = scores.copy()
+    open_scores[free <= 0] = -np.inf
+    pairs = []
+    for ticket in np.argsort(-scores.max(axis=0), kind="stable").tolist():
+        dev = int(open_scores[:, ticket].argmax())
+        pairs.append((ticket, dev))
+        free[dev] -= 1
+        if free[dev] == 0:
+            open_scores[dev] = -np.inf
+    return sorted(pairs)
+
+
+def solve_assignment(
+    scores: np.ndarray,
+    capacity: Optional[int] = None,
+    candidates: int = DEFAULT_CANDIDATES,
+    max_tickets: int = SOLVER_MAX_TICKETS,
+    load: Optional[Sequence[int]] = None,
+) -> List[Tuple[int, int]]:
+    """Assign every ticket to a developer, maximising the total score.
+
+    ``scores`` has shape (n_developers, n_tickets). Each developer receives at
+    most ``capacity`` tickets (by default an even split plus
+    ``SOLVER_CAPACITY_HEADROOM``), less the ``load`` it already carries from
+    elsewhere. Backlogs over ``max_tickets`` are assigned by
+    ``greedy_assignment`` instead. Returns ``(ticket_index,
+    developer_index)`` pairs sorted by ticket.
+    """
+    n_developers, n_tickets = scores.shape
+    if n_tickets == 0:
+        return []
+    taken = sum(load) if load is not None else 0
+    if capacity is None:
+        capacity = default_capacity(n_developers, n_tickets + taken, SOLVER_CAPACITY_HEADROOM)
+    spare = sum(max(0, capacity - used) for used in load) if load is not None else capacity * n_developers
+    if spare < n_tickets:
+        raise ValueError(
+            f"{n_developers} developers with capacity {capacity} cannot cover {n_tickets} more tickets"
+        )
+    if n_tickets > max_tickets:
+        return greedy_assignment(scores, capacity, load)
+
+    benefits = to_benefits(scores)
+    top = candidate_developers(benefits, candidates)
+    solver = AssignmentSolver(n_developers, capacity, load)
+    for ticket in range(n_tickets):
+        devs = top[:, ticket].tolist()
+        if not solver.insert(ticket, dict(zip(devs, benefits[devs, ticket].tolist()))):
+            solver.insert(ticket, dict(enumerate(benefits[:, ticket].tolist())))
+    return sorted(solver.assignments().items())
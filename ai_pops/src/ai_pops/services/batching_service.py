@@ -0,0 +1,147 @@
+"""Split large match requests into token-budgeted chunks and merge the results.
+
+The local score matrix acts as a cheap prefilter: each ticket only carries its
+top-K candidate developers into the prompt, and tickets that share candidates
+are packed into the same chunk so each prompt stays small.
+"""
+
+import json
+import os
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from ai_pops.api.models import Assignment, Developer, Ticket
+from ai_pops.services.matching_service import score_matrix
+
+# Rough prompt input budget and per-assignment output cost, in tokens
+MATCH_PROMPT_TOKEN_BUDGET = int(os.getenv("MATCH_PROMPT_TOKEN_BUDGET", "6000"))
+MATCH_OUTPUT_TOKEN_BUDGET = int(os.getenv("MATCH_OUTPUT_TOKEN_BUDGET", "2000"))
+TOKENS_PER_ASSIGNMENT = 50
+# Candidate developers sent along with each ticket once a request is chunked
+MATCH_CANDIDATES = int(os.getenv("MATCH_CANDIDATES", "5"))
+
+
+@dataclass
+class MatchChunk:
+    """One LLM call's worth of work: indices into the request's lists."""
+
+    tickets: List[int]
+    developers: List[int]
+
+
+def estimate_tokens(item) -> int:
+    """Cheap token estimate (about four characters per token)."""
+    return len(json.dumps(item.model_dump())) // 4 + 1
+
+
+def plan_chunks(
+    developers: Sequence[Developer],
+    tickets: Sequence[Ticket],
+    candidates: int = MATCH_CANDIDATES,
+    prompt_budget: int = MATCH_PROMPT_TOKEN_BUDGET,
+    output_budget: int = MATCH_OUTPUT_TOKEN_BUDGET,
+    score_fn: Callable[[Sequence[Developer], Sequence[Ticket]], np.ndarray] = score_matrix,
+) -> List[MatchChunk]:
+    """Group tickets into chunks that fit both the prompt and output budgets.
+
+    ``score_fn`` ranks the candidate developers of each ticket; it is only
+    called once the request is too large for a single prompt.
+    """
+    max_tickets = max(1, output_budget // TOKENS_PER_ASSIGNMENT)
+    dev_tokens = [estimate_tokens(d) for d in developers]
+    ticket_tokens = [estimate_tokens(t) for t in tickets]
+
+    if len(tickets) <= max_tickets and sum(dev_tokens) + sum(ticket_tokens) <= prompt_budget:
+        return [MatchChunk(list(range(len(tickets))), list(range(len(developers))))]
+
+    scores = score_fn(developers, tickets)
+    k = min(candidates, len(developers))
+    top = np.argpartition(-scores, k - 1, axis=0)[:k]
+    best_first = np.argsort(-np.take_along_axis(scores, top, axis=0), axis=0)
+    top = np.take_along_axis(top, best_first, axis=0).T  # (n_tickets, k)
+    # Tickets with the same best developer end up next to each other
+    order = np.lexsort((np.arange(len(tickets)), top[:, 0]))
+
+    chunks: List[MatchChunk] = []
+    chunk_tickets: List[int] = []
+    chunk_devs: Dict[int, None] = {}
+    used = 0
+    for ticket in order.tolist():
+        new_devs = [d for d in top[ticket].tolist() if d not in chunk_devs]
+        cost = ticket_tokens[ticket] + sum(dev_tokens[d] for d in new_devs)
+        if chunk_tickets and (len(chunk_tickets) >= max_tickets or used + cost > prompt_budget):
+            chunks.append(MatchChunk(chunk_tickets, list(chunk_devs)))
+            chunk_tickets, chunk_devs, used = [], {}, 0
+            new_devs = top[ticket].tolist()
+            cost = ticket_tokens[ticket] + sum(dev_tokens[d] for d in new_devs)
+        chunk_tickets.append(ticket)
+        chunk_devs.update(dict.fromkeys(new_devs))
+        used += cost
+    if chunk_tickets:
+        chunks.append(MatchChunk(chunk_tickets, list(chunk_devs)))
+    return chunks
+
+
+def chunk_members(
+    developers: Sequence[Developer], tickets: Sequence[Ticket], chunk: MatchChunk
+) -> Tuple[Set[str], Set[str]]:
+    """Ticket ids and developer names an LLM answer for ``chunk`` may mention."""
+    return {tickets[i].id for i in chunk.tickets}, {developers[i].name for i in chunk.developers}
+
+
+def validate_assignment(item, ticket_ids: Set[str], dev_names: Set[str]) -> Optional[Assignment]:
+    """Parse one LLM-produced assignment, rejecting ids outside the chunk."""
+    try:
+        assignment = Assignment.model_validate(item)
+    except Exception:
+        return None
+    if assignment.ticketId not in ticket_ids or assignment.developerName not in dev_names:
+        return None
+    return assignment
+
+
+def merge_assignments(
+    developers: Sequence[Developer],
+    tickets: Sequence[Ticket],
+    chunks: Sequence[MatchChunk],
+    results: Iterable,
+    capacity: Optional[int] = None,
+) -> Dict[str, Assignment]:
+    """Validate and deduplicate per-chunk LLM output into one assignment per ticket.
+
+    Entries that reference a ticket or developer outside their chunk, or that
+    do not parse as an ``Assignment``, are dropped. When a ticket is assigned
+    more than once the highest score wins. With a ``capacity``, assignments
+    are taken highest score first and those to a developer already at
+    capacity are dropped too, leaving the ticket unassigned.
+    """
+    valid: List[Assignment] = []
+    for chunk, result in zip(chunks, results):
+        if not isinstance(result, list):
+            continue
+        ticket_ids, dev_names = chunk_members(developers, tickets, chunk)
+        for item in result:
+            assignment = validate_assignment(item, ticket_ids, dev_names)
+            if assignment is not None:
+                valid.append(assignment)
+
+    merged: Dict[str, Assignment] = {}
+    load: Dict[str, int] = {}
+    for assignment in sorted(valid, key=lambda a: -a.matchScore):
+        if assignment.ticketId in merged:
+            continue
+        if capacity is not None and load.get(assignment.developerName, 0) >= capacity:
+            continue
+        merged[assignment.ticketId] = assignment
+        load[assignment.developerName] = load.get(assignment.developerName, 0) + 1
+    return merged
+
+
+def developer_loads(developers: Sequence[Developer], assignments: Iterable[Assignment]) -> List[int]:
+    """How many of ``assignments`` each developer has, in ``developers`` order."""
+    counts: Dict[str, int] = {}
+    for assignment in assignments:
+        counts[assignment.developerName] = counts.get(assignment.developerName, 0) + 1
+    return [counts.get(developer.name, 0) for developer in developers]
@@ -0,0 +1,375 @@
+"""Embedding-backed nearest-neighbour retrieval of developers for a ticket.
+
+Developer profiles (skills + summary) are embedded into one contiguous float32
+matrix that lives in a ``.npy`` file and is memory-mapped back in, so a large
+team costs no start-up parsing and little resident memory. Vectors are L2
+normalised, so a dot product is the cosine similarity.
+
+Two embedders are provided: OpenAI's embeddings API for production and a
+deterministic hashing embedder that needs no network, for offline use and
+tests. Search is a brute-force matrix product by default; past
+``EMBEDDING_IVF_MIN_SIZE`` developers (or with ``EMBEDDING_INDEX_MODE=ivf``)
+an inverted-file index probes only the nearest k-means clusters.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import zlib
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ai_pops.api.models import Developer, Ticket
+from ai_pops.services.matching_service import tokenize
+
+# "openai" or "hashing"; unset picks OpenAI whenever an API key is configured
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+# Width of the hashing embedder's vectors
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "1024"))
+# The index is stored as <path>.npy (vectors) and <path>.json (names)
+EMBEDDING_INDEX_PATH = os.getenv("EMBEDDING_INDEX_PATH", "ai_pops_index")
+# "flat", "ivf" or "auto" (IVF once the team reaches EMBEDDING_IVF_MIN_SIZE)
+EMBEDDING_INDEX_MODE = os.getenv("EMBEDDING_INDEX_MODE", "auto")
+EMBEDDING_IVF_MIN_SIZE = int(os.getenv("EMBEDDING_IVF_MIN_SIZE", "20000"))
+EMBEDDING_IVF_PROBES = int(os.getenv("EMBEDDING_IVF_PROBES", "16"))
+# Developer vectors kept in memory by profile text, for match prefiltering
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))
+
+OPENAI_EMBEDDING_BATCH = 256
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE_PER_CLUSTER = 64
+
+
+def developer_text(developer: Developer) -> str:
+    return f"{', '.join(developer.skills)}. {developer.profile_summary}"
+
+
+def text_digest(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def ticket_text(ticket: Ticket) -> str:
+    return f"{ticket.title}. {ticket.description}"
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32)
+
+
+class HashingEmbedder:
+    """Deterministic bag-of-words embedder: hashed unigrams and bigrams."""
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        rows: List[int] = []
+        cols: List[int] = []
+        weights: List[float] = []
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            terms = Counter(tokens)
+            terms.update(f"{left} {right}" for left, right in zip(tokens, tokens[1:]))
+            for term, count in terms.items():
+                rows.append(row)
+                # crc32 rather than hash() so vectors are stable across processes
+                cols.append(zlib.crc32(term.encode("utf-8")) % self.dim)
+                weights.append(np.log1p(count))
+        flat = np.bincount(
+            np.asarray(rows, dtype=np.int64) * self.dim + np.asarray(cols, dtype=np.int64),
+            weights=weights,
+            minlength=len(texts) * self.dim,
+        )
+        return _normalize(flat.reshape(len(texts), self.dim))
+
+
+class OpenAIEmbedder:
+    """OpenAI embeddings API, called in batches."""
+
+    def __init__(self, api_key: str, model: str = EMBEDDING_MODEL):
+        from openai import OpenAI
+
+        self.client = OpenAI(api_key=api_key)
+        self.model = model
+        self.name = f"openai-{model}"
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors: List[List[float]] = []
+        for start in range(0, len(texts), OPENAI_EMBEDDING_BATCH):
+            response = self.client.embeddings.create(
+                model=self.model, input=list(texts[start:start + OPENAI_EMBEDDING_BATCH])
+            )
+            vectors.extend(item.embedding for item in sorted(response.data, key=lambda item: item.index))
+        return _normalize(np.asarray(vectors, dtype=np.float32))
+
+
+_embedder = None
+_embedder_lock = threading.Lock()
+
+
+def get_embedder():
+    """Process-wide embedder chosen by ``EMBEDDING_BACKEND``."""
+    global _embedder
+    with _embedder_lock:
+        if _embedder is None:
+            backend = EMBEDDING_BACKEND or ("openai" if os.getenv("OPENAI_API_KEY") else "hashing")
+            if backend == "openai":
+                _embedder = OpenAIEmbedder(os.getenv("OPENAI_API_KEY"))
+            else:
+                _embedder = HashingEmbedder()
+        return _embedder
+
+
+def _kmeans(vectors: np.ndarray, n_clusters: int, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """Spherical k-means; returns (unit centroids, cluster of each vector).
+
+    Centroids are trained on a sample of ``KMEANS_SAMPLE_PER_CLUSTER`` rows per
+    cluster, then every vector is assigned once.
+    """
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(vectors), KMEANS_SAMPLE_PER_CLUSTER * n_clusters)
+    sample = vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))]
+    centroids = sample[rng.choice(sample_size, n_clusters, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        labels = np.argmax(sample @ centroids.T, axis=1)
+        counts = np.bincount(labels, minlength=n_clusters)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        filled = counts > 0
+        sums = centroids.copy()  # empty clusters keep their old centroid
+        sums[filled] = np.add.reduceat(sample[np.argsort(labels, kind="stable")], starts[filled])
+        centroids = _normalize(sums)
+    return centroids, np.argmax(vectors @ centroids.T, axis=1)
+
+
+def _write_atomically(target: Path, write: Callable[[BinaryIO], None]) -> None:
+    """Write ``target`` through a uniquely named temporary file, so readers and
+    other workers never see it half written."""
+    with tempfile.NamedTemporaryFile(dir=target.parent, prefix=target.name, suffix=".tmp", delete=False) as f:
+        try:
+            write(f)
+        except BaseException:
+            f.close()
+            os.unlink(f.name)
+            raise
+    os.replace(f.name, target)
+
+
+class DeveloperIndex:
+    """Top-K developer retrieval over a memory-mapped embedding matrix."""
+
+    def __init__(self, embedder, path: Optional[str] = EMBEDDING_INDEX_PATH, mode: str = EMBEDDING_INDEX_MODE):
+        self.embedder = embedder
+        self.mode = mode
+        self.path = Path(path) if path else None
+        self.names: List[str] = []
+        self.digests: List[str] = []
+        self.vectors = np.zeros((0, 0), dtype=np.float32)
+        self._lock = threading.RLock()
+        self._ivf = None  # (centroids, cluster offsets into the reordered matrix)
+        self._rows: Optional[Dict[str, int]] = None  # row of each profile digest
+        if self.path is not None:
+            self._open()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    # Persistence
+
+    def _files(self) -> Tuple[Path, Path]:
+        return self.path.with_suffix(".npy"), self.path.with_suffix(".json")
+
+    def _open(self) -> None:
+        vectors_file, meta_file = self._files()
+        if not vectors_file.exists() or not meta_file.exists():
+            return
+        meta = json.loads(meta_file.read_text())
+        if meta.get("embedder") != self.embedder.name:
+            return  # built with another embedder: re-embed on the next sync
+        vectors = np.load(vectors_file, mmap_mode="r")
+        if len(meta["names"]) != len(vectors) or len(meta["digests"]) != len(vectors):
+            return  # the two files are from different saves: re-embed on the next sync
+        self.vectors = vectors
+        self.names = meta["names"]
+        self.digests = meta["digests"]
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        vectors_file, meta_file = self._files()
+        _write_atomically(vectors_file, lambda f: np.save(f, np.ascontiguousarray(self.vectors, dtype=np.float32)))
+        meta = {"embedder": self.embedder.name, "names": self.names, "digests": self.digests}
+        _write_atomically(meta_file, lambda f: f.write(json.dumps(meta).encode()))
+        self.vectors = np.load(vectors_file, mmap_mode="r")
+
+    # Updates
+
+    def sync(self, developers: Sequence[Developer]) -> int:
+        """Bring the index in line with ``developers``; returns how many were embedded.
+
+        Developers whose profile text is unchanged keep their stored vector,
+        so only new or edited profiles are sent to the embedder.
+        """
+        with self._lock:
+            texts = [developer_text(d) for d in developers]
+            digests = [text_digest(t) for t in texts]
+            names = [d.name for d in developers]
+            if dict(zip(names, digests)) == dict(zip(self.names, self.digests)):
+                return 0
+
+            known = {(n, g): i for i, (n, g) in enumerate(zip(self.names, self.digests))}
+            reuse = [known.get(key) for key in zip(names, digests)]
+            missing = [i for i, row in enumerate(reuse) if row is None]
+            fresh = self.embedder.embed([texts[i] for i in missing]) if missing else None
+
+            dim = fresh.shape[1] if fresh is not None else self.vectors.shape[1]
+            vectors = np.empty((len(names), dim), dtype=np.float32)
+            kept = [i for i, row in enumerate(reuse) if row is not None]
+            if kept:
+                vectors[kept] = self.vectors[[reuse[i] for i in kept]]
+            if missing:
+                vectors[missing] = fresh
+            self.vectors, self.names, self.digests = vectors, names, digests
+            self._ivf = None
+            self._rows = None
+            self._save()
+            return len(missing)
+
+    def stored_vectors(self, digests: Sequence[str]) -> Dict[int, np.ndarray]:
+        """Stored vectors of the profiles with these text digests, by position in ``digests``."""
+        with self._lock:
+            if self._rows is None:
+                self._rows = {digest: row for row, digest in enumerate(self.digests)}
+            found = {i: self._rows[digest] for i, digest in enumerate(digests) if digest in self._rows}
+            if not found:
+                return {}
+            rows = np.asarray(self.vectors[list(found.values())])
+            return dict(zip(found, rows))
+
+    # Search
+
+    def _use_ivf(self) -> bool:
+        if self.mode == "ivf":
+            return len(self.names) > 1
+        return self.mode == "auto" and len(self.names) >= EMBEDDING_IVF_MIN_SIZE
+
+    def _build_ivf(self):
+        """Cluster the vectors and rewrite the matrix in cluster order.
+
+        Each inverted list is then one contiguous slice of the memory map.
+        """
+        vectors = np.asarray(self.vectors)
+        n_clusters = max(1, int(np.sqrt(len(vectors))))
+        centroids, labels = _kmeans(vectors, n_clusters)
+        order = np.argsort(labels, kind="stable")
+        self.vectors = vectors[order]
+        self.names = [self.names[i] for i in order.tolist()]
+        self.digests = [self.digests[i] for i in order.tolist()]
+        self._rows = None
+        self._save()
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(labels, minlength=n_clusters))])
+        return centroids, offsets
+
+    def search(self, queries: np.ndarray, k: int) -> List[List[Tuple[str, float]]]:
+        """Top-``k`` ``(developer name, cosine similarity)`` for each query vector."""
+        with self._lock:
+            if not self.names:
+                return [[] for _ in range(len(queries))]
+            if self._use_ivf():
+                if self._ivf is None:
+                    self._ivf = self._build_ivf()
+                return self._search_ivf(np.asarray(queries), k)
+            return self._top_k(np.asarray(queries) @ np.asarray(self.vectors).T, np.arange(len(self.names)), k)
+
+    def _search_ivf(self, queries: np.ndarray, k: int) -> List[List[Tuple[str, float]]]:
+        centroids, offsets = self._ivf
+        probes = min(EMBEDDING_IVF_PROBES, len(centroids))
+        nearest = np.argpartition(-(queries @ centroids.T), probes - 1, axis=1)[:, :probes]
+        results = []
+        for query, clusters in zip(queries, nearest):
+            rows = np.concatenate([np.arange(offsets[c], offsets[c + 1]) for c in clusters])
+            scores = np.concatenate([self.vectors[offsets[c]:offsets[c + 1]] @ query for c in clusters])
+            results.append(self._top_k(scores[None, :], rows, k)[0])
+        return results
+
+    def _top_k(self, scores: np.ndarray, rows: np.ndarray, k: int) -> List[List[Tuple[str, float]]]:
+        k = min(k, scores.shape[1])
+        if k <= 0:
+            return [[] for _ in range(len(scores))]
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        best_first = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, best_first, axis=1)
+        top_scores = np.take_along_axis(top_scores, best_first, axis=1)
+        return [
+            [(self.names[rows[c]], float(s)) for c, s in zip(cols.tolist(), values.tolist())]
+            for cols, values in zip(top, top_scores)
+        ]
+
+    def candidates(self, ticket: Ticket, k: int) -> List[Tuple[str, float]]:
+        """Top-``k`` developers for one ticket."""
+        return self.search(self.embedder.embed([ticket_text(ticket)]), k)[0]
+
+
+_vector_cache: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+_vector_cache_lock = threading.Lock()
+
+
+def developer_vectors(developers: Sequence[Developer]) -> np.ndarray:
+    """Embeddings of ``developers``, one row each.
+
+    A profile whose text is unchanged reuses its vector from the developer
+    index or from an earlier call (an LRU of ``EMBEDDING_CACHE_SIZE``), so
+    only new and edited profiles reach the embedder.
+    """
+    embedder = get_embedder()
+    texts = [developer_text(d) for d in developers]
+    if not texts:
+        return embedder.embed(texts)
+    digests = [text_digest(t) for t in texts]
+    index = get_developer_index()
+    found = index.stored_vectors(digests) if index.embedder is embedder else {}
+    with _vector_cache_lock:
+        for i, digest in enumerate(digests):
+            vector = _vector_cache.get((embedder.name, digest))
+            if vector is not None and i not in found:
+                _vector_cache.move_to_end((embedder.name, digest))
+                found[i] = vector
+    missing = [i for i in range(len(texts)) if i not in found]
+    if missing:
+        fresh = embedder.embed([texts[i] for i in missing])
+        found.update(zip(missing, fresh))
+    with _vector_cache_lock:
+        for i in missing:
+            _vector_cache[(embedder.name, digests[i])] = found[i]
+        while len(_vector_cache) > EMBEDDING_CACHE_SIZE:
+            _vector_cache.popitem(last=False)
+    return np.stack([found[i] for i in range(len(texts))])
+
+
+def embedding_scores(developers: Sequence[Developer], tickets: Sequence[Ticket]) -> np.ndarray:
+    """(n_developers, n_tickets) embedding similarity scaled to 0-100, like ``score_matrix``."""
+    dev_vectors = developer_vectors(developers)
+    ticket_vectors = get_embedder().embed([ticket_text(t) for t in tickets])
+    return np.clip(dev_vectors @ ticket_vectors.T, 0.0, 1.0) * 100.0
+
+
+_index: Optional[DeveloperIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_developer_index() -> DeveloperIndex:
+    """Process-wide index, opened from ``EMBEDDING_INDEX_PATH`` on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = DeveloperIndex(get_embedder())
+        return _index
@@ -0,0 +1,225 @@
+"""Durable job queue for work that outlives an HTTP request.
+
+Jobs live in a SQLite table (WAL mode). Every API worker process pointed at
+the same file claims from one queue, in priority order (lower first) and
+then by age. Each claim is a ``BEGIN IMMEDIATE`` transaction, so no job is
+handed out twice.
+
+A job being run is leased: its worker refreshes ``heartbeat_at`` while the
+job runs. A job whose lease lapses, because its process died, goes back to
+the queue. After ``JOB_MAX_ATTEMPTS`` claims it fails instead. Finished,
+failed and cancelled jobs are kept for ``JOB_RESULT_TTL`` seconds and then
+purged.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Sequence
+
+JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH", "ai_pops_jobs.db")
+# Seconds finished jobs and their results are kept
+JOB_RESULT_TTL = float(os.getenv("JOB_RESULT_TTL", "86400"))
+# Seconds without a heartbeat after which a running job is handed out again,
+# and how many times a job is claimed before it is given up on
+JOB_LEASE = float(os.getenv("JOB_LEASE", "60"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+_COLUMNS = (
+    "id, kind, priority, status, payload, result, error, progress, message, attempts, "
+    "cancel_requested, created_at, started_at, finished_at"
+)
+
+
+def _row_to_job(row: Sequence[Any]) -> Dict[str, Any]:
+    job = dict(zip(_COLUMNS.split(", "), row))
+    job["payload"] = json.loads(job["payload"])
+    job["result"] = None if job["result"] is None else json.loads(job["result"])
+    job["cancel_requested"] = bool(job["cancel_requested"])
+    return job
+
+
+class JobQueue:
+    """Priority queue of jobs with leases, progress, cancellation and result retention."""
+
+    def __init__(
+        self,
+        path: str = JOB_QUEUE_PATH,
+        result_ttl: float = JOB_RESULT_TTL,
+        lease: float = JOB_LEASE,
+        max_attempts: int = JOB_MAX_ATTEMPTS,
+    ):
+        self.result_ttl = result_ttl
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY, kind TEXT NOT NULL, priority INTEGER NOT NULL,
+                status TEXT NOT NULL, payload TEXT NOT NULL, result TEXT, error TEXT,
+                progress REAL NOT NULL DEFAULT 0, message TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0, cancel_requested INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL, started_at REAL, finished_at REAL, heartbeat_at REAL);
+            CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, priority, created_at);
+            """
+        )
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def _execute(self, sql: str, params: Sequence[Any] = ()) -> int:
+        with self._lock:
+            return self._db.execute(sql, params).rowcount
+
+    def submit(self, kind: str, payload: Dict[str, Any], priority: int = 0) -> Dict[str, Any]:
+        """Queue a job and return it."""
+        job_id = uuid.uuid4().hex
+        self._execute(
+            "INSERT INTO jobs (id, kind, priority, status, payload, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (job_id, kind, priority, QUEUED, json.dumps(payload), time.time()),
+        )
+        return self.get(job_id)
+
+    def claim(self, kinds: Sequence[str]) -> Optional[Dict[str, Any]]:
+        """Mark the next queued job of one of ``kinds`` as running and return it."""
+        if not kinds:
+            return None
+        now = time.time()
+        marks = ", ".join("?" * len(kinds))
+        with self._transaction():
+            # Jobs whose worker went away without finishing them
+            self._db.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+                "error = CASE WHEN attempts >= ? THEN 'worker lost' ELSE error END, "
+                "finished_at = CASE WHEN attempts >= ? THEN ? ELSE NULL END "
+                "WHERE status = ? AND heartbeat_at < ?",
+                (self.max_attempts, FAILED, QUEUED, self.max_attempts, self.max_attempts, now,
+                 RUNNING, now - self.lease),
+            )
+            row = self._db.execute(
+                f"SELECT id FROM jobs WHERE status = ? AND kind IN ({marks}) "
+                "ORDER BY priority, created_at LIMIT 1",
+                (QUEUED, *kinds),
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, started_at = ?, heartbeat_at = ? "
+                "WHERE id = ?",
+                (RUNNING, now, now, row[0]),
+            )
+        return self.get(row[0])
+
+    def heartbeat(self, job_id: str) -> bool:
+        """Renew a running job's lease; True once cancellation has been requested."""
+        self._execute("UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND status = ?", (time.time(), job_id, RUNNING))
+        with self._lock:
+            row = self._db.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row[0])
+
+    def progress(self, job_id: str, fraction: float, message: Optional[str] = None) -> None:
+        self._execute(
+            "UPDATE jobs SET progress = ?, message = COALESCE(?, message), heartbeat_at = ? "
+            "WHERE id = ? AND status = ?",
+            (min(1.0, max(0.0, fraction)), message, time.time(), job_id, RUNNING),
+        )
+
+    def _finish(self, job_id: str, status: str, result: Any = None, error: Optional[str] = None) -> bool:
+        return bool(self._execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, progress = CASE WHEN ? THEN 1 ELSE progress END, "
+            "finished_at = ? WHERE id = ? AND status = ?",
+            (status, None if result is None else json.dumps(result), error, status == DONE,
+             time.time(), job_id, RUNNING),
+        ))
+
+    def finish(self, job_id: str, result: Any) -> bool:
+        return self._finish(job_id, DONE, result=result)
+
+    def fail(self, job_id: str, error: str) -> bool:
+        return self._finish(job_id, FAILED, error=error)
+
+    def mark_cancelled(self, job_id: str) -> bool:
+        """Record that a running job stopped because it was cancelled."""
+        return self._finish(job_id, CANCELLED)
+
+    def release(self, job_id: str) -> bool:
+        """Put a running job back in the queue, e.g. when its worker shuts down."""
+        return bool(self._execute(
+            "UPDATE jobs SET status = ?, attempts = attempts - 1, heartbeat_at = NULL WHERE id = ? AND status = ?",
+            (QUEUED, job_id, RUNNING),
+        ))
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Cancel a queued job at once, or ask the worker of a running one to stop it."""
+        with self._transaction():
+            self._db.execute(
+                "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?",
+                (CANCELLED, time.time(), job_id, QUEUED),
+            )
+            self._db.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = ?", (job_id, RUNNING))
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT {_COLUMNS} FROM jobs WHERE id = ? AND (finished_at IS NULL OR finished_at >= ?)",
+                (job_id, time.time() - self.result_ttl),
+            ).fetchone()
+        return None if row is None else _row_to_job(row)
+
+    def list_jobs(self, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recent jobs first, optionally only those in ``status``."""
+        where, params = "(finished_at IS NULL OR finished_at >= ?)", [time.time() - self.result_ttl]
+        if status:
+            where += " AND status = ?"
+            params.append(status)
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {_COLUMNS} FROM jobs WHERE {where} ORDER BY created_at DESC LIMIT ?", (*params, limit)
+            ).fetchall()
+        return [_row_to_job(row) for row in rows]
+
+    def purge(self) -> int:
+        """Delete finished jobs older than the retention period."""
+        return self._execute(
+            "DELETE FROM jobs WHERE finished_at < ?", (time.time() - self.result_ttl,)
+        )
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = dict.fromkeys((QUEUED, RUNNING, *FINISHED), 0)
+        counts.update(rows)
+        return counts
+
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Process-wide job queue, opened on first use."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue()
+        return _queue
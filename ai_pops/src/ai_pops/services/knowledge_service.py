@@ -0,0 +1,259 @@
+"""Incrementally refreshed embedding index of the ``knowledge/`` directory.
+
+Text files under ``KNOWLEDGE_DIR`` are split into chunks at paragraph
+breaks, and every chunk is embedded once. The index is one SQLite file
+(WAL mode). It records each file's size and modification time, so a refresh
+re-reads only files that changed. Vectors are stored by the SHA-1 of the
+chunk text, so only chunk texts never seen before go to the embedder.
+Unchanged paragraphs of an edited file, renamed files and duplicated text
+cost nothing.
+
+A chunk ends after a paragraph whose hash picks it as a boundary (once the
+chunk is half full), or when the next paragraph would overflow
+``KNOWLEDGE_CHUNK_CHARS``. Boundaries therefore depend on the text around
+them rather than on their offset in the file, so an edit changes only the
+chunks near it.
+
+Searching scores all chunks against the query with one matrix product. The
+chunk vectors are kept in memory between refreshes.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ai_pops.services.embedding_service import get_embedder
+
+# Directory of knowledge files, and the file types indexed in it
+KNOWLEDGE_DIR = os.getenv("KNOWLEDGE_DIR", "knowledge")
+KNOWLEDGE_EXTENSIONS = tuple(os.getenv("KNOWLEDGE_EXTENSIONS", ".txt,.md").split(","))
+# SQLite file holding chunks and their vectors
+KNOWLEDGE_INDEX_PATH = os.getenv("KNOWLEDGE_INDEX_PATH", "ai_pops_knowledge.db")
+# Largest chunk in characters (a longer paragraph is cut at this length)
+KNOWLEDGE_CHUNK_CHARS = int(os.getenv("KNOWLEDGE_CHUNK_CHARS", "1200"))
+# Chunks handed to each crew task (0 = none), and the lowest similarity kept
+# (scores depend on the embedder: hashing scores run lower than OpenAI's)
+KNOWLEDGE_TOP_K = int(os.getenv("KNOWLEDGE_TOP_K", "4"))
+KNOWLEDGE_MIN_SCORE = float(os.getenv("KNOWLEDGE_MIN_SCORE", "0"))
+# Seconds between scans of KNOWLEDGE_DIR for changes when searching
+KNOWLEDGE_REFRESH_INTERVAL = float(os.getenv("KNOWLEDGE_REFRESH_INTERVAL", "5"))
+
+# About one paragraph in four may end a chunk
+BOUNDARY_MODULUS = 4
+EMBED_BATCH = 512
+# Digests looked up per query (SQLite caps the parameters of one statement)
+SQLITE_BATCH = 500
+
+
+def chunk_text(text: str, chunk_chars: int = KNOWLEDGE_CHUNK_CHARS) -> List[str]:
+    """Split ``text`` into chunks of whole paragraphs, cut where the content says so."""
+    paragraphs: List[str] = []
+    for block in text.replace("\r\n", "\n").split("\n\n"):
+        block = block.strip()
+        while len(block) > chunk_chars:
+            paragraphs.append(block[:chunk_chars])
+            block = block[chunk_chars:].lstrip()
+        if block:
+            paragraphs.append(block)
+
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for paragraph in paragraphs:
+        if current and size + 2 + len(paragraph) > chunk_chars:
+            chunks.append("\n\n".join(current))
+            current, size = [], 0
+        current.append(paragraph)
+        size += len(paragraph) + (2 if size else 0)
+        if size >= chunk_chars // 2 and zlib.crc32(paragraph.encode("utf-8")) % BOUNDARY_MODULUS == 0:
+            chunks.append("\n\n".join(current))
+            current, size = [], 0
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class KnowledgeIndex:
+    """Chunks of the files under ``root`` with their embeddings, kept in sync on ``refresh``."""
+
+    def __init__(
+        self,
+        embedder,
+        root: str = KNOWLEDGE_DIR,
+        path: str = KNOWLEDGE_INDEX_PATH,
+        chunk_chars: int = KNOWLEDGE_CHUNK_CHARS,
+        extensions: Sequence[str] = KNOWLEDGE_EXTENSIONS,
+    ):
+        self.embedder = embedder
+        self.root = Path(root)
+        self.chunk_chars = chunk_chars
+        self.extensions = tuple(extensions)
+        self.refreshed_at = 0.0
+        self._lock = threading.RLock()
+        # Files, texts and vectors of all chunks; rebuilt on the first search after a change
+        self._matrix: Optional[Tuple[List[str], List[str], np.ndarray]] = None
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL);
+            CREATE TABLE IF NOT EXISTS chunks (
+                path TEXT NOT NULL, position INTEGER NOT NULL, digest TEXT NOT NULL,
+                PRIMARY KEY (path, position));
+            CREATE INDEX IF NOT EXISTS chunks_digest ON chunks (digest);
+            CREATE TABLE IF NOT EXISTS vectors (digest TEXT PRIMARY KEY, text TEXT NOT NULL, vector BLOB NOT NULL);
+            """
+        )
+        settings = f"{embedder.name}/{chunk_chars}"
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'settings'").fetchone()
+        if row is None or row[0] != settings:
+            # Built with another embedder or chunk size: index again from scratch
+            self._db.executescript("DELETE FROM files; DELETE FROM chunks; DELETE FROM vectors;")
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES ('settings', ?)", (settings,))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        """``{relative path: (size, mtime_ns)}`` of the files to index."""
+        found: Dict[str, Tuple[int, int]] = {}
+        if not self.root.is_dir():
+            return found
+        directories = [str(self.root)]
+        while directories:
+            with os.scandir(directories.pop()) as entries:
+                for entry in entries:
+                    if entry.name.startswith("."):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        directories.append(entry.path)
+                    elif entry.name.endswith(self.extensions) and entry.is_file():
+                        stat = entry.stat()
+                        found[os.path.relpath(entry.path, self.root)] = (stat.st_size, stat.st_mtime_ns)
+        return found
+
+    def refresh(self) -> Dict[str, int]:
+        """Index added and edited files and forget deleted ones.
+
+        Returns how many files were re-read and removed, and how many chunks
+        were embedded.
+        """
+        with self._lock:
+            found = self._scan()
+            known = {path: (size, mtime) for path, size, mtime in self._db.execute("SELECT * FROM files")}
+            changed = [path for path, stat in found.items() if known.get(path) != stat]
+            removed = [path for path in known if path not in found]
+            if not changed and not removed:
+                self.refreshed_at = time.monotonic()
+                return {"files": 0, "removed": 0, "embedded": 0}
+
+            chunks: Dict[str, List[str]] = {}
+            for path in changed:
+                try:
+                    text = (self.root / path).read_text(encoding="utf-8", errors="replace")
+                except OSError:
+                    continue  # deleted since the scan: dropped on the next refresh
+                chunks[path] = chunk_text(text, self.chunk_chars)
+            texts = {_digest(chunk): chunk for file_chunks in chunks.values() for chunk in file_chunks}
+            stored = set()
+            digests = list(texts)
+            for start in range(0, len(digests), SQLITE_BATCH):
+                batch = digests[start:start + SQLITE_BATCH]
+                stored.update(row[0] for row in self._db.execute(
+                    f"SELECT digest FROM vectors WHERE digest IN ({', '.join('?' * len(batch))})", batch
+                ))
+            missing = [digest for digest in digests if digest not in stored]
+
+            # Embed before writing, so a failing embedder leaves the index as it was
+            vectors: List[np.ndarray] = []
+            for start in range(0, len(missing), EMBED_BATCH):
+                vectors.extend(self.embedder.embed([texts[d] for d in missing[start:start + EMBED_BATCH]]))
+
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.executemany(
+                    "INSERT INTO vectors VALUES (?, ?, ?)",
+                    ((d, texts[d], np.asarray(v, dtype=np.float32).tobytes()) for d, v in zip(missing, vectors)),
+                )
+                dropped = set()
+                for path in removed + list(chunks):
+                    old = self._db.execute("SELECT digest FROM chunks WHERE path = ?", (path,))
+                    dropped.update(row[0] for row in old)
+                    self._db.execute("DELETE FROM chunks WHERE path = ?", (path,))
+                    self._db.execute("DELETE FROM files WHERE path = ?", (path,))
+                for path, file_chunks in chunks.items():
+                    self._db.executemany(
+                        "INSERT INTO chunks VALUES (?, ?, ?)",
+                        ((path, i, _digest(chunk)) for i, chunk in enumerate(file_chunks)),
+                    )
+                    self._db.execute("INSERT INTO files VALUES (?, ?, ?)", (path, *found[path]))
+                # Vectors no chunk uses any more
+                self._db.executemany(
+                    "DELETE FROM vectors WHERE digest = ? AND NOT EXISTS (SELECT 1 FROM chunks WHERE digest = ?)",
+                    ((d, d) for d in dropped),
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._matrix = None
+            self.refreshed_at = time.monotonic()
+            return {"files": len(chunks), "removed": len(removed), "embedded": len(missing)}
+
+    def _load(self) -> Tuple[List[str], List[str], np.ndarray]:
+        if self._matrix is None:
+            rows = self._db.execute(
+                "SELECT chunks.path, vectors.text, vectors.vector FROM chunks JOIN vectors USING (digest) "
+                "ORDER BY chunks.path, chunks.position"
+            ).fetchall()
+            vectors = np.frombuffer(b"".join(row[2] for row in rows), dtype=np.float32)
+            self._matrix = (
+                [row[0] for row in rows],
+                [row[1] for row in rows],
+                vectors.reshape(len(rows), -1) if rows else np.zeros((0, 0), dtype=np.float32),
+            )
+        return self._matrix
+
+    def search(
+        self, query: str, k: int = KNOWLEDGE_TOP_K, min_score: float = KNOWLEDGE_MIN_SCORE
+    ) -> List[Tuple[str, str, float]]:
+        """Top-``k`` ``(file, chunk text, cosine similarity)`` for ``query``, best first."""
+        with self._lock:
+            if time.monotonic() - self.refreshed_at >= KNOWLEDGE_REFRESH_INTERVAL:
+                self.refresh()
+            paths, texts, vectors = self._load()
+        if k <= 0 or not paths:
+            return []
+        scores = vectors @ self.embedder.embed([query])[0]
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(paths[i], texts[i], float(scores[i])) for i in top.tolist() if scores[i] >= min_score]
+
+
+_index: Optional[KnowledgeIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_knowledge_index() -> KnowledgeIndex:
+    """Process-wide index of ``KNOWLEDGE_DIR``, opened from ``KNOWLEDGE_INDEX_PATH`` on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = KnowledgeIndex(get_embedder())
+        return _index
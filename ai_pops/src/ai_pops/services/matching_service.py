@@ -0,0 +1,161 @@
+"""Local, deterministic developer-ticket matching.
+
+Developers and tickets are tokenized into hashed bag-of-words vectors so the
+whole developer x ticket score matrix can be computed with a single NumPy
+matrix product, without any OpenAI round-trip.
+"""
+
+import re
+import zlib
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ai_pops.api.models import Assignment, Developer, Ticket
+from ai_pops.services.assignment_service import solve_assignment
+
+N_FEATURES = 2 ** 12
+SKILL_WEIGHT = 2.0
+TITLE_WEIGHT = 2.0
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in into is it its of on or "
+    "that the this to with will years year experience developer software "
+    "engineer using use build create add new make".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Split free text into lowercase tokens, dropping stopwords."""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def developer_terms(developer: Developer) -> Dict[str, float]:
+    """Weighted terms for a developer: skills count more than the summary."""
+    terms: Dict[str, float] = {}
+    for skill in developer.skills:
+        tokens = tokenize(skill)
+        for token in tokens:
+            terms[token] = terms.get(token, 0.0) + SKILL_WEIGHT
+        if len(tokens) > 1:
+            # Keep multi-word skills ("react native") as a phrase as well
+            phrase = " ".join(tokens)
+            terms[phrase] = terms.get(phrase, 0.0) + SKILL_WEIGHT
+    for token in tokenize(developer.profile_summary):
+        terms[token] = terms.get(token, 0.0) + 1.0
+    return terms
+
+
+def ticket_terms(ticket: Ticket) -> Dict[str, float]:
+    """Weighted terms for a ticket: the title counts more than the description."""
+    terms: Dict[str, float] = {}
+    title_tokens = tokenize(ticket.title)
+    for token in title_tokens:
+        terms[token] = terms.get(token, 0.0) + TITLE_WEIGHT
+    description_tokens = tokenize(ticket.description)
+    for token in description_tokens:
+        terms[token] = terms.get(token, 0.0) + 1.0
+    # Bigrams let phrase skills such as "react native" match ticket text
+    for tokens in (title_tokens, description_tokens):
+        for left, right in zip(tokens, tokens[1:]):
+            phrase = f"{left} {right}"
+            terms[phrase] = terms.get(phrase, 0.0) + 1.0
+    return terms
+
+
+def _feature_index(term: str) -> int:
+    # crc32 rather than hash() so features are stable across processes
+    return zlib.crc32(term.encode("utf-8")) & (N_FEATURES - 1)
+
+
+def featurize(documents: Sequence[Dict[str, float]]) -> np.ndarray:
+    """Build an L2-normalized (n_documents, N_FEATURES) float32 matrix."""
+    rows: List[int] = []
+    cols: List[int] = []
+    weights: List[float] = []
+    for row, terms in enumerate(documents):
+        for term, weight in terms.items():
+            rows.append(row)
+            cols.append(_feature_index(term))
+            weights.append(weight)
+
+    flat = np.asarray(rows, dtype=np.int64) * N_FEATURES + np.asarray(cols, dtype=np.int64)
+    matrix = np.bincount(
+        flat, weights=np.log1p(np.asarray(weights, dtype=np.float64)),
+        minlength=len(documents) * N_FEATURES,
+    ).astype(np.float32).reshape(len(documents), N_FEATURES)
+
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def sparse_features(terms: Dict[str, float]) -> Tuple[np.ndarray, np.ndarray]:
+    """One document's row of ``featurize`` as (feature indices, values)."""
+    if not terms:
+        return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+    cols = np.fromiter((_feature_index(t) for t in terms), dtype=np.int64, count=len(terms))
+    weights = np.log1p(np.fromiter(terms.values(), dtype=np.float64, count=len(terms)))
+    indices, inverse = np.unique(cols, return_inverse=True)
+    values = np.bincount(inverse, weights=weights).astype(np.float32)
+    norm = np.linalg.norm(values)
+    if norm > 0:
+        values /= norm
+    return indices.astype(np.int32), values
+
+
+def score_matrix(developers: Sequence[Developer], tickets: Sequence[Ticket]) -> np.ndarray:
+    """Return the (n_developers, n_tickets) cosine similarity matrix scaled to 0-100."""
+    dev_features = featurize([developer_terms(d) for d in developers])
+    ticket_features = featurize([ticket_terms(t) for t in tickets])
+    scores = dev_features @ ticket_features.T
+    scores *= 100.0
+    return scores
+
+
+def explain_match(developer: Developer, ticket: Ticket) -> str:
+    """Short human-readable reason for pairing a developer with a ticket."""
+    ticket_tokens = set(ticket_terms(ticket))
+    shared = [s for s in developer.skills if " ".join(tokenize(s)) in ticket_tokens]
+    if shared:
+        return f"Skill overlap: {', '.join(shared)}"
+    overlap = sorted(set(developer_terms(developer)) & ticket_tokens)
+    if overlap:
+        return f"Profile mentions {', '.join(overlap[:3])}"
+    return f"Closest available profile ({developer.experience_years} years experience)"
+
+
+def build_assignments(
+    developers: Sequence[Developer],
+    tickets: Sequence[Ticket],
+    pairs: Iterable[tuple],
+    scores: np.ndarray,
+) -> List[Assignment]:
+    """Turn (ticket_index, developer_index) pairs into ``Assignment`` objects."""
+    return [
+        Assignment(
+            ticketId=tickets[t].id,
+            developerName=developers[d].name,
+            reason=explain_match(developers[d], tickets[t]),
+            matchScore=round(float(scores[d, t]), 1),
+        )
+        for t, d in pairs
+    ]
+
+
+def match_optimally(
+    developers: Sequence[Developer],
+    tickets: Sequence[Ticket],
+    capacity: Optional[int] = None,
+    load: Optional[Sequence[int]] = None,
+) -> List[Assignment]:
+    """Assign every ticket, maximising total score under a per-developer capacity.
+
+    ``load`` is how many tickets each developer already has, which count
+    against ``capacity``.
+    """
+    if not developers or not tickets:
+        return []
+    scores = score_matrix(developers, tickets)
+    return build_assignments(developers, tickets, solve_assignment(scores, capacity, load=load), scores)
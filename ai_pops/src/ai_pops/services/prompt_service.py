@@ -0,0 +1,139 @@
+"""Match prompts for the LLM and expansion of its answers into assignments.
+
+Two encodings are available:
+
+- ``verbose``: the developers and tickets as their full JSON models. The
+  model answers with complete ``Assignment`` objects, repeating every ticket
+  id and developer name and writing a reason for each.
+- ``compact`` (the default): developers and tickets get short integer ids
+  (their position in the prompt), skills are listed once in a shared
+  vocabulary and referenced by number, and free text is truncated. The model
+  answers with ``[ticket, developer, score]`` tuples, which
+  ``expand_assignment`` turns back into ``Assignment`` dicts on the server.
+
+With the compact encoding, reasons come from the server by default, from
+``explain_match`` like those of solver assignments. This costs no output
+tokens. ``MATCH_REASONS=llm`` asks the model for a short reason as a
+fourth tuple element instead.
+
+``match_response_format`` is the JSON schema each encoding's answer follows,
+for backends that constrain their output to one.
+"""
+
+import json
+import os
+from typing import Any, Dict, Sequence
+
+from ai_pops.api.models import Developer, Ticket
+from ai_pops.api.schemas import ASSIGNMENTS_FORMAT, COMPACT_ASSIGNMENTS_FORMAT
+from ai_pops.services.matching_service import explain_match
+
+# "compact" or "verbose"
+MATCH_PROMPT_FORMAT = os.getenv("MATCH_PROMPT_FORMAT", "compact")
+# Compact prompts: characters kept of each ticket's title + description and
+# of each developer's profile summary (0 leaves summaries out)
+MATCH_TICKET_CHARS = int(os.getenv("MATCH_TICKET_CHARS", "160"))
+MATCH_SUMMARY_CHARS = int(os.getenv("MATCH_SUMMARY_CHARS", "0"))
+# Who writes each assignment's reason in compact mode: "local" (the server,
+# from the matched skills) or "llm" (the model, a few words per assignment)
+MATCH_REASONS = os.getenv("MATCH_REASONS", "local")
+
+COMPACT = (",", ":")
+
+
+def _truncate(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[: limit - 1].rstrip() + "…"
+
+
+def verbose_match_prompt(developers: Sequence[Developer], tickets: Sequence[Ticket]) -> str:
+    """The developers and tickets as full JSON, answered with full assignments."""
+    return f"""
+    Match these developers to tickets. Return JSON array only:
+
+    DEVELOPERS: {json.dumps([d.model_dump() for d in developers])}
+    TICKETS: {json.dumps([t.model_dump() for t in tickets])}
+
+    Return format:
+    [
+        {{
+            "ticketId": "ticket_id",
+            "developerName": "Developer Name",
+            "reason": "Why this match makes sense",
+            "matchScore": 85.5
+        }}
+    ]
+    """
+
+
+def compact_match_prompt(
+    developers: Sequence[Developer],
+    tickets: Sequence[Ticket],
+    ticket_chars: int = MATCH_TICKET_CHARS,
+    summary_chars: int = MATCH_SUMMARY_CHARS,
+    reasons: str = MATCH_REASONS,
+) -> str:
+    """Integer ids, a shared skill vocabulary and truncated text, answered with tuples."""
+    vocabulary: Dict[str, int] = {}
+    devs = []
+    for i, developer in enumerate(developers):
+        skills = [vocabulary.setdefault(skill, len(vocabulary)) for skill in developer.skills]
+        entry = [i, skills, developer.experience_years]
+        if summary_chars:
+            entry.append(_truncate(developer.profile_summary, summary_chars))
+        devs.append(entry)
+    tasks = [[i, _truncate(f"{t.title}: {t.description}", ticket_chars)] for i, t in enumerate(tickets)]
+
+    if reasons == "llm":
+        answer = "[ticket id, developer id, score 0-100, reason in at most 8 words]"
+        example = '[[0,2,88,"Knows React and Python"]]'
+    else:
+        answer = "[ticket id, developer id, score 0-100]"
+        example = "[[0,2,88],[1,0,71]]"
+    return (
+        "Assign every ticket to the developer best suited to it.\n"
+        f"SKILLS: {json.dumps(list(vocabulary), separators=COMPACT, ensure_ascii=False)}\n"
+        "Developers are [id, skill numbers, years of experience"
+        f"{', summary' if summary_chars else ''}].\n"
+        f"DEVS: {json.dumps(devs, separators=COMPACT, ensure_ascii=False)}\n"
+        "Tickets are [id, title: description].\n"
+        f"TASKS: {json.dumps(tasks, separators=COMPACT, ensure_ascii=False)}\n"
+        f"Reply with only a JSON array with one {answer} per ticket, e.g. {example}"
+    )
+
+
+def match_prompt(
+    developers: Sequence[Developer], tickets: Sequence[Ticket], prompt_format: str = MATCH_PROMPT_FORMAT
+) -> str:
+    """The match prompt for one chunk in ``prompt_format``."""
+    if prompt_format == "verbose":
+        return verbose_match_prompt(developers, tickets)
+    return compact_match_prompt(developers, tickets)
+
+
+def match_response_format(prompt_format: str = MATCH_PROMPT_FORMAT) -> Dict[str, Any]:
+    """The ``response_format`` for answers to ``match_prompt`` in ``prompt_format``."""
+    return ASSIGNMENTS_FORMAT if prompt_format == "verbose" else COMPACT_ASSIGNMENTS_FORMAT
+
+
+def expand_assignment(item: Any, developers: Sequence[Developer], tickets: Sequence[Ticket]) -> Any:
+    """Turn a compact ``[ticket, developer, score(, reason)]`` answer into an ``Assignment`` dict.
+
+    ``developers`` and ``tickets`` are the ones the prompt listed, in the same
+    order. Objects (verbose answers) are returned unchanged. ``None`` is
+    returned for tuples that are malformed or have ids out of range.
+    """
+    if not isinstance(item, list):
+        return item
+    if len(item) < 3 or not all(isinstance(i, int) and not isinstance(i, bool) for i in item[:2]):
+        return None
+    t, d, score = item[:3]
+    if not (0 <= t < len(tickets) and 0 <= d < len(developers)):
+        return None
+    reason = item[3] if len(item) > 3 and isinstance(item[3], str) and item[3] else None
+    return {
+        "ticketId": tickets[t].id,
+        "developerName": developers[d].name,
+        "reason": reason or explain_match(developers[d], tickets[t]),
+        "matchScore": score,
+    }
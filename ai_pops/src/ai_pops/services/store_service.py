@@ -0,0 +1,384 @@
+"""Persistent developer/ticket store with incremental re-matching.
+
+Developers, tickets, their sparse feature vectors and the current assignment
+live in SQLite (WAL mode). In memory the store keeps the developer feature
+matrix, each ticket's top-K candidate developers and an incremental
+``AssignmentSolver``. Editing one ticket rescores one row of the score matrix
+and re-solves from that ticket; editing one developer rescores one column and
+re-solves only the tickets whose candidate lists it touches.
+"""
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ai_pops.api.models import Assignment, Developer, Ticket
+from ai_pops.services.assignment_service import (
+    SCORE_RESOLUTION, AssignmentSolver, default_capacity, to_benefits,
+)
+from ai_pops.services.matching_service import (
+    N_FEATURES, developer_terms, explain_match, featurize, sparse_features, ticket_terms,
+)
+
+STORE_PATH = os.getenv("STORE_PATH", "ai_pops.db")
+# Candidate developers kept per ticket; fewer means cheaper developer edits
+STORE_CANDIDATES = int(os.getenv("STORE_CANDIDATES", "8"))
+# Minimum tickets per developer; the store grows it to cover the backlog
+STORE_CAPACITY = int(os.getenv("STORE_CAPACITY", "0"))
+# Spare slots on top of an even split. With no slack at all every edit has to
+# re-route a chain of tickets across the whole backlog.
+STORE_CAPACITY_HEADROOM = float(os.getenv("STORE_CAPACITY_HEADROOM", "0.2"))
+
+Features = Tuple[np.ndarray, np.ndarray]
+
+
+def _pack(features: Features) -> bytes:
+    indices, values = features
+    return indices.astype("<i4").tobytes() + values.astype("<f4").tobytes()
+
+
+def _unpack(blob: bytes) -> Features:
+    n = len(blob) // 8
+    return (
+        np.frombuffer(blob, dtype="<i4", count=n).astype(np.int32),
+        np.frombuffer(blob, dtype="<f4", count=n, offset=4 * n).astype(np.float32),
+    )
+
+
+def _dense(features: Features) -> np.ndarray:
+    row = np.zeros(N_FEATURES, dtype=np.float32)
+    row[features[0]] = features[1]
+    return row
+
+
+class TeamStore:
+    """SQLite-backed team and backlog with an always-current optimal assignment."""
+
+    def __init__(
+        self,
+        path: str = STORE_PATH,
+        capacity: int = STORE_CAPACITY,
+        candidates: int = STORE_CANDIDATES,
+        headroom: float = STORE_CAPACITY_HEADROOM,
+    ):
+        self.candidates = candidates
+        self.min_capacity = capacity
+        self.headroom = headroom
+        self._lock = threading.RLock()
+        self._reloading = False
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS developers (
+                name TEXT PRIMARY KEY, data TEXT NOT NULL, features BLOB NOT NULL);
+            CREATE TABLE IF NOT EXISTS tickets (
+                id TEXT PRIMARY KEY, data TEXT NOT NULL, features BLOB NOT NULL);
+            CREATE TABLE IF NOT EXISTS assignments (
+                ticket_id TEXT PRIMARY KEY, developer_name TEXT NOT NULL, score REAL NOT NULL);
+            """
+        )
+
+        self._reload()
+
+    def _reload(self) -> None:
+        """Read the team and backlog from SQLite and re-solve."""
+        self.developers: Dict[str, Developer] = {}
+        self.dev_features: Dict[str, Features] = {}
+        self.tickets: Dict[str, Ticket] = {}
+        self.ticket_features: Dict[str, Features] = {}
+        for name, data, blob in self._db.execute("SELECT name, data, features FROM developers"):
+            self.developers[name] = Developer.model_validate_json(data)
+            self.dev_features[name] = _unpack(blob)
+        for ticket_id, data, blob in self._db.execute("SELECT id, data, features FROM tickets"):
+            self.tickets[ticket_id] = Ticket.model_validate_json(data)
+            self.ticket_features[ticket_id] = _unpack(blob)
+        self._rebuild()
+
+    @contextmanager
+    def _transaction(self):
+        self._db.execute("BEGIN")
+        try:
+            yield
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            # The in-memory state was edited alongside the rows; put it back,
+            # unless it is that reload which failed
+            if not self._reloading:
+                self._reloading = True
+                try:
+                    self._reload()
+                finally:
+                    self._reloading = False
+            raise
+        self._db.execute("COMMIT")
+
+    # Reads
+
+    def list_developers(self) -> List[Developer]:
+        with self._lock:
+            return list(self.developers.values())
+
+    def list_tickets(self) -> List[Ticket]:
+        with self._lock:
+            return list(self.tickets.values())
+
+    def assignments(self) -> List[Assignment]:
+        with self._lock:
+            if self.solver is None:
+                return []
+            result = []
+            for ticket_id, dev in self.solver.ticket_dev.items():
+                developer = self.developers[self.dev_names[dev]]
+                ticket = self.tickets[ticket_id]
+                result.append(Assignment(
+                    ticketId=ticket_id,
+                    developerName=developer.name,
+                    reason=explain_match(developer, ticket),
+                    matchScore=self.ticket_candidates[ticket_id][dev] / SCORE_RESOLUTION,
+                ))
+            return result
+
+    def search_developers(self, queries: List[str], k: int) -> List[List[Tuple[Developer, float]]]:
+        """Top-``k`` ``(developer, score 0-100)`` for each free-text query, best first.
+
+        Queries are scored like ticket titles, all with one matrix product;
+        developers sharing no term with a query are left out.
+        """
+        with self._lock:
+            if not self.dev_names or not queries or k <= 0:
+                return [[] for _ in queries]
+            query_matrix = featurize([ticket_terms(Ticket(id="", title=q, description="")) for q in queries])
+            scores = (query_matrix @ self.dev_matrix.T) * 100.0
+            k = min(k, len(self.dev_names))
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            results = []
+            for row, cols in zip(scores, top):
+                cols = cols[np.argsort(-row[cols])]
+                results.append([
+                    (self.developers[self.dev_names[c]], float(row[c])) for c in cols.tolist() if row[c] > 0
+                ])
+            return results
+
+    def load(self, developers: List[Developer], tickets: List[Ticket]) -> None:
+        """Bulk upsert a team and backlog, then re-solve once."""
+        with self._lock:
+            with self._transaction():
+                for developer in developers:
+                    features = sparse_features(developer_terms(developer))
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO developers (name, data, features) VALUES (?, ?, ?)",
+                        (developer.name, developer.model_dump_json(), _pack(features)),
+                    )
+                    self.developers[developer.name] = developer
+                    self.dev_features[developer.name] = features
+                for ticket in tickets:
+                    features = sparse_features(ticket_terms(ticket))
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO tickets (id, data, features) VALUES (?, ?, ?)",
+                        (ticket.id, ticket.model_dump_json(), _pack(features)),
+                    )
+                    self.tickets[ticket.id] = ticket
+                    self.ticket_features[ticket.id] = features
+                self._rebuild()
+
+    # Tickets: one row of the score matrix each
+
+    def upsert_ticket(self, ticket: Ticket) -> Ticket:
+        with self._lock:
+            features = sparse_features(ticket_terms(ticket))
+            with self._transaction():
+                existing = ticket.id in self.tickets
+                self._db.execute(
+                    "INSERT OR REPLACE INTO tickets (id, data, features) VALUES (?, ?, ?)",
+                    (ticket.id, ticket.model_dump_json(), _pack(features)),
+                )
+                self.tickets[ticket.id] = ticket
+                self.ticket_features[ticket.id] = features
+                self._ticket_matrix = None
+                if self.solver is not None:
+                    self._set_candidates(ticket.id, self._ticket_scores(ticket.id))
+                    self._place_ticket(ticket.id, replace=existing)
+                self._persist_changes()
+            return ticket
+
+    def delete_ticket(self, ticket_id: str) -> bool:
+        with self._lock:
+            if ticket_id not in self.tickets:
+                return False
+            with self._transaction():
+                self._unplace_ticket(ticket_id)
+                self._db.execute("DELETE FROM tickets WHERE id = ?", (ticket_id,))
+                del self.tickets[ticket_id]
+                del self.ticket_features[ticket_id]
+                self._ticket_matrix = None
+                self._persist_changes()
+            return True
+
+    # Developers: one column of the score matrix each
+
+    def upsert_developer(self, developer: Developer) -> Developer:
+        with self._lock:
+            features = sparse_features(developer_terms(developer))
+            is_new = developer.name not in self.developers
+            with self._transaction():
+                self._db.execute(
+                    "INSERT OR REPLACE INTO developers (name, data, features) VALUES (?, ?, ?)",
+                    (developer.name, developer.model_dump_json(), _pack(features)),
+                )
+                self.developers[developer.name] = developer
+                self.dev_features[developer.name] = features
+                if self.solver is None:
+                    self._rebuild()
+                    return developer
+                if is_new:
+                    dev = self.solver.add_developer()
+                    self.dev_names.append(developer.name)
+                    self.dev_index[developer.name] = dev
+                    self.dev_matrix = np.vstack([self.dev_matrix, _dense(features)[None, :]])
+                else:
+                    dev = self.dev_index[developer.name]
+                    self.dev_matrix[dev] = _dense(features)
+                self._rescore_developer(dev)
+                self._persist_changes()
+            return developer
+
+    def delete_developer(self, name: str) -> bool:
+        with self._lock:
+            if name not in self.developers:
+                return False
+            with self._transaction():
+                self._db.execute("DELETE FROM developers WHERE name = ?", (name,))
+                del self.developers[name]
+                del self.dev_features[name]
+                # Developer indices shift, so re-solve from scratch
+                self._rebuild()
+            return True
+
+    # Internals
+
+    def _rebuild(self) -> None:
+        """Rescore and re-solve everything; used at startup and on developer removal."""
+        self.dev_names = list(self.developers)
+        self.dev_index = {name: i for i, name in enumerate(self.dev_names)}
+        self.ticket_candidates: Dict[str, Dict[int, int]] = {}
+        self._ticket_matrix = None
+        self.dev_matrix = np.zeros((len(self.dev_names), N_FEATURES), dtype=np.float32)
+        for i, name in enumerate(self.dev_names):
+            self.dev_matrix[i] = _dense(self.dev_features[name])
+
+        self.solver: Optional[AssignmentSolver] = None
+        with self._transaction() if not self._db.in_transaction else _noop():
+            self._db.execute("DELETE FROM assignments")
+            if not self.dev_names:
+                return
+            self.solver = AssignmentSolver(len(self.dev_names), self._required_capacity())
+            ids, rows, indices, values = self._tickets_csr()
+            block = 1024
+            for start in range(0, len(ids), block):
+                dense = np.zeros((min(block, len(ids) - start), N_FEATURES), dtype=np.float32)
+                mask = (rows >= start) & (rows < start + block)
+                dense[rows[mask] - start, indices[mask]] = values[mask]
+                scores = (dense @ self.dev_matrix.T) * 100.0
+                for offset, ticket_id in enumerate(ids[start:start + block]):
+                    self._set_candidates(ticket_id, scores[offset])
+            for ticket_id in ids:
+                self._place_ticket(ticket_id)
+            self._persist_changes()
+
+    def _required_capacity(self) -> int:
+        even_split = default_capacity(len(self.dev_names), len(self.tickets), self.headroom)
+        return max(self.min_capacity, even_split)
+
+    def _tickets_csr(self):
+        """All ticket features as flat (row, index, value) arrays, cached between edits."""
+        if self._ticket_matrix is None:
+            ids = list(self.tickets)
+            features = [self.ticket_features[t] for t in ids]
+            lengths = np.fromiter((len(f[0]) for f in features), dtype=np.int64, count=len(ids))
+            rows = np.repeat(np.arange(len(ids)), lengths)
+            indices = np.concatenate([f[0] for f in features]) if ids else np.zeros(0, dtype=np.int32)
+            values = np.concatenate([f[1] for f in features]) if ids else np.zeros(0, dtype=np.float32)
+            self._ticket_matrix = (ids, rows, indices, values)
+        return self._ticket_matrix
+
+    def _ticket_scores(self, ticket_id: str) -> np.ndarray:
+        indices, values = self.ticket_features[ticket_id]
+        return (self.dev_matrix[:, indices] @ values) * 100.0
+
+    def _set_candidates(self, ticket_id: str, scores: np.ndarray) -> None:
+        k = min(self.candidates, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+        benefits = to_benefits(scores[top])
+        self.ticket_candidates[ticket_id] = dict(zip(top.tolist(), benefits.tolist()))
+
+    def _place_ticket(self, ticket_id: str, replace: bool = False) -> None:
+        solver = self.solver
+        required = self._required_capacity()
+        if required > solver.capacity:
+            solver.grow_capacity(required)
+        place = solver.update if replace else solver.insert
+        if place(ticket_id, self.ticket_candidates[ticket_id]):
+            return
+        # The candidate graph is saturated: widen this ticket to every developer
+        self._set_candidates_all(ticket_id)
+        while not solver.insert(ticket_id, self.ticket_candidates[ticket_id]):
+            solver.grow_capacity(solver.capacity + 1)
+
+    def _set_candidates_all(self, ticket_id: str) -> None:
+        scores = self._ticket_scores(ticket_id)
+        self.ticket_candidates[ticket_id] = dict(enumerate(to_benefits(scores).tolist()))
+
+    def _unplace_ticket(self, ticket_id: str) -> None:
+        if self.ticket_candidates.pop(ticket_id, None) is not None:
+            self.solver.remove(ticket_id)
+
+    def _rescore_developer(self, dev: int) -> None:
+        """Recompute one column and re-solve the tickets whose candidates it changes."""
+        ids, rows, indices, values = self._tickets_csr()
+        column = np.bincount(rows, weights=self.dev_matrix[dev][indices] * values, minlength=len(ids)) * 100.0
+        benefits = to_benefits(column)
+        k = min(self.candidates, len(self.dev_names))
+        affected = set(self.solver.candidates_of[dev])
+        for ticket_id, benefit in zip(ids, benefits.tolist()):
+            candidates = self.ticket_candidates[ticket_id]
+            if len(candidates) < k or benefit > min(candidates.values()):
+                affected.add(ticket_id)
+
+        for ticket_id in affected:
+            self._set_candidates(ticket_id, self._ticket_scores(ticket_id))
+            self._place_ticket(ticket_id, replace=True)
+
+    def _persist_changes(self) -> None:
+        for ticket_id in self.solver.drain_changes() if self.solver is not None else ():
+            dev = self.solver.ticket_dev.get(ticket_id)
+            if dev is None:
+                self._db.execute("DELETE FROM assignments WHERE ticket_id = ?", (ticket_id,))
+            else:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO assignments (ticket_id, developer_name, score) VALUES (?, ?, ?)",
+                    (ticket_id, self.dev_names[dev], self.ticket_candidates[ticket_id][dev] / SCORE_RESOLUTION),
+                )
+
+
+@contextmanager
+def _noop():
+    yield
+
+
+_store: Optional[TeamStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> TeamStore:
+    """Process-wide store, opened on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = TeamStore()
+        return _store
@@ -0,0 +1,184 @@
+"""Seeded synthetic developers and tickets, generated locally in bulk.
+
+For load-test fixtures and offline development: no LLM, and 100k profiles
+take well under a second or two. All random draws for a batch are made at
+once with numpy, and only the final strings are formatted per item.
+
+Each developer and ticket belongs to an area (frontend, backend, data, ...).
+Skills are drawn from a popularity-weighted vocabulary, boosted for the
+area, so tickets mention skills that some developers actually have and
+matching them is not trivial. Developer names are unique within a batch.
+The same seed always gives the same batch.
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+FIRST_NAMES = [
+    "Aaliyah", "Aarav", "Abdul", "Ada", "Adrian", "Aiko", "Alejandro", "Alice", "Amara", "Anders", "Ana", "Arjun",
+    "Astrid", "Ayesha", "Bea", "Bilal", "Bruno", "Camila", "Carmen", "Chen", "Chloe", "Dara", "David", "Deepak",
+    "Diego", "Dmitri", "Elena", "Emeka", "Emma", "Eun-ji", "Farid", "Fatima", "Felix", "Freya", "Gabriel", "Grace",
+    "Hana", "Hassan", "Hiro", "Ines", "Isaac", "Ivan", "Jamal", "Jonas", "Julia", "Kai", "Kemi", "Kenji", "Lars",
+    "Lena", "Leila", "Lucas", "Maya", "Marco", "Mei", "Nadia", "Noah", "Olga", "Omar", "Priya", "Quinn", "Rosa",
+    "Sven", "Tariq",
+]
+LAST_NAMES = [
+    "Abe", "Adeyemi", "Ahmed", "Andersen", "Bauer", "Becker", "Bianchi", "Brown", "Chen", "Cohen", "Costa",
+    "Dubois", "Eriksson", "Fernandez", "Fischer", "Garcia", "Gomez", "Gupta", "Haddad", "Hansen", "Ibrahim",
+    "Ivanov", "Jensen", "Johnson", "Kato", "Khan", "Kim", "Kowalski", "Larsen", "Lee", "Lopez", "Martin",
+    "Mendes", "Moreau", "Müller", "Nakamura", "Nguyen", "Novak", "Okafor", "Olsen", "Park", "Patel", "Petrov",
+    "Popescu", "Reyes", "Rossi", "Santos", "Schmidt", "Sato", "Silva", "Singh", "Smith", "Sokolov", "Suzuki",
+    "Tanaka", "Taylor", "Tran", "Wagner", "Wang", "Weber", "Williams", "Yamamoto", "Yilmaz", "Zhang",
+]
+INITIALS = [chr(c) for c in range(ord("A"), ord("Z") + 1)]
+
+# Skill vocabulary, most popular first
+SKILLS = [
+    "Python", "JavaScript", "TypeScript", "React", "SQL", "Docker", "AWS", "Java", "Node.js", "PostgreSQL",
+    "Kubernetes", "Go", "Git", "CI/CD", "Linux", "Terraform", "GraphQL", "Redis", "Spring", "Django",
+    "FastAPI", "Vue", "Next.js", "Kafka", "Spark", "Airflow", "pandas", "PyTorch", "Swift", "Kotlin",
+    "React Native", "Flutter", "Rust", "C#", ".NET", "MySQL", "MongoDB", "Elasticsearch", "GCP", "Azure",
+]
+# area: (skills it boosts, what its tickets are about)
+AREAS = {
+    "frontend": (
+        ["JavaScript", "TypeScript", "React", "Vue", "Next.js", "GraphQL"],
+        ["checkout page", "dashboard", "design system", "onboarding flow", "settings page", "search results page"],
+    ),
+    "backend": (
+        ["Python", "Java", "Go", "Node.js", "Spring", "Django", "FastAPI", "PostgreSQL", "Redis", "C#", ".NET"],
+        ["billing service", "search API", "auth service", "notification worker", "orders API", "rate limiter"],
+    ),
+    "data": (
+        ["Python", "SQL", "Spark", "Airflow", "pandas", "PyTorch", "Kafka", "Elasticsearch"],
+        ["ETL pipeline", "recommendation model", "events warehouse", "fraud detector", "metrics dashboard"],
+    ),
+    "infrastructure": (
+        ["Docker", "Kubernetes", "Terraform", "AWS", "GCP", "Azure", "Linux", "CI/CD"],
+        ["CI pipeline", "Kubernetes cluster", "staging environment", "log shipping", "backup jobs"],
+    ),
+    "mobile": (
+        ["Swift", "Kotlin", "React Native", "Flutter", "TypeScript"],
+        ["iOS app", "Android app", "offline sync", "push notifications", "in-app purchases"],
+    ),
+}
+# Share of developers and tickets in each area
+AREA_WEIGHTS = [0.28, 0.34, 0.14, 0.14, 0.10]
+ACTIONS = ["Add", "Fix", "Refactor", "Speed up", "Migrate", "Harden", "Document", "Test"]
+DETAILS = {
+    "Add": "Build a new capability into",
+    "Fix": "Track down and fix a customer-reported bug in",
+    "Refactor": "Break up and simplify",
+    "Speed up": "Profile and cut the p95 latency of",
+    "Migrate": "Upgrade the runtime and dependencies of",
+    "Harden": "Add input validation, retries and alerts to",
+    "Document": "Write the runbook and API docs for",
+    "Test": "Raise test coverage and add end-to-end checks for",
+}
+SENIORITY = [(3, "Junior"), (6, "Mid-level"), (10, "Senior"), (100, "Staff")]
+
+AREA_NAMES = list(AREAS)
+# Log skill weights per area: a Zipf-like popularity, times 30 for the area's skills
+_POPULARITY = 1.0 / np.arange(1, len(SKILLS) + 1) ** 0.6
+_LOG_WEIGHTS = np.log(np.array([
+    [p * (30.0 if skill in AREAS[area][0] else 1.0) for skill, p in zip(SKILLS, _POPULARITY)]
+    for area in AREA_NAMES
+]))
+
+
+def _rng(seed: int, stream: int) -> np.random.Generator:
+    """Stream ``stream`` of ``seed``. Developers and tickets draw from separate
+    streams, so developer i and ticket i of the same seed are unrelated."""
+    return np.random.default_rng(np.random.SeedSequence(seed).spawn(2)[stream])
+
+
+def _names(rng: np.random.Generator, count: int) -> List[str]:
+    """``count`` distinct "First M. Last" names, numbered once every combination is taken."""
+    space = len(FIRST_NAMES) * len(INITIALS) * len(LAST_NAMES)
+    rounds = -(-count // space)
+    picks = np.concatenate([rng.permutation(space) for _ in range(rounds)])[:count] if count else np.zeros(0, int)
+    first, rest = np.divmod(picks, len(INITIALS) * len(LAST_NAMES))
+    initial, last = np.divmod(rest, len(LAST_NAMES))
+    return [
+        f"{FIRST_NAMES[f]} {INITIALS[m]}. {LAST_NAMES[l]}" + (f" {i // space + 1}" if i >= space else "")
+        for i, (f, m, l) in enumerate(zip(first.tolist(), initial.tolist(), last.tolist()))
+    ]
+
+
+def _skill_draws(rng: np.random.Generator, areas: np.ndarray, k: int) -> np.ndarray:
+    """``k`` distinct skill indices per row, weighted by the row's area (Gumbel top-k)."""
+    keys = _LOG_WEIGHTS[areas] + rng.gumbel(size=(len(areas), len(SKILLS)))
+    return np.argsort(-keys, axis=1)[:, :k]
+
+
+def synthetic_developers(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """``count`` developer profiles in the shape of ``Developer``."""
+    rng = _rng(seed, 0)
+    areas = rng.choice(len(AREA_NAMES), size=count, p=AREA_WEIGHTS)
+    skills = _skill_draws(rng, areas, 6).tolist()
+    skill_counts = rng.integers(3, 7, count).tolist()
+    years = np.clip(rng.gamma(2.2, 3.0, count), 0, 35).astype(int).tolist()
+    names = _names(rng, count)
+    developers = []
+    for name, area, row, n, y in zip(names, areas.tolist(), skills, skill_counts, years):
+        own = [SKILLS[s] for s in row[:n]]
+        level = next(label for limit, label in SENIORITY if y < limit)
+        developers.append({
+            "name": name,
+            "skills": own,
+            "experience_years": y,
+            "profile_summary": (
+                f"{level} {AREA_NAMES[area]} engineer with {y} year{'s' if y != 1 else ''} of experience, "
+                f"mostly {own[0]} and {own[1]}"
+            ),
+        })
+    return developers
+
+
+def synthetic_tickets(count: int, seed: int = 0, start: int = 0) -> List[Dict[str, Any]]:
+    """``count`` tickets in the shape of ``Ticket``, numbered from ``TASK-{start + 1}``."""
+    rng = _rng(seed, 1)
+    areas = rng.choice(len(AREA_NAMES), size=count, p=AREA_WEIGHTS)
+    subject_counts = np.array([len(AREAS[area][1]) for area in AREA_NAMES])
+    subjects = (rng.random(count) * subject_counts[areas]).astype(int).tolist()
+    actions = rng.integers(0, len(ACTIONS), count).tolist()
+    skills = _skill_draws(rng, areas, 2).tolist()
+    tickets = []
+    for i, (area, subject, action, (a, b)) in enumerate(zip(areas.tolist(), subjects, actions, skills)):
+        subject = AREAS[AREA_NAMES[area]][1][subject]
+        action = ACTIONS[action]
+        tickets.append({
+            "id": f"TASK-{start + i + 1:03d}",
+            "title": f"{action} {subject}",
+            "description": f"{DETAILS[action]} the {subject}. Work is mostly in {SKILLS[a]}, with some {SKILLS[b]}.",
+        })
+    return tickets
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Write a synthetic match request (developers and tickets) as JSON.")
+    parser.add_argument("developers", type=int)
+    parser.add_argument("tickets", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="file to write; standard output if omitted")
+    args = parser.parse_args(argv)
+
+    payload = {
+        "developers": synthetic_developers(args.developers, args.seed),
+        "tickets": synthetic_tickets(args.tickets, args.seed),
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False)
+        print(f"{args.output}: {args.developers} developers, {args.tickets} tickets")
+    else:
+        json.dump(payload, sys.stdout, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""Persistent task-output cache for crew runs.
+
+A ``CachedTask`` is keyed on everything that decides its output: the rendered
+task description and expected output, the agent's rendered role, goal and
+backstory, its model and tools, and a hash of the upstream context. A hit
+skips the agent entirely and replays the stored output (including writing
+``output_file``). Because the context hash is part of the key, editing only
+a downstream task's prompt re-runs just that task; editing an upstream task
+changes its output and therefore every key after it.
+"""
+
+import datetime
+import hashlib
+import json
+import os
+from typing import Any, List, Optional
+
+from crewai import Task
+from crewai.agents.agent_builder.base_agent import BaseAgent
+from crewai.tasks.task_output import TaskOutput
+from crewai.utilities.events import TaskCompletedEvent, TaskStartedEvent, crewai_event_bus
+from pydantic import PrivateAttr
+
+from ai_pops.api.cache import ResponseCache
+
+# SQLite file holding task outputs; reruns days apart still hit
+CREW_CACHE_PATH = os.getenv("CREW_CACHE_PATH", ".crew_cache.db")
+CREW_CACHE_TTL = float(os.getenv("CREW_CACHE_TTL", str(7 * 24 * 3600)))
+# Set to 1 to ignore stored outputs (fresh results are still stored)
+CREW_CACHE_REFRESH = os.getenv("CREW_CACHE_REFRESH", "") == "1"
+
+_task_cache: Optional[ResponseCache] = None
+
+
+def get_task_cache() -> ResponseCache:
+    global _task_cache
+    if _task_cache is None:
+        _task_cache = ResponseCache(ttl=CREW_CACHE_TTL, path=CREW_CACHE_PATH)
+    return _task_cache
+
+
+def _model_name(agent: BaseAgent) -> str:
+    llm = getattr(agent, "llm", None)
+    return str(getattr(llm, "model", llm))
+
+
+def task_cache_key(task: Task, agent: BaseAgent, context: Optional[str], tools: List[Any]) -> str:
+    """Hash of the rendered task, its agent and the upstream context."""
+    canonical = json.dumps(
+        {
+            "task": {
+                "name": task.name,
+                "description": task.description,
+                "expected_output": task.expected_output,
+                "output_json": getattr(task.output_json, "__name__", None),
+                "output_pydantic": getattr(task.output_pydantic, "__name__", None),
+            },
+            "agent": {
+                "role": agent.role,
+                "goal": agent.goal,
+                "backstory": agent.backstory,
+                "model": _model_name(agent),
+                "tools": sorted(getattr(tool, "name", str(tool)) for tool in tools),
+            },
+            "context": hashlib.sha256((context or "").encode("utf-8")).hexdigest(),
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class CachedTask(Task):
+    """A ``Task`` that reuses its stored output when nothing it depends on changed."""
+
+    _replayed: bool = PrivateAttr(default=False)
+
+    @property
+    def replayed(self) -> bool:
+        """Whether the last execution was served from the cache."""
+        return self._replayed
+
+    def _execute_core(self, agent: Optional[BaseAgent], context: Optional[str], tools: Optional[List[Any]]) -> TaskOutput:
+        agent = agent or self.agent
+        if agent is None:
+            return super()._execute_core(agent, context, tools)
+        cache = get_task_cache()
+        key = task_cache_key(self, agent, context, tools or self.tools or [])
+        cached = None if CREW_CACHE_REFRESH else cache.get(key)
+        self._replayed = cached is not None
+        if cached is None:
+            output = super()._execute_core(agent, context, tools)
+            cache.set(key, output.raw)
+            return output
+        print(f"Reusing cached output for task '{self.name}'")
+        return self._replay(agent, context, cached)
+
+    def _replay(self, agent: BaseAgent, context: Optional[str], raw: str) -> TaskOutput:
+        """Finish the task from a stored result the way a real run would."""
+        self.agent = agent
+        self.start_time = datetime.datetime.now()
+        self.prompt_context = context
+        self.processed_by_agents.add(agent.role)
+        crewai_event_bus.emit(self, TaskStartedEvent(context=context, task=self))
+        pydantic_output, json_output = self._export_output(raw)
+        self.output = TaskOutput(
+            name=self.name,
+            description=self.description,
+            expected_output=self.expected_output,
+            raw=raw,
+            pydantic=pydantic_output,
+            json_dict=json_output,
+            agent=agent.role,
+            output_format=self._get_output_format(),
+        )
+        self.end_time = datetime.datetime.now()
+        if self.callback:
+            self.callback(self.output)
+        crew = agent.crew
+        if crew and crew.task_callback and crew.task_callback != self.callback:
+            crew.task_callback(self.output)
+        if self.output_file:
+            content = json_output if json_output else (
+                pydantic_output.model_dump_json() if pydantic_output else raw
+            )
+            self._save_file(content)
+        crewai_event_bus.emit(self, TaskCompletedEvent(output=self.output, task=self))
+        return self.output
@@ -0,0 +1,2 @@
+from ai_pops.tools.cached_tool import CachedTool
+from ai_pops.tools.developer_skills import DeveloperSkillLookupTool
@@ -0,0 +1,215 @@
+"""Base class for crew tools that memoize, batch and count their calls.
+
+Agents calling a tool in a loop repeat themselves. A ``CachedTool`` answers a
+call whose arguments it has seen within ``cache_ttl`` seconds from an LRU of
+``cache_size`` results (the ``ResponseCache`` the API uses for completions).
+
+Other calls wait up to ``batch_window`` seconds for company, from any agent
+thread, and then reach the backend together as one ``_execute_batch``. Once
+``max_batch_size`` calls are waiting, the batch goes at once. Identical calls
+in the same window share one result. Async callers use ``_arun``, which joins
+the same batches. A tool with an async backend overrides ``_aexecute_batch``;
+otherwise the batch runs in a worker thread.
+
+Subclasses implement ``_execute_batch`` (or just ``_execute`` for one call)
+and return JSON-serializable results. Each call is counted in
+``ai_pops_tool_calls_total`` by result:
+
+- ``hit``: served from the cache.
+- ``miss``: went to the backend.
+- ``joined``: shared an identical call already in flight.
+- ``error``: the backend raised.
+
+Latencies go to ``ai_pops_tool_duration_seconds`` and batch sizes to
+``ai_pops_tool_batch_size``. ``stats()`` gives the same figures for one tool.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+from crewai.tools import BaseTool
+from pydantic import Field, PrivateAttr
+
+from ai_pops.api.cache import ResponseCache
+from ai_pops.api.metrics import TOOL_BATCH_SIZE, TOOL_CALLS, TOOL_DURATION
+
+# Results kept per tool, and seconds before a result is fetched again
+TOOL_CACHE_SIZE = int(os.getenv("TOOL_CACHE_SIZE", "1024"))
+TOOL_CACHE_TTL = float(os.getenv("TOOL_CACHE_TTL", "300"))
+# Seconds a call waits for others to share a backend call with, and the most
+# calls answered by one backend call
+TOOL_BATCH_WINDOW = float(os.getenv("TOOL_BATCH_WINDOW", "0.01"))
+TOOL_MAX_BATCH = int(os.getenv("TOOL_MAX_BATCH", "64"))
+
+Call = Dict[str, Any]
+
+
+class _Batch:
+    """Calls waiting to go to the backend together."""
+
+    def __init__(self):
+        self.calls: List[Tuple[str, Call, Future]] = []
+        self.full = threading.Event()
+
+
+class CachedTool(BaseTool):
+    """``BaseTool`` with result memoization, micro-batching and call counters."""
+
+    cache_size: int = Field(default=TOOL_CACHE_SIZE, ge=0)
+    cache_ttl: float = Field(default=TOOL_CACHE_TTL, ge=0)
+    batch_window: float = Field(default=TOOL_BATCH_WINDOW, ge=0)
+    max_batch_size: int = Field(default=TOOL_MAX_BATCH, ge=1)
+
+    _cache: ResponseCache = PrivateAttr()
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _batch: Optional[_Batch] = PrivateAttr(default=None)
+    _inflight: Dict[str, Future] = PrivateAttr(default_factory=dict)
+    _counts: Counter = PrivateAttr(default_factory=Counter)
+
+    def model_post_init(self, __context: Any) -> None:
+        super().model_post_init(__context)
+        self._cache = ResponseCache(max_entries=self.cache_size, ttl=self.cache_ttl)
+
+    # Backend, implemented by subclasses
+
+    def _execute(self, **kwargs: Any) -> Any:
+        """Answer one call."""
+        raise NotImplementedError(f"{type(self).__name__} implements neither _execute nor _execute_batch")
+
+    def _execute_batch(self, calls: List[Call]) -> List[Any]:
+        """Answer several calls, in order; override to share one backend call between them."""
+        return [self._execute(**call) for call in calls]
+
+    async def _aexecute_batch(self, calls: List[Call]) -> List[Any]:
+        """Async ``_execute_batch``; by default it runs in a worker thread."""
+        return await asyncio.to_thread(self._execute_batch, calls)
+
+    # Entry points
+
+    def _run(self, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        key, call, result = self._lookup(kwargs)
+        if key is None:
+            return self._done(started, "hit", result)
+        future, batch, result_kind = self._join(key, call)
+        if batch is not None:
+            batch.full.wait(self.batch_window)
+            calls = self._take(batch)
+            try:
+                results = self._execute_batch(calls)
+            except Exception as e:
+                self._resolve(batch, None, e)
+            else:
+                self._resolve(batch, results, None)
+        return self._wait(started, result_kind, future)
+
+    async def _arun(self, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        key, call, result = self._lookup(kwargs)
+        if key is None:
+            return self._done(started, "hit", result)
+        future, batch, result_kind = self._join(key, call)
+        if batch is not None:
+            await asyncio.to_thread(batch.full.wait, self.batch_window)
+            calls = self._take(batch)
+            try:
+                results = await self._aexecute_batch(calls)
+            except Exception as e:
+                self._resolve(batch, None, e)
+            else:
+                self._resolve(batch, results, None)
+        await asyncio.wait([asyncio.wrap_future(future)])
+        return self._wait(started, result_kind, future)
+
+    # Internals
+
+    def _lookup(self, kwargs: Call) -> Tuple[Optional[str], Call, Any]:
+        """``(None, call, result)`` on a cache hit, else ``(key, call, None)``."""
+        call = self.args_schema.model_validate(kwargs).model_dump()
+        key = hashlib.sha256(
+            json.dumps({"tool": self.name, "args": call}, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+        cached = self._cache.get(key)
+        if cached is not None:
+            return None, call, json.loads(cached)
+        return key, call, None
+
+    def _join(self, key: str, call: Call) -> Tuple[Future, Optional[_Batch], str]:
+        """Future for ``call``, and the batch to send if this call opened it."""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future, None, "joined"
+            future = self._inflight[key] = Future()
+            opened = None
+            if self._batch is None or len(self._batch.calls) >= self.max_batch_size:
+                self._batch = opened = _Batch()
+            self._batch.calls.append((key, call, future))
+            if len(self._batch.calls) >= self.max_batch_size:
+                self._batch.full.set()
+            return future, opened, "miss"
+
+    def _take(self, batch: _Batch) -> List[Call]:
+        """Close ``batch`` to new calls and return its arguments."""
+        with self._lock:
+            if self._batch is batch:
+                self._batch = None
+        return [call for _, call, _ in batch.calls]
+
+    def _resolve(self, batch: _Batch, results: Optional[List[Any]], error: Optional[BaseException]) -> None:
+        if error is None and len(results) != len(batch.calls):
+            error = RuntimeError(f"{self.name} returned {len(results)} results for {len(batch.calls)} calls")
+        if error is None:
+            for (key, _, _), result in zip(batch.calls, results):
+                self._cache.set(key, json.dumps(result))
+        # Cached before leaving the in-flight table, so no call slips between the two
+        with self._lock:
+            for key, _, _ in batch.calls:
+                self._inflight.pop(key, None)
+            self._counts["backend_calls"] += 1
+            self._counts["batched_calls"] += len(batch.calls)
+        TOOL_BATCH_SIZE.observe(len(batch.calls), tool=self.name)
+        for i, (_, _, future) in enumerate(batch.calls):
+            if error is None:
+                future.set_result(results[i])
+            else:
+                future.set_exception(error)
+
+    def _wait(self, started: float, result_kind: str, future: Future) -> Any:
+        try:
+            result = future.result()
+        except Exception:
+            self._done(started, "error", None)
+            raise
+        return self._done(started, result_kind, result)
+
+    def _done(self, started: float, result_kind: str, result: Any) -> Any:
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._counts[result_kind] += 1
+            self._counts["seconds"] += elapsed
+        TOOL_CALLS.inc(tool=self.name, result=result_kind)
+        TOOL_DURATION.observe(elapsed, tool=self.name)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Calls by result, backend calls, mean latency and the cache's own counters."""
+        with self._lock:
+            counts = dict(self._counts)
+        calls = sum(counts.get(kind, 0) for kind in ("hit", "miss", "joined", "error"))
+        backend_calls = counts.get("backend_calls", 0)
+        return {
+            "calls": calls,
+            **{kind: counts.get(kind, 0) for kind in ("hit", "miss", "joined", "error")},
+            "backend_calls": backend_calls,
+            "mean_batch_size": round(counts.get("batched_calls", 0) / backend_calls, 2) if backend_calls else 0.0,
+            "mean_latency_ms": round(counts.get("seconds", 0.0) * 1000 / calls, 3) if calls else 0.0,
+            "cache": self._cache.stats(),
+        }
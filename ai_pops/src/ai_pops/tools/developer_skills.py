@@ -0,0 +1,46 @@
+from typing import Any, List, Type
+
+from pydantic import BaseModel, Field
+
+from ai_pops.api.models import Ticket
+from ai_pops.tools.cached_tool import CachedTool
+
+
+class DeveloperSkillLookupInput(BaseModel):
+    """Input schema for DeveloperSkillLookupTool."""
+    skills: str = Field(
+        ...,
+        description="Skills or a short task description, e.g. 'react, graphql' or 'move billing to Kubernetes'.",
+    )
+    limit: int = Field(default=5, ge=1, le=20, description="How many developers to return.")
+
+
+class DeveloperSkillLookupTool(CachedTool):
+    """Best-matching developers from the team store, every batch scored with one matrix product."""
+
+    name: str = "Developer skill lookup"
+    description: str = (
+        "Find the developers on our team whose skills and experience best match some skills or a task. "
+        "Returns each developer's name, years of experience and skills, and why they match."
+    )
+    args_schema: Type[BaseModel] = DeveloperSkillLookupInput
+
+    def _execute_batch(self, calls: List[dict]) -> List[Any]:
+        # The store is opened on first use, so creating the tool costs nothing
+        from ai_pops.services.matching_service import explain_match
+        from ai_pops.services.store_service import get_store
+
+        store = get_store()
+        found = store.search_developers([call["skills"] for call in calls], max(call["limit"] for call in calls))
+        results = []
+        for call, matches in zip(calls, found):
+            if not matches:
+                results.append(f"No developer on the team matches '{call['skills']}'.")
+                continue
+            query = Ticket(id="", title=call["skills"], description="")
+            results.append("\n".join(
+                f"- {developer.name} ({developer.experience_years} years): {', '.join(developer.skills)}. "
+                f"{explain_match(developer, query)}"
+                for developer, _score in matches[:call["limit"]]
+            ))
+        return results
@@ -1,6 +1,15 @@
 #!/usr/bin/env python3
-"""Startup script for the AI Pops backend server."""
+"""Startup script for the AI Pops backend server.
 
+    python start_server.py --reload       # development: one process, reloads on edits
+    python start_server.py --workers 4    # production: 4 worker processes
+
+With more than one worker, the LLM response cache and the OpenAI rate-limit
+budget are kept in one SQLite file (API_STATE_PATH) that every worker shares,
+unless LLM_CACHE_PATH / LLM_RATE_LIMIT_PATH already point somewhere.
+"""
+
+import argparse
 import uvicorn
 import os
 import sys
@@ -16,29 +25,49 @@ if src_dir.exists():
 # Load environment variables
 load_dotenv()
 
+# Worker processes; 1 runs the app in this process
+API_WORKERS = int(os.getenv("API_WORKERS", "1"))
+# SQLite file shared by the workers for the response cache and rate limiter
+API_STATE_PATH = os.getenv("API_STATE_PATH", "ai_pops_state.db")
+
 def main():
     """Start the FastAPI server."""
+    parser = argparse.ArgumentParser(description="Start the AI Pops backend server.")
+    parser.add_argument("--workers", type=int, default=API_WORKERS, help="worker processes")
+    parser.add_argument("--reload", action="store_true", help="restart on code changes (development)")
+    args = parser.parse_args()
+    if args.reload and args.workers > 1:
+        parser.error("--reload runs a single process; drop --workers")
+
     host = os.getenv("API_HOST", "0.0.0.0")
     port = int(os.getenv("API_PORT", "8000"))
-    
+
+    if args.workers > 1:
+        # Set before the workers start so each of them opens the same file
+        os.environ.setdefault("LLM_CACHE_PATH", API_STATE_PATH)
+        os.environ.setdefault("LLM_RATE_LIMIT_PATH", API_STATE_PATH)
+
     print(f"🚀 Starting AI Pops backend server...")
     print(f"📍 Server will be available at: http://{host}:{port}")
     print(f"📖 API docs will be available at: http://{host}:{port}/docs")
     print(f"🔑 OpenAI API Key: {'✅ Found' if os.getenv('OPENAI_API_KEY') else '❌ Missing'}")
+    if args.workers > 1:
+        print(f"👥 Workers: {args.workers}, shared state in {os.environ['LLM_RATE_LIMIT_PATH']}")
     print()
-    
+
     if not os.getenv("OPENAI_API_KEY"):
         print("⚠️  Warning: OPENAI_API_KEY environment variable is not set!")
         print("   Please set it in your .env file or environment.")
         print()
-    
+
     uvicorn.run(
         "ai_pops.api.server:app",
         host=host,
         port=port,
-        reload=True,
+        reload=args.reload,
+        workers=args.workers,
         log_level="info"
     )
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,19 @@
+import pytest
+
+
+class Clock:
+    """Stand-in for the ``time`` module of code under test, moved by hand."""
+
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock() -> Clock:
+    return Clock()
@@ -0,0 +1,150 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from ai_pops.services.assignment_service import (
+    AssignmentSolver,
+    default_capacity,
+    greedy_assignment,
+    solve_assignment,
+    to_benefits,
+)
+
+
+def total(benefits, pairs):
+    return sum(int(benefits[d, t]) for t, d in pairs)
+
+
+def loads(pairs, n_developers):
+    return np.bincount([d for _, d in pairs], minlength=n_developers)
+
+
+def brute_force(benefits, capacity, load=None):
+    """Best total benefit over every assignment that respects capacity."""
+    n_developers, n_tickets = benefits.shape
+    load = load or [0] * n_developers
+    best = None
+    for choice in itertools.product(range(n_developers), repeat=n_tickets):
+        if any(choice.count(d) + load[d] > capacity for d in range(n_developers)):
+            continue
+        value = sum(int(benefits[d, t]) for t, d in enumerate(choice))
+        best = value if best is None else max(best, value)
+    return best
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_solver_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    n_developers, n_tickets = int(rng.integers(1, 4)), int(rng.integers(1, 7))
+    capacity = int(rng.integers(-(-n_tickets // n_developers), n_tickets + 1))
+    scores = rng.random((n_developers, n_tickets)) * 100
+
+    pairs = solve_assignment(scores, capacity)
+
+    benefits = to_benefits(scores)
+    assert [t for t, _ in pairs] == list(range(n_tickets))
+    assert loads(pairs, n_developers).max() <= capacity
+    assert total(benefits, pairs) == brute_force(benefits, capacity)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_solver_counts_existing_load_against_capacity(seed):
+    rng = np.random.default_rng(seed)
+    n_developers, n_tickets = 3, int(rng.integers(1, 6))
+    load = rng.integers(0, 3, n_developers).tolist()
+    capacity = 3
+    if sum(capacity - used for used in load) < n_tickets:
+        pytest.skip("not enough spare slots")
+    scores = rng.random((n_developers, n_tickets)) * 100
+
+    pairs = solve_assignment(scores, capacity, load=load)
+
+    benefits = to_benefits(scores)
+    assert all(loads(pairs, n_developers) + load <= capacity)
+    assert total(benefits, pairs) == brute_force(benefits, capacity, load)
+
+
+@pytest.mark.parametrize("n_developers, n_tickets, capacity", [(8, 40, 5), (20, 60, 4), (15, 45, 3)])
+def test_solver_matches_scipy_on_larger_problems(n_developers, n_tickets, capacity):
+    optimize = pytest.importorskip("scipy.optimize")
+    rng = np.random.default_rng(n_tickets)
+    scores = rng.random((n_developers, n_tickets)) * 100
+    benefits = to_benefits(scores)
+
+    pairs = solve_assignment(scores, capacity, candidates=n_developers)
+
+    # Each developer repeated once per slot turns capacity into a plain assignment
+    slots = np.repeat(benefits, capacity, axis=0)
+    rows, cols = optimize.linear_sum_assignment(slots, maximize=True)
+    assert loads(pairs, n_developers).max() <= capacity
+    assert total(benefits, pairs) == int(slots[rows, cols].sum())
+
+
+def test_sparse_candidates_still_cover_every_ticket():
+    rng = np.random.default_rng(7)
+    # Everyone prefers developer 0, who only has room for three tickets
+    scores = rng.random((10, 30)) * 10
+    scores[0] += 90
+
+    pairs = solve_assignment(scores, capacity=3, candidates=2)
+
+    assert len(pairs) == 30
+    assert loads(pairs, 10).max() <= 3
+
+
+def test_default_capacity_adds_headroom():
+    assert default_capacity(10, 100) == 10
+    assert default_capacity(10, 100, 0.2) == 12
+    assert default_capacity(0, 5) == 5
+    assert default_capacity(4, 0) == 1
+
+
+def test_too_little_capacity_is_rejected():
+    with pytest.raises(ValueError):
+        solve_assignment(np.ones((2, 5)), capacity=2)
+    with pytest.raises(ValueError):
+        solve_assignment(np.ones((2, 3)), capacity=2, load=[2, 1])
+
+
+def test_large_backlogs_go_to_greedy_within_capacity():
+    rng = np.random.default_rng(3)
+    scores = rng.random((5, 40)) * 100
+
+    pairs = solve_assignment(scores, capacity=9, max_tickets=10)
+
+    assert pairs == greedy_assignment(scores, 9)
+    assert len(pairs) == 40
+    assert loads(pairs, 5).max() <= 9
+
+
+def test_greedy_skips_full_developers():
+    scores = np.array([[90.0, 80.0, 70.0], [10.0, 20.0, 30.0]])
+    assert greedy_assignment(scores, 2) == [(0, 0), (1, 0), (2, 1)]
+    assert greedy_assignment(scores, 2, load=[1, 0]) == [(0, 0), (1, 1), (2, 1)]
+
+
+def test_incremental_edits_stay_optimal():
+    rng = np.random.default_rng(11)
+    n_developers, capacity = 3, 3
+    benefits = rng.integers(0, 1000, (n_developers, 8))
+    solver = AssignmentSolver(n_developers, capacity)
+    live = set()
+
+    def check():
+        pairs = sorted(solver.assignments().items())
+        assert [t for t, _ in pairs] == sorted(live)
+        assert total(benefits, pairs) == brute_force(benefits[:, sorted(live)], capacity)
+
+    for ticket in range(8):
+        assert solver.insert(ticket, dict(enumerate(benefits[:, ticket].tolist())))
+        live.add(ticket)
+    check()
+    for ticket in (2, 5):
+        solver.remove(ticket)
+        live.discard(ticket)
+        check()
+    for ticket in (0, 7):
+        benefits[:, ticket] = rng.integers(0, 1000, n_developers)
+        assert solver.update(ticket, dict(enumerate(benefits[:, ticket].tolist())))
+        check()
@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from ai_pops.api import cache
+from ai_pops.api.cache import ResponseCache, bypasses_cache, cache_key
+
+
+@pytest.fixture(autouse=True)
+def frozen_time(monkeypatch, clock):
+    monkeypatch.setattr(cache, "time", clock)
+
+
+def test_key_covers_every_input():
+    base = cache_key("m", "prompt", 0.2, 100)
+    assert base == cache_key("m", "prompt", 0.2, 100)
+    assert len({
+        base,
+        cache_key("other", "prompt", 0.2, 100),
+        cache_key("m", "prompt!", 0.2, 100),
+        cache_key("m", "prompt", 0.3, 100),
+        cache_key("m", "prompt", 0.2, 101),
+        cache_key("m", "prompt", 0.2, 100, {"type": "json_object"}),
+    }) == 6
+
+
+def test_entries_expire_after_ttl(clock):
+    store = ResponseCache(max_entries=10, ttl=60)
+    store.set("k", "v")
+    clock.advance(59)
+    assert store.get("k") == "v"
+    clock.advance(1)
+    assert store.get("k") is None
+    assert store.stats()["expirations"] == 1
+    assert store.stats()["misses"] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    store = ResponseCache(max_entries=2, ttl=60)
+    store.set("a", "1")
+    store.set("b", "2")
+    assert store.get("a") == "1"
+    store.set("c", "3")
+    assert store.get("b") is None
+    assert store.get("a") == "1"
+    assert store.get("c") == "3"
+    assert store.stats()["evictions"] == 1
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, (False, False)),
+    ("", (False, False)),
+    ("max-age=0", (False, False)),
+    ("no-cache", (True, False)),
+    ("No-Store", (True, True)),
+    ("private, no-cache, no-store", (True, True)),
+])
+def test_cache_control_bypass(header, expected):
+    assert bypasses_cache(header) == expected
+
+
+def test_disk_tier_survives_a_restart(tmp_path, clock):
+    path = str(tmp_path / "cache.db")
+    ResponseCache(max_entries=10, ttl=60, path=path).set("k", "v")
+
+    reopened = ResponseCache(max_entries=10, ttl=60, path=path)
+    assert reopened.get("k") == "v"
+    assert reopened.stats()["disk_hits"] == 1
+
+    clock.advance(60)
+    assert ResponseCache(max_entries=10, ttl=60, path=path).get("k") is None
+
+
+def test_disk_tier_is_trimmed_to_max_rows(tmp_path, clock):
+    path = str(tmp_path / "cache.db")
+    store = ResponseCache(max_entries=1000, ttl=3600, path=path, max_rows=30)
+    for i in range(2 * cache._TRIM_INTERVAL):
+        store.set(f"k{i}", str(i))
+        clock.advance(1)
+    rows = store._db.execute("SELECT key FROM llm_cache").fetchall()
+    assert len(rows) <= 30
+    # The oldest rows went first
+    assert ("k0",) not in rows
+    assert (f"k{2 * cache._TRIM_INTERVAL - 1}",) in rows
+    assert store.stats()["disk_evictions"] > 0
+
+
+def test_async_get_and_set_use_both_tiers(tmp_path):
+    path = str(tmp_path / "cache.db")
+
+    async def roundtrip():
+        store = ResponseCache(max_entries=10, ttl=60, path=path)
+        await store.aset("k", "v")
+        assert await store.aget("k") == "v"
+        assert await store.aget("missing") is None
+        reopened = ResponseCache(max_entries=10, ttl=60, path=path)
+        assert await reopened.aget("k") == "v"
+        return store.stats(), reopened.stats()
+
+    stats, reopened = asyncio.run(roundtrip())
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+    assert reopened["disk_hits"] == 1
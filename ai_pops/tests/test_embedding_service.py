@@ -0,0 +1,29 @@
+import json
+
+from ai_pops.api.models import Developer
+from ai_pops.services.embedding_service import DeveloperIndex, HashingEmbedder
+from ai_pops.services.synthetic_service import synthetic_developers
+
+
+def test_index_reopens_from_disk(tmp_path):
+    developers = [Developer(**d) for d in synthetic_developers(20, seed=3)]
+    index = DeveloperIndex(HashingEmbedder(), str(tmp_path / "index"))
+    assert index.sync(developers) == 20
+
+    reopened = DeveloperIndex(HashingEmbedder(), str(tmp_path / "index"))
+    assert reopened.names == index.names
+    assert reopened.sync(developers) == 0
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["index.json", "index.npy"]
+
+
+def test_metadata_from_another_save_is_ignored(tmp_path):
+    developers = [Developer(**d) for d in synthetic_developers(20, seed=3)]
+    DeveloperIndex(HashingEmbedder(), str(tmp_path / "index")).sync(developers)
+    meta_file = tmp_path / "index.json"
+    meta = json.loads(meta_file.read_text())
+    meta["names"], meta["digests"] = meta["names"][:15], meta["digests"][:15]
+    meta_file.write_text(json.dumps(meta))
+
+    reopened = DeveloperIndex(HashingEmbedder(), str(tmp_path / "index"))
+    assert len(reopened) == 0
+    assert reopened.sync(developers) == 20
@@ -0,0 +1,128 @@
+import threading
+
+import pytest
+
+from ai_pops.services import job_service
+from ai_pops.services.job_service import CANCELLED, DONE, FAILED, QUEUED, RUNNING, JobQueue
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch, clock):
+    monkeypatch.setattr(job_service, "time", clock)
+    return JobQueue(str(tmp_path / "jobs.db"), result_ttl=3600, lease=60, max_attempts=2)
+
+
+def submit(queue, clock, kind="match", priority=0):
+    job = queue.submit(kind, {"n": 1}, priority)
+    clock.advance(1)
+    return job
+
+
+def test_claims_follow_priority_then_age(queue, clock):
+    jobs = [submit(queue, clock, priority=p) for p in (5, 1, 5)]
+    other_kind = submit(queue, clock, kind="generate", priority=0)
+
+    order = [queue.claim(["match"])["id"] for _ in range(3)]
+    assert order == [jobs[1]["id"], jobs[0]["id"], jobs[2]["id"]]
+    assert queue.claim(["match"]) is None
+    assert queue.claim([]) is None
+    assert queue.claim(["generate", "match"])["id"] == other_kind["id"]
+
+
+def test_claimed_job_is_running_and_not_handed_out_twice(queue, clock):
+    jobs = [submit(queue, clock) for _ in range(20)]
+    claimed = []
+
+    def worker():
+        while (job := queue.claim(["match"])) is not None:
+            claimed.append(job["id"])
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(claimed) == sorted(job["id"] for job in jobs)
+    assert queue.stats()[RUNNING] == 20
+    assert all(queue.get(job_id)["attempts"] == 1 for job_id in claimed)
+
+
+def test_lapsed_lease_requeues_then_fails(queue, clock):
+    job = submit(queue, clock)
+    assert queue.claim(["match"])["id"] == job["id"]
+
+    # Heartbeats keep the lease
+    clock.advance(50)
+    queue.heartbeat(job["id"])
+    clock.advance(50)
+    assert queue.claim(["match"]) is None
+
+    clock.advance(11)
+    again = queue.claim(["match"])
+    assert again["id"] == job["id"]
+    assert again["attempts"] == 2
+
+    clock.advance(61)
+    assert queue.claim(["match"]) is None
+    lost = queue.get(job["id"])
+    assert lost["status"] == FAILED
+    assert lost["error"] == "worker lost"
+
+
+def test_finish_and_fail_only_apply_to_running_jobs(queue, clock):
+    job = submit(queue, clock)
+    assert not queue.finish(job["id"], {"ok": True})
+    queue.claim(["match"])
+    queue.progress(job["id"], 0.5, "half way")
+    assert queue.get(job["id"])["message"] == "half way"
+    assert queue.finish(job["id"], {"ok": True})
+    assert not queue.fail(job["id"], "too late")
+    queue.progress(job["id"], 0.1)
+
+    done = queue.get(job["id"])
+    assert (done["status"], done["result"], done["progress"]) == (DONE, {"ok": True}, 1.0)
+
+
+def test_cancel_queued_job_is_immediate(queue, clock):
+    job = submit(queue, clock)
+    assert queue.cancel(job["id"])["status"] == CANCELLED
+    assert queue.claim(["match"]) is None
+
+
+def test_cancel_running_job_asks_its_worker(queue, clock):
+    job = submit(queue, clock)
+    queue.claim(["match"])
+    assert not queue.heartbeat(job["id"])
+
+    requested = queue.cancel(job["id"])
+    assert requested["status"] == RUNNING
+    assert requested["cancel_requested"]
+    assert queue.heartbeat(job["id"])
+    assert queue.mark_cancelled(job["id"])
+    assert queue.get(job["id"])["status"] == CANCELLED
+
+
+def test_release_puts_job_back_without_using_an_attempt(queue, clock):
+    job = submit(queue, clock)
+    queue.claim(["match"])
+    assert queue.release(job["id"])
+    assert not queue.release(job["id"])
+    released = queue.get(job["id"])
+    assert (released["status"], released["attempts"]) == (QUEUED, 0)
+    assert queue.claim(["match"])["attempts"] == 1
+
+
+def test_finished_jobs_expire_and_are_purged(queue, clock):
+    old, recent = submit(queue, clock), submit(queue, clock)
+    queue.claim(["match"])
+    queue.finish(old["id"], None)
+    clock.advance(3000)
+    queue.claim(["match"])
+    queue.fail(recent["id"], "boom")
+
+    clock.advance(601)
+    assert queue.get(old["id"]) is None
+    assert [job["id"] for job in queue.list_jobs()] == [recent["id"]]
+    assert queue.purge() == 1
+    assert queue.purge() == 0
+    assert queue.get(recent["id"])["error"] == "boom"
@@ -0,0 +1,33 @@
+import json
+
+import pytest
+
+from ai_pops.api.llm import decode_items
+
+ITEMS = [
+    {"id": "TASK-001", "title": "Fix [the] {checkout} page", "tags": ["a", "b"]},
+    {"id": "TASK-002", "title": 'Quote \\" and brace } inside', "nested": {"x": [1, {"y": 2}]}},
+    [1, 2, 3],
+]
+
+
+def test_decode_items_unwraps_items_and_code_fences():
+    assert decode_items(json.dumps({"items": ITEMS})) == (ITEMS, True, 0)
+    assert decode_items("```json\n" + json.dumps(ITEMS) + "\n```") == (ITEMS, True, 0)
+
+
+def test_decode_items_salvages_a_truncated_answer():
+    text = json.dumps(ITEMS)
+    cut = text.index("[1, 2")
+    items, clean, wasted = decode_items(text[:cut])
+    assert items == ITEMS[:2]
+    assert not clean
+    assert wasted == cut - len(json.dumps(ITEMS[:2])[:-1])
+
+
+def test_decode_items_without_salvage_or_items_raises():
+    text = json.dumps(ITEMS)[:-5]
+    with pytest.raises(ValueError):
+        decode_items(text, salvage=False)
+    with pytest.raises(ValueError):
+        decode_items('[{"id": "TASK-001", "title": "cut')
@@ -0,0 +1,130 @@
+import numpy as np
+import pytest
+
+from ai_pops.api.models import Developer, Ticket
+from ai_pops.services.store_service import TeamStore
+from ai_pops.services.synthetic_service import synthetic_developers, synthetic_tickets
+
+CAPACITY = 4
+
+
+def open_store(path) -> TeamStore:
+    # Every developer is a candidate and capacity is fixed, so the optimum is well defined
+    return TeamStore(str(path), capacity=CAPACITY, candidates=100, headroom=0.0)
+
+
+def total_benefit(store: TeamStore) -> int:
+    return sum(store.ticket_candidates[t][d] for t, d in store.solver.ticket_dev.items())
+
+
+def check(store: TeamStore, path) -> None:
+    assignments = store.assignments()
+    assert sorted(a.ticketId for a in assignments) == sorted(store.tickets)
+    counts = np.bincount([store.dev_index[a.developerName] for a in assignments], minlength=len(store.dev_names))
+    assert counts.max() <= CAPACITY
+
+    fresh = open_store(path)
+    assert total_benefit(store) == total_benefit(fresh)
+
+    optimize = pytest.importorskip("scipy.optimize")
+    benefits = np.array([[store.ticket_candidates[t][d] for t in store.tickets] for d in range(len(store.dev_names))])
+    slots = np.repeat(benefits, CAPACITY, axis=0)
+    rows, cols = optimize.linear_sum_assignment(slots, maximize=True)
+    assert total_benefit(store) == int(slots[rows, cols].sum())
+
+
+def test_incremental_edits_match_a_rebuild(tmp_path):
+    path = tmp_path / "store.db"
+    store = open_store(path)
+    developers = [Developer(**d) for d in synthetic_developers(5, seed=2)]
+    tickets = [Ticket(**t) for t in synthetic_tickets(12, seed=2)]
+    store.load(developers, tickets[:8])
+    check(store, path)
+
+    for ticket in tickets[8:]:
+        store.upsert_ticket(ticket)
+        check(store, path)
+
+    retitled = tickets[0].model_copy(update={"description": "Mostly Kubernetes and Terraform work."})
+    store.upsert_ticket(retitled)
+    check(store, path)
+
+    assert store.delete_ticket(tickets[3].id)
+    assert not store.delete_ticket(tickets[3].id)
+    check(store, path)
+
+    newcomer = Developer(**synthetic_developers(6, seed=9)[5])
+    store.upsert_developer(newcomer)
+    check(store, path)
+
+    reskilled = developers[1].model_copy(update={"skills": ["Kubernetes", "Terraform", "AWS"]})
+    store.upsert_developer(reskilled)
+    check(store, path)
+
+    assert store.delete_developer(developers[0].name)
+    check(store, path)
+
+
+def test_store_survives_a_reopen(tmp_path):
+    path = tmp_path / "store.db"
+    store = open_store(path)
+    developers = [Developer(**d) for d in synthetic_developers(3, seed=4)]
+    store.load(developers, [Ticket(**t) for t in synthetic_tickets(6, seed=4)])
+
+    reopened = open_store(path)
+    assert reopened.list_developers() == store.list_developers()
+    assert reopened.list_tickets() == store.list_tickets()
+    assert total_benefit(reopened) == total_benefit(store)
+
+
+def test_empty_team_has_no_assignments(tmp_path):
+    store = open_store(tmp_path / "store.db")
+    store.upsert_ticket(Ticket(**synthetic_tickets(1)[0]))
+    assert store.assignments() == []
+
+
+def stored_rows(store: TeamStore) -> dict:
+    return {t: (d, s) for t, d, s in store._db.execute("SELECT ticket_id, developer_name, score FROM assignments")}
+
+
+def test_in_place_edits_rewrite_the_stored_score(tmp_path):
+    store = open_store(tmp_path / "store.db")
+    developer = Developer(name="A", skills=["Python", "Django"], experience_years=4, profile_summary="Backend")
+    ticket = Ticket(id="T1", title="Fix billing", description="Mostly Go work.")
+    store.load([developer], [ticket])
+    before = stored_rows(store)["T1"]
+
+    store.upsert_ticket(ticket.model_copy(update={"description": "Mostly Python and Django work."}))
+    (assignment,) = store.assignments()
+    assert stored_rows(store) == {"T1": ("A", assignment.matchScore)}
+    assert assignment.matchScore > before[1]
+
+    store.upsert_developer(developer.model_copy(update={"skills": ["Go"]}))
+    (assignment,) = store.assignments()
+    assert stored_rows(store) == {"T1": ("A", assignment.matchScore)}
+
+
+def test_failed_edit_leaves_memory_matching_the_database(tmp_path, monkeypatch):
+    path = tmp_path / "store.db"
+    store = open_store(path)
+    developers = [Developer(**d) for d in synthetic_developers(3, seed=5)]
+    tickets = [Ticket(**t) for t in synthetic_tickets(6, seed=5)]
+    store.load(developers, tickets)
+    rows = stored_rows(store)
+
+    def broken():
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(store, "_persist_changes", broken)
+    with pytest.raises(RuntimeError):
+        store.upsert_ticket(Ticket(id="NEW-1", title="Add search", description="Python"))
+    with pytest.raises(RuntimeError):
+        store.upsert_developer(Developer(**synthetic_developers(4, seed=8)[3]))
+    monkeypatch.undo()
+
+    assert store.list_tickets() == tickets
+    assert store.list_developers() == developers
+    assert stored_rows(store) == rows
+    assert total_benefit(store) == total_benefit(open_store(path))
+    store.upsert_ticket(Ticket(id="NEW-1", title="Add search", description="Python"))
+    check(store, path)
@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from ai_pops.api.streaming import JSONArrayStreamParser
+
+ITEMS = [
+    {"id": "TASK-001", "title": "Fix [the] {checkout} page", "tags": ["a", "b"]},
+    {"id": "TASK-002", "title": 'Quote \\" and brace } inside', "nested": {"x": [1, {"y": 2}]}},
+    [1, 2, 3],
+]
+TEXT = "```json\n" + json.dumps(ITEMS, indent=2) + "\n```"
+
+
+def feed_all(parser, chunks):
+    items = []
+    for chunk in chunks:
+        items.extend(parser.feed(chunk))
+    return items
+
+
+@pytest.mark.parametrize("split", range(len(TEXT) + 1))
+def test_any_split_gives_the_same_items(split):
+    parser = JSONArrayStreamParser()
+    assert feed_all(parser, [TEXT[:split], TEXT[split:]]) == ITEMS
+    assert parser.complete
+    assert parser.dropped == 0
+
+
+def test_char_by_char_feed():
+    parser = JSONArrayStreamParser()
+    assert feed_all(parser, TEXT) == ITEMS
+    assert parser.consumed == TEXT.index("\n```")
+
+
+def test_items_wrapper_is_unwrapped():
+    parser = JSONArrayStreamParser()
+    assert parser.feed(json.dumps({"items": ITEMS})) == ITEMS
+
+
+def test_text_after_the_array_is_ignored():
+    parser = JSONArrayStreamParser()
+    assert parser.feed(json.dumps(ITEMS) + ' trailing [{"id": "extra"}]') == ITEMS
+
+
+@pytest.mark.parametrize("cut", range(1, len(TEXT)))
+def test_truncated_input_keeps_complete_items(cut):
+    # Where each item ends, from a character-by-character feed of the whole text
+    full = JSONArrayStreamParser()
+    ends = [index + 1 for index, char in enumerate(TEXT) if full.feed(char)]
+
+    parser = JSONArrayStreamParser()
+    items = feed_all(parser, [TEXT[:cut // 2], TEXT[cut // 2:cut]])
+    kept = sum(end <= cut for end in ends)
+    assert items == ITEMS[:kept]
+    if not parser.complete:
+        assert parser.consumed == (ends[kept - 1] if kept else 0)
+    if cut < TEXT.index("\n```"):
+        assert not parser.complete
+
+
+def test_malformed_item_is_dropped_and_counted():
+    bad = '{"id": "TASK-009", "title": oops}'
+    text = "[" + json.dumps(ITEMS[0]) + ", " + bad + ", " + json.dumps(ITEMS[1]) + "]"
+    parser = JSONArrayStreamParser()
+    assert parser.feed(text) == [ITEMS[0], ITEMS[1]]
+    assert parser.dropped == len(bad)
+    assert parser.complete